@@ -1,128 +1,177 @@
 import numpy as np
 import random
-from typing import List, Tuple
+import time
+from typing import List, Tuple, Optional, Callable
 from task import Task
 from computerNode import ComputeNode
 from particle import Particle
-import matplotlib.pyplot as plt
+from trajectory import Trajectory
+from domains import TaskDomains, build_domains
+from forces import population_forces
+from instance_arrays import tasks_to_arrays, nodes_to_arrays, evaluate_population
+from population import random_positions, population_size_for_budget, pack_positions, hamming_distance
 
 class ElectromagnetismAlgorithm:
 
     #Implementacija algoritma elektromagnetizma za problem raspodele resursa
 
     def __init__(self, tasks: List[Task], nodes: List[ComputeNode],
-                 population_size: int = 20, max_iterations: int = 100):
+                 population_size: int = 20, max_iterations: int = 100,
+                 local_search_attempts: int = 20, verbose: bool = True,
+                 time_limit: Optional[float] = None,
+                 initial_positions: Optional[List[List[int]]] = None,
+                 should_stop: Optional[Callable[[], bool]] = None,
+                 force_mode: str = 'exact', force_top_k: int = 16, force_samples: int = 8,
+                 memory_budget: Optional[int] = None, domains: Optional[TaskDomains] = None,
+                 track_diversity: bool = False):
         self.tasks = tasks
         self.nodes = nodes
         self.population_size = population_size
+        self.memory_budget = memory_budget  # Gornja granica memorije populacije u bajtovima (None = bez granice)
+        if memory_budget is not None:
+            pivots = force_top_k + force_samples
+            self.population_size = max(1, min(population_size, population_size_for_budget(
+                memory_budget, len(tasks), max((node.id for node in nodes), default=0) + 1, force_mode, pivots)))
         self.max_iterations = max_iterations
+        self.local_search_attempts = local_search_attempts
+        self.verbose = verbose
+        self.time_limit = time_limit  # Vremenski budžet u sekundama (None = bez ograničenja)
+        self.initial_positions = initial_positions or []  # Početna rešenja (npr. greedy) za seme populacije
+        self.should_stop = should_stop  # Spoljni signal za prekid (npr. portfolio)
+        self.force_mode = force_mode  # 'exact' (svi parovi) ili 'approx' (pivoti + agregati grupa)
+        self.force_top_k = force_top_k
+        self.force_samples = force_samples
         self.particles = []
+        self.positions = None  # P×T matrica pozicija cele populacije (čestice su pogledi na redove)
         self.best_particle = None
+        self.best_position = None
         self.best_objective = float('inf')
         self.history = []
+        self.track_diversity = track_diversity  # Beleži raznovrsnost populacije u svakoj iteraciji
+        self.diversity = []  # Srednje normalizovano Hamingovo rastojanje populacije do najboljeg rešenja (uz track_diversity)
+        self.trajectory = Trajectory()
+        self.domains = domains if domains is not None else build_domains(tasks, nodes)  # Statički domeni zadataka (čvorovi na koje zadatak staje)
+        # Nizovi instance za vektorsko pomeranje i evaluaciju cele populacije
+        self.demand, self.exec_times = tasks_to_arrays(tasks)
+        self.capacity, self.node_ids = nodes_to_arrays(nodes)
+        self.node_index = np.zeros(self.node_ids.max() + 1 if len(nodes) else 0, dtype=int)
+        self.node_index[self.node_ids] = np.arange(len(nodes))
 
     def initialize(self):
         #Inicijalizuje populaciju čestica
-        self.particles = [Particle(self.tasks, self.nodes) for _ in range(self.population_size)]
-
-        # Evaluiramo sve čestice i čuvamo najbolju
-        for particle in self.particles:
-            objective, valid = particle.evaluate()
-            if valid and objective < self.best_objective:
-                self.best_objective = objective
-                self.best_particle = particle
-
+        # Sve pozicije su jedna kompaktna matrica, a čestice su pogledi na njene redove
+        self.positions = random_positions(self.domains, self.demand, self.capacity, self.population_size,
+                                          self.node_ids)
+        self.particles = [Particle(self.tasks, self.nodes, self.domains, position=row) for row in self.positions]
+
+        # Zadata početna rešenja zamenjuju prve slučajne čestice
+        for particle, position in zip(self.particles, self.initial_positions):
+            particle.position[:] = position
+
+        # Evaluiramo sve čestice odjednom i čuvamo najbolju
+        if not self.particles:
+            return
+        objectives, valid = evaluate_population(self.node_index[self.positions], self.demand, self.exec_times,
+                                                self.capacity)
+        for particle, objective in zip(self.particles, objectives):
+            particle.charge = 1.0 / (1.0 + objective)
+        self.trajectory.count(len(self.particles))
         # Ako nema validnih čestica, uzimamo najbolju bez obzira na validnost
-        if self.best_particle is None and self.particles:
-            self.best_particle = min(self.particles, key=lambda p: p.evaluate()[0])
-            self.best_objective = self.best_particle.evaluate()[0]
+        best = int(np.argmin(np.where(valid, objectives, np.inf))) if valid.any() else int(np.argmin(objectives))
+        self.trajectory.improve(objectives[best], bool(valid[best]))
+        self._set_best(self.particles[best], float(objectives[best]))
+
+    def _set_best(self, particle: Particle, objective: float):
+        #Pamti najbolju česticu i kopiju njene pozicije
+        #(čestica se i dalje pomera, pa bez kopije rešenje ne bi odgovaralo vrednosti)
+        self.best_objective = objective
+        self.best_particle = particle
+        self.best_position = particle.position.copy()
+
+    def _evaluate(self, particle: Particle) -> Tuple[float, bool]:
+        #Evaluira česticu i beleži poboljšanje u putanji inkumbenta
+        objective, valid = particle.evaluate()
+        self.trajectory.count()
+        self.trajectory.improve(objective, valid)
+        return objective, valid
 
     def calculate_forces(self):
         """Računa elektromagnetne sile između čestica"""
-        # Normalizujemo naelektrisanja
+        # Sile za celu populaciju računamo odjednom iz istog stanja populacije
+        positions = self._positions_of(self.particles)
         charges = np.array([particle.charge for particle in self.particles])
-        total_charge = np.sum(charges)
-        if total_charge > 0:
-            normalized_charges = charges / total_charge
-        else:
-            normalized_charges = np.ones(len(charges)) / len(charges)
-
-        # Za svaku česticu računamo rezultantnu silu
-        for i, particle_i in enumerate(self.particles):
-            force = np.zeros_like(particle_i.position, dtype=float)
-
-            for j, particle_j in enumerate(self.particles):
-                if i != j:
-                    # Računamo vektor rastojanja
-                    distance_vector = particle_j.position - particle_i.position
-
-                    # Računamo euklidsko rastojanje (plus mali epsilon da izbegnemo deljenje sa nulom)
-                    distance = np.sqrt(np.sum(distance_vector**2)) + 1e-10
+        forces = population_forces(positions, charges, mode=self.force_mode, top_k=self.force_top_k,
+                                   samples=self.force_samples, rng=np.random.default_rng(random.getrandbits(32)))
 
-                    # Računamo intenzitet sile prema Kulonovom zakonu
-                    magnitude = normalized_charges[i] * normalized_charges[j] / (distance**2)
+        # Pomeramo celu populaciju odjednom
+        self.move_population(self.particles, forces)
 
-                    # Određujemo smer sile (privlačenje ili odbijanje)
-                    if particle_j.charge > particle_i.charge:
-                        # Privlačenje prema boljem rešenju
-                        force += magnitude * distance_vector
-                    else:
-                        # Odbijanje od lošijeg rešenja
-                        force -= magnitude * distance_vector
-
-            # Primenjujemo silu za pomeranje čestice
-            self.move_particle(particle_i, force)
+    def _positions_of(self, particles: List[Particle]) -> np.ndarray:
+        #Pozicije čestica kao P×T matrica; za celu populaciju to je već postojeća matrica
+        if particles is self.particles and self.positions is not None:
+            return self.positions
+        return np.array([particle.position for particle in particles])
 
     def move_particle(self, particle: Particle, force: np.ndarray):
         #Pomera česticu u skladu sa silom koja deluje na nju
-        # Za svaki zadatak
-        for i in range(len(particle.position)):
-            # Računamo verovatnoću promene na osnovu sile
-            probability = np.abs(force[i]) / (np.max(np.abs(force)) + 1e-10)
-
-            # Odlučujemo da li ćemo menjati dodelu zadatka
-            if random.random() < probability:
-                # Biramo novi čvor za zadatak
-                current_node_id = particle.position[i]
-                available_nodes = [node.id for node in particle.nodes if node.id != current_node_id]
-
-                if available_nodes:
-                    # Ako je sila pozitivna, biramo čvor prema usmerenju sile
-                    if force[i] > 0:
-                        # Biramo sledeći čvor u nizu (kružno)
-                        next_indices = [(current_node_id + k) % len(particle.nodes) for k in range(1, len(particle.nodes))]
-                        for next_id in next_indices:
-                            if next_id in available_nodes:
-                                particle.position[i] = next_id
-                                break
-                    else:
-                        # Biramo prethodni čvor u nizu (kružno)
-                        prev_indices = [(current_node_id - k) % len(particle.nodes) for k in range(1, len(particle.nodes))]
-                        for prev_id in prev_indices:
-                            if prev_id in available_nodes:
-                                particle.position[i] = prev_id
-                                break
-
-        # Evaluiramo novu poziciju
-        objective, valid = particle.evaluate()
-
+        self.move_population([particle], force[None, :])
+
+    def _target_nodes(self, current: np.ndarray, forward: np.ndarray) -> np.ndarray:
+        #Sledeći (sila > 0) ili prethodni čvor u kružnom redosledu za svaki element P×T matrice
+        #current su indeksi čvorova; čvorovi van domena zadatka se preskaču
+        n_nodes = len(self.nodes)
+        tables = self.domains.neighbor_tables()
+        if tables is None:
+            return np.where(forward, (current + 1) % n_nodes, (current - 1) % n_nodes)
+        next_node, prev_node = tables
+        tasks = np.arange(current.shape[1])[None, :]
+        return np.where(forward, next_node[tasks, current], prev_node[tasks, current])
+
+    def move_population(self, particles: List[Particle], forces: np.ndarray):
+        #Pomera sve čestice odjednom: jedna slučajna matrica odluka, ciljni čvorovi
+        #preko kružnog pomeraja nad indeksima čvorova, pa vektorska evaluacija
+        if not particles:
+            return
+        current = self.node_index[self._positions_of(particles)]
+
+        # Verovatnoća promene je |sila| relativno prema najvećoj sili te čestice
+        magnitude = np.abs(forces)
+        probability = magnitude / (magnitude.max(axis=1, keepdims=True) + 1e-10)
+        change = np.random.random(current.shape) < probability
+
+        moved = np.where(change, self._target_nodes(current, forces > 0), current)
+        positions = self.node_ids[moved]
+        if particles is self.particles and self.positions is not None:
+            self.positions[:] = positions  # Čestice su pogledi na redove matrice
+        else:
+            for particle, position in zip(particles, positions):
+                particle.position[:] = position
+
+        # Evaluiramo nove pozicije cele populacije
+        objectives, valid = evaluate_population(moved, self.demand, self.exec_times, self.capacity)
+        for particle, objective in zip(particles, objectives):
+            particle.charge = 1.0 / (1.0 + objective)
+
+        # Najbolja čestica populacije (validne imaju prednost)
+        best = int(np.argmin(np.where(valid, objectives, np.inf))) if valid.any() else int(np.argmin(objectives))
+        self.trajectory.count(len(particles))
+        self.trajectory.improve(objectives[best], bool(valid[best]))
         # Ažuriramo najbolje rešenje ako je novo rešenje bolje
-        if valid and objective < self.best_objective:
-            self.best_objective = objective
-            self.best_particle = particle
+        if valid[best] and objectives[best] < self.best_objective:
+            self._set_best(particles[best], float(objectives[best]))
 
     def local_search(self, particle: Particle, max_attempts: int = 20):
         #Lokalna pretraga za fino podešavanje rešenja
         current_position = particle.position.copy()
-        current_objective, current_valid = particle.evaluate()
+        current_objective, current_valid = self._evaluate(particle)
 
         for _ in range(max_attempts):
             # Biramo slučajan zadatak
             task_idx = random.randint(0, len(self.tasks) - 1)
             current_node_id = particle.position[task_idx]
 
-            # Biramo drugi slučajan čvor
-            available_nodes = [node.id for node in particle.nodes if node.id != current_node_id]
+            # Biramo drugi slučajan čvor iz domena zadatka
+            available_nodes = [node_id for node_id in self.domains.ids_for(task_idx) if node_id != current_node_id]
             if not available_nodes:
                 continue
 
@@ -130,7 +179,7 @@ class ElectromagnetismAlgorithm:
 
             # Probamo novu dodelu
             particle.position[task_idx] = new_node_id
-            new_objective, new_valid = particle.evaluate()
+            new_objective, new_valid = self._evaluate(particle)
 
             # Prihvatamo novu dodelu ako je bolja
             if new_valid and (not current_valid or new_objective < current_objective):
@@ -139,32 +188,60 @@ class ElectromagnetismAlgorithm:
 
                 # Ažuriramo najbolje rešenje ako je potrebno
                 if new_valid and new_objective < self.best_objective:
-                    self.best_objective = new_objective
-                    self.best_particle = particle
+                    self._set_best(particle, new_objective)
             else:
                 # Vraćamo staru dodelu
                 particle.position[task_idx] = current_node_id
-                particle.evaluate()
+                self._evaluate(particle)
+
+    def population_diversity(self) -> float:
+        #Srednji udeo zadataka na kojima se čestice razlikuju od najboljeg rešenja
+        #(Hamingovo rastojanje nad pozicijama spakovanim po bitovima)
+        if self.positions is None or self.best_position is None or not len(self.tasks):
+            return 0.0
+        n_nodes = len(self.nodes)
+        packed = pack_positions(self.node_index[self.positions], n_nodes)
+        best = pack_positions(self.node_index[self.best_position], n_nodes)
+        return float(hamming_distance(packed, best[None]).mean() / len(self.tasks))
 
     def run(self):
         #Pokreće EM algoritam
+        self.trajectory = Trajectory()
+        start = self.trajectory.start
         self.initialize()
 
         for iteration in range(self.max_iterations):
+            if self.time_limit is not None and time.time() - start > self.time_limit:
+                break
+            if self.should_stop is not None and self.should_stop():
+                break
+
             # Računamo sile i pomeramo čestice
             self.calculate_forces()
 
             # Primenjujemo lokalnu pretragu na najbolju česticu
             if self.best_particle:
-                self.local_search(self.best_particle)
+                self.local_search(self.best_particle, self.local_search_attempts)
 
             # Pamtimo istoriju najboljih vrednosti za grafik
             self.history.append(self.best_objective)
+            # Raznovrsnost se računa samo kada se beleži ili ispisuje (pakovanje cele populacije)
+            report = self.verbose and (iteration + 1) % 10 == 0
+            if self.track_diversity or report:
+                diversity = self.population_diversity()
+                if self.track_diversity:
+                    self.diversity.append(diversity)
 
             # Ispisujemo napredak
-            if (iteration + 1) % 10 == 0:
+            if report:
                 print(f"Iteracija {iteration + 1}/{self.max_iterations}, "
-                      f"Najbolja vrednost: {self.best_objective:.2f}")
+                      f"Najbolja vrednost: {self.best_objective:.2f}, Raznovrsnost: {diversity:.3f}")
+
+        # Vraćamo česticu koja tačno odgovara najboljem zapamćenom rešenju
+        if self.best_position is not None:
+            best = Particle(self.tasks, self.nodes, self.domains, position=self.best_position.copy())
+            best.evaluate()
+            self.best_particle = best
 
         return self.best_particle, self.best_objective
 
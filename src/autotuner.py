@@ -0,0 +1,208 @@
+# src/autotuner.py
+import argparse
+import copy
+import functools
+import itertools
+import json
+import random
+import time
+import warnings
+from pathlib import Path
+from typing import List, Optional, Dict
+
+import numpy as np
+
+from task import Task
+from computerNode import ComputeNode
+from algorithm import ElectromagnetismAlgorithm
+from greedy import greedy_schedule
+from generator import generate_instance
+
+
+DEFAULT_CONFIG_PATH = Path(__file__).parent / 'tuned_configs.json'
+
+# Podrazumevana konfiguracija (ranije fiksirana u run_experiment)
+DEFAULT_CONFIG = {'population_size': 30, 'max_iterations': 100, 'local_search_attempts': 20}
+
+# Granice klasa po broju zadataka i po "tesnosti" (zahtev / kapacitet)
+SIZE_CLASSES = [(5, 'tiny'), (12, 'small'), (50, 'medium'), (200, 'large')]
+TIGHTNESS_CLASSES = [(0.5, 'loose'), (0.8, 'tight')]
+
+# Reprezentativne instance za svaku klasu: (zadaci, čvorovi, tesnost)
+CLASS_INSTANCES = {
+    'size': {'tiny': (4, 2), 'small': (10, 4), 'medium': (30, 6), 'large': (120, 16), 'huge': (400, 40)},
+    'tightness': {'loose': 0.35, 'tight': 0.65, 'very_tight': 0.9}
+}
+
+CANDIDATE_GRID = {
+    'population_size': [10, 20, 30, 50],
+    'max_iterations': [20, 50, 100],
+    'local_search_attempts': [5, 20, 50]
+}
+
+
+def tightness(tasks: List[Task], nodes: List[ComputeNode]) -> float:
+    """Najveći odnos ukupnog zahteva i ukupnog kapaciteta po resursu"""
+    cpu = sum(t.cpu_req for t in tasks) / sum(n.cpu_capacity for n in nodes)
+    mem = sum(t.memory_req for t in tasks) / sum(n.memory_capacity for n in nodes)
+    net = sum(t.network_req for t in tasks) / sum(n.network_capacity for n in nodes)
+    return max(cpu, mem, net)
+
+
+def instance_class(tasks: List[Task], nodes: List[ComputeNode]) -> str:
+    """Vraća ključ klase instance, npr. 'small/tight'"""
+    size = next((name for limit, name in SIZE_CLASSES if len(tasks) <= limit), 'huge')
+    ratio = tightness(tasks, nodes)
+    tight = next((name for limit, name in TIGHTNESS_CLASSES if ratio < limit), 'very_tight')
+    return f"{size}/{tight}"
+
+
+@functools.lru_cache(maxsize=16)
+def _read_configs(path: Path, mtime: Optional[int]) -> Dict[str, dict]:
+    # Keš po (putanja, vreme izmene): fajl se ponovo čita tek kada se promeni,
+    # a upozorenje za nepostojeći fajl se ispisuje jednom po putanji
+    if mtime is None:
+        warnings.warn(f"{path} ne postoji: EM koristi podrazumevanu konfiguraciju "
+                      f"(podešavanje: python autotuner.py)", stacklevel=4)
+        return {}
+    with open(path, 'r') as f:
+        return json.load(f)
+
+
+def _cached_configs(path: Optional[Path] = None) -> Dict[str, dict]:
+    path = Path(path) if path else DEFAULT_CONFIG_PATH
+    try:
+        mtime = path.stat().st_mtime_ns
+    except FileNotFoundError:
+        mtime = None
+    return _read_configs(path, mtime)
+
+
+def load_configs(path: Optional[Path] = None) -> Dict[str, dict]:
+    """Učitava podešene konfiguracije (kopija keša, sme da se menja)"""
+    return copy.deepcopy(_cached_configs(path))
+
+
+def save_configs(configs: Dict[str, dict], path: Optional[Path] = None):
+    path = Path(path) if path else DEFAULT_CONFIG_PATH
+    with open(path, 'w') as f:
+        json.dump(configs, f, indent=2)
+
+
+def best_config(tasks: List[Task], nodes: List[ComputeNode], path: Optional[Path] = None) -> dict:
+    """Vraća podešenu EM konfiguraciju za klasu instance (ili podrazumevanu)"""
+    entry = _cached_configs(path).get(instance_class(tasks, nodes))
+    config = dict(DEFAULT_CONFIG)
+    if entry:
+        config.update({k: entry[k] for k in DEFAULT_CONFIG if k in entry})
+    return config
+
+
+def run_config(config: dict, tasks: List[Task], nodes: List[ComputeNode], seed: int):
+    """Pokreće EM sa datom konfiguracijom; vraća (objective, valid, time)"""
+    random.seed(seed)
+    np.random.seed(seed)
+    em = ElectromagnetismAlgorithm(tasks, nodes,
+                                   population_size=config['population_size'],
+                                   max_iterations=config['max_iterations'],
+                                   local_search_attempts=config['local_search_attempts'],
+                                   verbose=False)
+    t0 = time.time()
+    best_particle, best_obj = em.run()
+    elapsed = time.time() - t0
+    valid = False
+    if best_particle:
+        _, valid = best_particle.evaluate()
+    return best_obj, valid, elapsed
+
+
+def race(instances, candidates: List[dict], quality_tolerance: float = 0.01,
+         verbose: bool = True) -> dict:
+    """
+    Trka konfiguracija (successive halving po instancama).
+    Posle svake instance ostaju konfiguracije čiji je prosečan gap u
+    granici tolerancije od najboljeg, najviše polovina njih; na kraju se
+    bira najbrža među onima koje dostižu traženi kvalitet.
+    """
+    stats = {i: {'gaps': [], 'times': []} for i in range(len(candidates))}
+    alive = list(range(len(candidates)))
+
+    for round_idx, (tasks, nodes, seed) in enumerate(instances):
+        # Greedy je referenca ako je bolji od svih EM pokretanja
+        _, greedy_obj, greedy_valid, _ = greedy_schedule(tasks, nodes)
+        runs = {}
+        for i in alive:
+            obj, valid, elapsed = run_config(candidates[i], tasks, nodes, seed)
+            runs[i] = (obj if valid else float('inf'), elapsed)
+
+        reference = min([obj for obj, _ in runs.values()] + ([greedy_obj] if greedy_valid else []))
+        for i, (obj, elapsed) in runs.items():
+            gap = (obj - reference) / reference if np.isfinite(obj) and reference > 0 else 1.0
+            stats[i]['gaps'].append(gap)
+            stats[i]['times'].append(elapsed)
+
+        mean_gap = {i: float(np.mean(stats[i]['gaps'])) for i in alive}
+        mean_time = {i: float(np.mean(stats[i]['times'])) for i in alive}
+        best_gap = min(mean_gap.values())
+        survivors = [i for i in alive if mean_gap[i] <= best_gap + quality_tolerance]
+        survivors.sort(key=lambda i: (mean_gap[i], mean_time[i]))
+        if round_idx < len(instances) - 1:
+            survivors = survivors[:max(2, len(alive) // 2)]
+        alive = survivors
+
+        if verbose:
+            print(f"  Round {round_idx + 1}: {len(alive)} configurations left "
+                  f"(best gap {best_gap * 100:.2f}%)")
+        if len(alive) == 1:
+            break
+
+    winner = min(alive, key=lambda i: float(np.mean(stats[i]['times'])))
+    result = dict(candidates[winner])
+    result['mean_gap'] = float(np.mean(stats[winner]['gaps']))
+    result['mean_time'] = float(np.mean(stats[winner]['times']))
+    return result
+
+
+def tune(classes: Optional[List[str]] = None, instances_per_class: int = 4,
+         quality_tolerance: float = 0.01, path: Optional[Path] = None,
+         verbose: bool = True) -> Dict[str, dict]:
+    """Podešava parametre za svaku klasu instanci i čuva ih u keš fajl"""
+    candidates = [dict(zip(CANDIDATE_GRID.keys(), values))
+                  for values in itertools.product(*CANDIDATE_GRID.values())]
+    if classes is None:
+        classes = [f"{size}/{tight}" for size in CLASS_INSTANCES['size']
+                   for tight in CLASS_INSTANCES['tightness']]
+
+    configs = load_configs(path)
+    for class_key in classes:
+        size, tight = class_key.split('/')
+        n_tasks, n_nodes = CLASS_INSTANCES['size'][size]
+        ratio = CLASS_INSTANCES['tightness'][tight]
+        instances = []
+        for seed in range(instances_per_class):
+            tasks, nodes = generate_instance(n_tasks, n_nodes, ratio, seed)
+            instances.append((tasks, nodes, seed))
+
+        if verbose:
+            print(f"\nTuning {class_key} ({n_tasks} tasks, {n_nodes} nodes, {len(candidates)} candidates)")
+        configs[class_key] = race(instances, candidates, quality_tolerance, verbose)
+        if verbose:
+            print(f"  Best: {configs[class_key]}")
+        # Čuvamo posle svake klase da se rezultat ne izgubi ako se prekine
+        save_configs(configs, path)
+
+    return configs
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Automatsko podešavanje parametara EM algoritma')
+    parser.add_argument('--classes', nargs='*', default=None, help="npr. small/tight medium/loose")
+    parser.add_argument('--instances', type=int, default=4)
+    parser.add_argument('--tolerance', type=float, default=0.01)
+    parser.add_argument('--output', default=None)
+    args = parser.parse_args()
+    tune(args.classes, args.instances, args.tolerance, args.output)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,190 @@
+# src/batch.py
+import json
+import time
+from typing import List, Tuple
+
+import numpy as np
+
+from task import Task
+from computerNode import ComputeNode
+from instance_arrays import BALANCE_WEIGHT, OVERFLOW_PENALTY
+
+
+class InstanceBatch:
+
+    #Mnogo malih nezavisnih instanci složenih u dopunjene (padded) nizove
+    #Oblici: zahtevi B×T×3, vremena B×T, kapaciteti B×N×3, maske B×T i B×N
+
+    def __init__(self, demands: List[np.ndarray], exec_times: List[np.ndarray],
+                 capacities: List[np.ndarray], node_ids: List[np.ndarray]):
+        self.size = len(demands)
+        self.n_tasks = np.array([len(d) for d in demands], dtype=int)
+        self.n_nodes = np.array([len(c) for c in capacities], dtype=int)
+        max_tasks = int(self.n_tasks.max()) if self.size else 0
+        max_nodes = int(self.n_nodes.max()) if self.size else 0
+
+        self.demand = np.zeros((self.size, max_tasks, 3))
+        self.exec_times = np.zeros((self.size, max_tasks))
+        self.task_mask = np.zeros((self.size, max_tasks), dtype=bool)
+        # Dopunjeni čvorovi dobijaju kapacitet 1 da bi deljenje bilo bezbedno
+        self.capacity = np.ones((self.size, max_nodes, 3))
+        self.node_mask = np.zeros((self.size, max_nodes), dtype=bool)
+        self.node_ids = np.zeros((self.size, max_nodes), dtype=int)
+
+        for b in range(self.size):
+            t, n = self.n_tasks[b], self.n_nodes[b]
+            self.demand[b, :t] = demands[b]
+            self.exec_times[b, :t] = exec_times[b]
+            self.task_mask[b, :t] = True
+            self.capacity[b, :n] = capacities[b]
+            self.node_mask[b, :n] = True
+            self.node_ids[b, :n] = node_ids[b]
+
+    @classmethod
+    def from_payloads(cls, payloads: List[dict]) -> 'InstanceBatch':
+        """Pravi batch direktno iz JSON rečnika ({'tasks': [...], 'nodes': [...]}) bez Task objekata"""
+        demands, exec_times, capacities, node_ids = [], [], [], []
+        for payload in payloads:
+            tasks, nodes = payload['tasks'], payload['nodes']
+            demands.append(np.array([[t['cpu_req'], t['memory_req'], t['network_req']] for t in tasks],
+                                    dtype=float).reshape(-1, 3))
+            exec_times.append(np.array([t['execution_time'] for t in tasks], dtype=float))
+            capacities.append(np.array([[n['cpu_capacity'], n['memory_capacity'], n['network_capacity']]
+                                        for n in nodes], dtype=float).reshape(-1, 3))
+            node_ids.append(np.array([n['id'] for n in nodes], dtype=int))
+        return cls(demands, exec_times, capacities, node_ids)
+
+    @classmethod
+    def from_objects(cls, instances: List[Tuple[List[Task], List[ComputeNode]]]) -> 'InstanceBatch':
+        """Pravi batch iz lista (zadaci, čvorovi)"""
+        demands, exec_times, capacities, node_ids = [], [], [], []
+        for tasks, nodes in instances:
+            demands.append(np.array([[t.cpu_req, t.memory_req, t.network_req] for t in tasks],
+                                    dtype=float).reshape(-1, 3))
+            exec_times.append(np.array([t.execution_time for t in tasks], dtype=float))
+            capacities.append(np.array([[n.cpu_capacity, n.memory_capacity, n.network_capacity]
+                                        for n in nodes], dtype=float).reshape(-1, 3))
+            node_ids.append(np.array([n.id for n in nodes], dtype=int))
+        return cls(demands, exec_times, capacities, node_ids)
+
+    @classmethod
+    def from_files(cls, paths: List[str]) -> 'InstanceBatch':
+        """Učitava test fajlove (data/*.json) u jedan batch"""
+        payloads = []
+        for path in paths:
+            with open(path, 'r') as f:
+                payloads.append(json.load(f))
+        return cls.from_payloads(payloads)
+
+    def to_node_ids(self, assignment: np.ndarray) -> List[List[int]]:
+        """Prevodi B×T indekse čvorova u liste id-jeva čvorova po instanci"""
+        ids = np.take_along_axis(self.node_ids, np.maximum(assignment, 0), axis=1)
+        return [ids[b, :self.n_tasks[b]].tolist() for b in range(self.size)]
+
+
+def _usage(batch: InstanceBatch, assignment: np.ndarray):
+    # Zauzeće po čvoru za ceo batch jednim bincount-om nad spljoštenim indeksima
+    max_nodes = batch.capacity.shape[1]
+    flat = (np.arange(batch.size)[:, None] * max_nodes + np.maximum(assignment, 0))[batch.task_mask]
+    total = batch.size * max_nodes
+    used = np.stack([np.bincount(flat, weights=batch.demand[..., r][batch.task_mask], minlength=total)
+                     for r in range(3)], axis=1).reshape(batch.size, max_nodes, 3)
+    exec_sum = np.bincount(flat, weights=batch.exec_times[batch.task_mask],
+                           minlength=total).reshape(batch.size, max_nodes)
+    counts = np.bincount(flat, minlength=total).reshape(batch.size, max_nodes)
+    return used, exec_sum, counts
+
+
+def _loads(batch: InstanceBatch, used: np.ndarray, counts: np.ndarray) -> np.ndarray:
+    loads = np.max(used / batch.capacity, axis=2)
+    return np.where(counts > 0, loads, 0.0)
+
+
+def _balance(batch: InstanceBatch, loads: np.ndarray) -> np.ndarray:
+    # Standardna devijacija samo preko stvarnih čvorova svake instance
+    n = np.maximum(batch.n_nodes, 1)
+    mean = loads.sum(axis=1) / n
+    var = (np.where(batch.node_mask, (loads - mean[:, None]) ** 2, 0.0)).sum(axis=1) / n
+    return np.where(batch.n_nodes > 1, np.sqrt(var), 0.0)
+
+
+def batch_evaluate(batch: InstanceBatch, assignment: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Vektorska evaluacija (ista ciljna funkcija kao Particle.evaluate) za ceo batch.
+    assignment je B×T niz indeksa čvorova.
+
+    Returns:
+        (objective B, valid B)
+    """
+    used, exec_sum, counts = _usage(batch, assignment)
+    loads = _loads(batch, used, counts)
+    total_execution_time = np.sum(exec_sum * (1.0 + 2.0 * loads ** 2), axis=1)
+    overflow = np.where(batch.node_mask[..., None], np.maximum(0.0, used - batch.capacity), 0.0)
+    valid = ~np.any(overflow > 0, axis=(1, 2))
+    penalty = np.where(valid, 0.0, OVERFLOW_PENALTY * overflow.sum(axis=(1, 2)))
+    return total_execution_time + BALANCE_WEIGHT * _balance(batch, loads) + penalty, valid
+
+
+def batch_greedy(batch: InstanceBatch) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Greedy algoritam (isti kao greedy_schedule) izvršen za sve instance odjednom:
+    u koraku k svaka instanca dodeljuje svoj k-ti najteži zadatak.
+
+    Returns:
+        (assignment B×T indeksa čvorova, objective B, valid B)
+    """
+    rows = np.arange(batch.size)
+    max_tasks = batch.demand.shape[1]
+
+    # Isti redosled kao greedy_schedule (stabilno sortiranje po težini, opadajuće)
+    weight = batch.demand[..., 0] + batch.demand[..., 1] / 10 + batch.demand[..., 2] / 100
+    weight = np.where(batch.task_mask, weight, -np.inf)
+    order = np.argsort(-weight, axis=1, kind='stable')
+
+    used = np.zeros_like(batch.capacity)
+    counts = np.zeros(batch.node_mask.shape, dtype=int)
+    assignment = np.full((batch.size, max_tasks), -1, dtype=int)
+
+    for k in range(max_tasks):
+        task_idx = order[:, k]
+        active = batch.task_mask[rows, task_idx]
+        d = batch.demand[rows, task_idx][:, None, :]
+
+        fits = np.all((batch.capacity - used) >= d, axis=2) & batch.node_mask
+        future = np.max((used + d) / batch.capacity, axis=2)
+        best = np.argmin(np.where(fits, future, np.inf), axis=1)
+
+        # Rezerva: najmanje opterećen čvor iako nema resursa
+        current = np.where(counts > 0, np.max(used / batch.capacity, axis=2), 0.0)
+        fallback = np.argmin(np.where(batch.node_mask, current, np.inf), axis=1)
+
+        chosen = np.where(fits.any(axis=1), best, fallback)
+        chosen_rows = rows[active]
+        chosen_nodes = chosen[active]
+        used[chosen_rows, chosen_nodes] += d[active, 0]
+        counts[chosen_rows, chosen_nodes] += 1
+        assignment[chosen_rows, task_idx[active]] = chosen_nodes
+
+    objective, valid = _greedy_objective(batch, assignment)
+    return assignment, objective, valid
+
+
+def _greedy_objective(batch: InstanceBatch, assignment: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    # Ista evaluacija kao evaluate_greedy_solution (kvadratni penal + 2000 po čvoru)
+    used, exec_sum, counts = _usage(batch, assignment)
+    loads = _loads(batch, used, counts)
+    over = np.where(batch.node_mask[..., None], np.maximum(0.0, used - batch.capacity), 0.0)
+    node_invalid = np.any(over > 0, axis=2)
+    penalty = np.sum(np.where(node_invalid, 5000 * np.sum(over ** 2, axis=2) + 2000, 0.0), axis=1)
+    total_execution_time = np.sum(exec_sum * (1.0 + 2.0 * loads ** 2), axis=1)
+    objective = total_execution_time + BALANCE_WEIGHT * _balance(batch, loads) + penalty
+    return objective, ~node_invalid.any(axis=1)
+
+
+def batch_greedy_schedule(batch: InstanceBatch) -> List[Tuple[List[int], float, bool, float]]:
+    """Batch verzija greedy_schedule; vraća isti tuple po instanci (runtime je udeo batch vremena)"""
+    start_time = time.time()
+    assignment, objective, valid = batch_greedy(batch)
+    runtime = (time.time() - start_time) / max(1, batch.size)
+    return [(assign, float(obj), bool(ok), runtime)
+            for assign, obj, ok in zip(batch.to_node_ids(assignment), objective, valid)]
@@ -0,0 +1,106 @@
+# src/bench_forces.py
+# Merenje vremena i greške približnih sila (pivoti + agregati grupa) u odnosu na tačne
+import argparse
+import time
+
+import numpy as np
+
+from forces import exact_forces, approximate_forces, normalize_charges
+from generator import generate_instance_arrays
+from instance_arrays import evaluate_assignment
+
+
+def reference_forces(positions: np.ndarray, charges: np.ndarray) -> np.ndarray:
+    # Originalna petlja po parovima iz calculate_forces (za proveru tačnih sila)
+    q = normalize_charges(charges)
+    forces = np.zeros(positions.shape, dtype=float)
+    for i in range(len(positions)):
+        for j in range(len(positions)):
+            if i != j:
+                distance_vector = positions[j] - positions[i]
+                distance = np.sqrt(np.sum(distance_vector ** 2)) + 1e-10
+                magnitude = q[i] * q[j] / (distance ** 2)
+                if q[j] > q[i]:
+                    forces[i] += magnitude * distance_vector
+                else:
+                    forces[i] -= magnitude * distance_vector
+    return forces
+
+
+def random_population(n_particles: int, n_tasks: int, n_nodes: int, seed: int = 0,
+                      clusters: int = 0, mutation: float = 0.05):
+    """
+    Slučajna populacija nad generisanom instancom; naelektrisanja iz stvarne ciljne funkcije.
+    Sa clusters > 0 čestice su mutacije nekoliko centara (kao populacija koja konvergira).
+    """
+    rng = np.random.default_rng(seed)
+    demand, exec_times, capacity = generate_instance_arrays(n_tasks, n_nodes, seed=seed)
+    positions = rng.integers(0, n_nodes, size=(n_particles, n_tasks))
+    if clusters > 0:
+        centers = rng.integers(0, n_nodes, size=(clusters, n_tasks))
+        keep = rng.random((n_particles, n_tasks)) >= mutation
+        positions = np.where(keep, centers[rng.integers(0, clusters, size=n_particles)], positions)
+    charges = np.array([1.0 / (1.0 + evaluate_assignment(p, demand, exec_times, capacity)[0])
+                        for p in positions])
+    return positions, charges
+
+
+def force_error(approx: np.ndarray, exact: np.ndarray) -> dict:
+    """Relativna greška, kosinusna sličnost i slaganje smera po zadatku"""
+    norm = np.linalg.norm(exact)
+    rows = np.linalg.norm(approx, axis=1) * np.linalg.norm(exact, axis=1)
+    cosine = np.where(rows > 0, np.einsum('ij,ij->i', approx, exact) / np.maximum(rows, 1e-300), 1.0)
+    moving = exact != 0
+    return {
+        'relative_error': float(np.linalg.norm(approx - exact) / norm) if norm > 0 else 0.0,
+        'mean_cosine': float(cosine.mean()),
+        'sign_agreement': float(np.mean(np.sign(approx[moving]) == np.sign(exact[moving]))) if moving.any() else 1.0
+    }
+
+
+def run_benchmark(sizes, n_tasks: int, n_nodes: int, top_k: int, samples: int, seed: int = 0, clusters: int = 0,
+                  check_reference: bool = True):
+    rows = []
+    for n_particles in sizes:
+        positions, charges = random_population(n_particles, n_tasks, n_nodes, seed, clusters=clusters)
+
+        t0 = time.perf_counter()
+        exact = exact_forces(positions, charges)
+        exact_time = time.perf_counter() - t0
+
+        t0 = time.perf_counter()
+        approx = approximate_forces(positions, charges, top_k=top_k, samples=samples,
+                                    rng=np.random.default_rng(seed))
+        approx_time = time.perf_counter() - t0
+
+        row = {'particles': n_particles, 'exact_s': exact_time, 'approx_s': approx_time}
+        row.update(force_error(approx, exact))
+        if check_reference and n_particles <= 100:
+            t0 = time.perf_counter()
+            reference = reference_forces(positions, charges)
+            row['loop_s'] = time.perf_counter() - t0
+            row['exact_vs_loop'] = float(np.max(np.abs(exact - reference)) / (np.max(np.abs(reference)) + 1e-300))
+        rows.append(row)
+        print(f"P={n_particles:5d}  exact {exact_time:8.4f}s  approx {approx_time:8.4f}s  "
+              f"rel.err {row['relative_error']:.3f}  cos {row['mean_cosine']:.3f}  "
+              f"sign {row['sign_agreement']:.3f}"
+              + (f"  loop {row['loop_s']:.3f}s (max dev {row['exact_vs_loop']:.1e})" if 'loop_s' in row else ''))
+    return rows
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Tačne vs. približne EM sile')
+    parser.add_argument('--sizes', type=int, nargs='+', default=[50, 200, 1000, 3000])
+    parser.add_argument('--tasks', type=int, default=500)
+    parser.add_argument('--nodes', type=int, default=50)
+    parser.add_argument('--top-k', type=int, default=16)
+    parser.add_argument('--samples', type=int, default=8)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--clusters', type=int, default=0,
+                        help='Broj centara populacije (0 = potpuno slučajna populacija)')
+    args = parser.parse_args(argv)
+    run_benchmark(args.sizes, args.tasks, args.nodes, args.top_k, args.samples, args.seed, args.clusters)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,11 +1,13 @@
 # src/brute_force.py
-from typing import List, Tuple, Optional
+from typing import List, Tuple, Optional, Callable
 import itertools
 import math
 import time
 
 from task import Task
 from computerNode import ComputeNode
+from trajectory import Trajectory
+from domains import TaskDomains, build_domains
 
 def evaluate_solution(assignments: List[int], tasks: List[Task], nodes_template: List[ComputeNode]) -> Tuple[float, bool]:
     # build node copies
@@ -37,7 +39,19 @@ def evaluate_solution(assignments: List[int], tasks: List[Task], nodes_template:
     objective = total_execution_time + 500 * load_balance + penalty
     return objective, valid
 
-def brute_force_search(tasks: List[Task], nodes: List[ComputeNode], time_limit: Optional[float]=None, prune: bool=True) -> Tuple[List[int], float, bool, float]:
+# how many search nodes pass between two reads of shared_bound
+SHARED_BOUND_POLL = 1024
+
+def brute_force_search(tasks: List[Task], nodes: List[ComputeNode], time_limit: Optional[float]=None, prune: bool=True,
+                       trajectory: Optional[Trajectory]=None, upper_bound: Optional[float]=None,
+                       should_stop: Optional[Callable[[], bool]]=None,
+                       domains: Optional[TaskDomains]=None,
+                       shared_bound: Optional[Callable[[], float]]=None) -> Tuple[List[int], float, bool, float]:
+    # upper_bound: objective of a known valid solution (e.g. greedy); branches whose
+    # lower bound exceeds it are cut. should_stop: external signal to abort the search.
+    # domains: precomputed TaskDomains of the instance (built here if not given).
+    # shared_bound: polled every SHARED_BOUND_POLL search nodes, returns the best valid
+    # objective found so far by other solvers (e.g. in a portfolio) and tightens upper_bound.
 
     n_tasks = len(tasks)
     n_nodes = len(nodes)
@@ -45,23 +59,65 @@ def brute_force_search(tasks: List[Task], nodes: List[ComputeNode], time_limit:
     best_obj = float('inf')
     best_assign = None
     best_valid = False
+    bound = upper_bound
+    visited = 0
+
+    # static domains: with prune=True a task only tries nodes it fits on alone
+    domains = domains if domains is not None else build_domains(tasks, nodes)
+    candidates = [domains.indices[i] if prune else range(n_nodes) for i in range(n_tasks)]
+    node_index = {n.id: k for k, n in enumerate(nodes)}
+    identical_nodes = len(set(domains.node_class.tolist())) < n_nodes
+
+    # remaining base execution time from each index (slowdown factor is >= 1)
+    remaining_exec = [0.0] * (n_tasks + 1)
+    for i in range(n_tasks - 1, -1, -1):
+        remaining_exec[i] = remaining_exec[i + 1] + tasks[i].execution_time
+
+    def lower_bound(next_idx, nodes_state):
+        # loads only grow, so current slowdowns and the base time of the
+        # remaining tasks can not be undercut (balance term is >= 0)
+        return sum(n.calculate_execution_time() for n in nodes_state) + remaining_exec[next_idx]
 
     # generate product of node ids
     # but we will do recursive assignment with pruning
     def rec_assign(idx, partial_assign, nodes_state):
-        nonlocal best_obj, best_assign, best_valid, start
+        nonlocal best_obj, best_assign, best_valid, start, bound, visited
         # time limit
         if time_limit is not None and (time.time() - start) > time_limit:
             raise TimeoutError("Brute force time limit reached")
+        if should_stop is not None and should_stop():
+            raise TimeoutError("Brute force stopped")
+        visited += 1
+        if shared_bound is not None and visited % SHARED_BOUND_POLL == 1:
+            shared = shared_bound()
+            if shared < float('inf'):
+                bound = shared if bound is None else min(bound, shared)
         if idx == n_tasks:
             obj, valid = evaluate_solution(partial_assign, tasks, nodes)
+            if trajectory is not None:
+                # record every improvement of the incumbent
+                trajectory.count()
+                trajectory.improve(obj, valid)
             if obj < best_obj:
                 best_obj = obj
                 best_assign = partial_assign.copy()
                 best_valid = valid
             return
         t = tasks[idx]
-        for node in nodes_state:
+        # symmetry breaking (keeps the lexicographically smallest solution of each orbit):
+        # identical tasks take non-decreasing node indices, and among identical
+        # empty nodes only the first one is tried
+        prev = domains.previous_identical[idx]
+        min_node = node_index[partial_assign[prev]] if prev >= 0 else 0
+        tried_empty = set()
+        for k in candidates[idx]:
+            if k < min_node:
+                continue
+            node = nodes_state[k]
+            if identical_nodes and not node.assigned_tasks:
+                if domains.node_class[k] in tried_empty:
+                    continue
+                tried_empty.add(domains.node_class[k])
             node_id = node.id
             # try assign
             node.cpu_used += t.cpu_req
@@ -71,8 +127,9 @@ def brute_force_search(tasks: List[Task], nodes: List[ComputeNode], time_limit:
             # prune if overflow
             overflow = (node.cpu_used > node.cpu_capacity) or (node.memory_used > node.memory_capacity) or (node.network_used > node.network_capacity)
             if not prune or not overflow:
-                # optional optimistic lower bound: minimal additional exec time is 0 -> might skip
-                rec_assign(idx + 1, partial_assign + [node_id], nodes_state)
+                # bound pruning against the known incumbent
+                if bound is None or lower_bound(idx + 1, nodes_state) <= min(bound, best_obj) + 1e-9:
+                    rec_assign(idx + 1, partial_assign + [node_id], nodes_state)
             # undo
             node.cpu_used -= t.cpu_req
             node.memory_used -= t.memory_req
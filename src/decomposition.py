@@ -0,0 +1,265 @@
+# src/decomposition.py
+import argparse
+import math
+import os
+import random
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import List, Tuple, Optional
+
+import numpy as np
+
+from task import Task
+from computerNode import ComputeNode
+from greedy import greedy_schedule
+from algorithm import ElectromagnetismAlgorithm
+from generator import arrays_to_objects, generate_instance_arrays
+from instance_arrays import tasks_to_arrays, nodes_to_arrays, AssignmentState
+
+
+GOLDEN_RATIO = (math.sqrt(5) - 1) / 2
+
+
+def _profile_classes(values: np.ndarray, reference: np.ndarray, n_size_buckets: int) -> Tuple[np.ndarray, np.ndarray]:
+    # Klasa = dominantni resurs (u odnosu na prosečan kapacitet) x kvantil veličine
+    norm = values / reference
+    dominant = np.argmax(norm, axis=1)
+    size = norm.sum(axis=1)
+    if len(size) > 1 and n_size_buckets > 1:
+        edges = np.quantile(size, np.linspace(0, 1, n_size_buckets + 1)[1:-1])
+        bucket = np.searchsorted(edges, size, side='right')
+    else:
+        bucket = np.zeros(len(size), dtype=int)
+    return dominant * n_size_buckets + bucket, size
+
+
+def classify_nodes(capacity: np.ndarray, n_size_buckets: int = 4) -> Tuple[np.ndarray, np.ndarray]:
+    """Deli čvorove u klase kapaciteta; vraća (klasa, relativna veličina)"""
+    return _profile_classes(capacity, capacity.mean(axis=0), n_size_buckets)
+
+
+def classify_tasks(demand: np.ndarray, capacity: np.ndarray, n_size_buckets: int = 4) -> Tuple[np.ndarray, np.ndarray]:
+    """Deli zadatke po profilu zahteva; vraća (klasa, relativna veličina)"""
+    return _profile_classes(demand, capacity.mean(axis=0), n_size_buckets)
+
+
+def partition(demand: np.ndarray, capacity: np.ndarray,
+              max_tasks_per_part: int = 2000) -> List[Tuple[np.ndarray, np.ndarray]]:
+    """
+    Deli instancu na podprobleme (indeksi_zadataka, indeksi_čvorova).
+    Svaki podproblem dobija stratifikovan uzorak klasa čvorova i klasa
+    zadataka, a broj zadataka je srazmeran kapacitetu njegovih čvorova.
+    """
+    n_tasks, n_nodes = len(demand), len(capacity)
+    n_parts = max(1, min(n_nodes, math.ceil(n_tasks / max_tasks_per_part)))
+
+    # Čvorovi: grupisani po klasi, pa po veličini, dele se kružno
+    node_class, node_size = classify_nodes(capacity)
+    node_order = np.lexsort((-node_size, node_class))
+    node_part = np.empty(n_nodes, dtype=int)
+    node_part[node_order] = np.arange(n_nodes) % n_parts
+
+    # Udeo kapaciteta svakog dela (normalizovano po resursu)
+    rel_capacity = (capacity / capacity.sum(axis=0)).sum(axis=1)
+    part_share = np.bincount(node_part, weights=rel_capacity, minlength=n_parts)
+    cum_share = np.cumsum(part_share / part_share.sum())
+    cum_share[-1] = 1.0
+
+    # Zadaci: grupisani po klasi i veličini, raspoređeni niskodiskrepantnim nizom
+    # tako da svaki deo dobije srazmeran uzorak iz svake grupe
+    task_class, task_size = classify_tasks(demand, capacity)
+    task_order = np.lexsort((-task_size, task_class))
+    u = (np.arange(n_tasks) * GOLDEN_RATIO) % 1.0
+    task_part = np.empty(n_tasks, dtype=int)
+    task_part[task_order] = np.searchsorted(cum_share, u, side='right')
+    task_part = np.minimum(task_part, n_parts - 1)
+
+    parts = []
+    for p in range(n_parts):
+        parts.append((np.flatnonzero(task_part == p), np.flatnonzero(node_part == p)))
+    return parts
+
+
+def _solve_part(args) -> np.ndarray:
+    # Rešava jedan podproblem postojećim solverom; vraća lokalne indekse čvorova
+    # deadline je apsolutni rok (time.time()) ili None, budget deo vremena za ovaj
+    # podproblem, seed seme podproblema ili None
+    demand, exec_times, capacity, solver, solver_params, deadline, budget, seed = args
+    if len(demand) == 0:
+        return np.zeros(0, dtype=int)
+    tasks, nodes = arrays_to_objects(demand, exec_times, capacity)
+    if deadline is not None and time.time() >= deadline:
+        solver = 'greedy'  # Budžet je potrošen: preostali podproblemi dobijaju brzo rešenje
+
+    if solver == 'greedy':
+        assign, _, _, _ = greedy_schedule(tasks, nodes)
+        return np.array(assign, dtype=int)
+    if solver == 'em':
+        if seed is not None:
+            random.seed(seed)
+            np.random.seed(seed)
+        em = ElectromagnetismAlgorithm(tasks, nodes,
+                                       population_size=solver_params.get('population_size', 10),
+                                       max_iterations=solver_params.get('max_iterations', 20),
+                                       time_limit=min(budget, max(0.0, deadline - time.time()))
+                                       if deadline is not None else None)
+        best_particle, _ = em.run()
+        return np.array(best_particle.position, dtype=int)
+    raise ValueError(f"Nepoznat solver: {solver}")
+
+
+def stitch(state: AssignmentState, max_rounds: int = 200, n_pairs: int = 32, task_sample: int = 64,
+           time_limit: Optional[float] = None, seed: int = 0) -> int:
+    """
+    Globalni prolaz koji vraća balans između delova: premešta zadatke
+    sa najopterećenijih na najmanje opterećene čvorove dok god to smanjuje cilj.
+    Vraća broj izvršenih premeštanja.
+    """
+    rng = np.random.default_rng(seed)
+    start = time.time()
+    n_pairs = max(1, min(n_pairs, state.n_nodes // 2))
+    moves = 0
+
+    for _ in range(max_rounds):
+        if time_limit is not None and time.time() - start > time_limit:
+            break
+        by_load = np.argsort(state.loads)
+        heavy = by_load[::-1][:n_pairs]
+        light = by_load[:n_pairs]
+
+        # Zadaci grupisani po čvoru (sortiranjem dodele)
+        order = np.argsort(state.assignment, kind='stable')
+        starts = np.concatenate(([0], np.cumsum(state.counts)[:-1]))
+
+        improved = False
+        for h in heavy:
+            node_tasks = order[starts[h]:starts[h] + state.counts[h]]
+            if len(node_tasks) == 0:
+                continue
+            if len(node_tasks) > task_sample:
+                node_tasks = rng.choice(node_tasks, size=task_sample, replace=False)
+
+            delta, overflow = state.relocate_delta(node_tasks[:, None], light[None, :])
+            # Ne prihvatamo premeštanja koja povećavaju prekoračenje kapaciteta
+            delta = np.where(overflow > state.total_overflow + 1e-9, np.inf, delta)
+            best = np.unravel_index(np.argmin(delta), delta.shape)
+            if delta[best] < -1e-9:
+                state.relocate(int(node_tasks[best[0]]), int(light[best[1]]))
+                moves += 1
+                improved = True
+
+        if not improved:
+            break
+
+    state.refresh()
+    return moves
+
+
+def decompose_arrays(demand: np.ndarray, exec_times: np.ndarray, capacity: np.ndarray,
+                     solver: str = 'greedy', solver_params: Optional[dict] = None,
+                     max_tasks_per_part: int = 2000, workers: Optional[int] = None,
+                     stitch_rounds: int = 200, stitch_time_limit: Optional[float] = None,
+                     verbose: bool = False, time_limit: Optional[float] = None,
+                     seed: Optional[int] = None) -> Tuple[np.ndarray, float, bool]:
+    """
+    Dekompoziciono rešavanje nad nizovima.
+    time_limit ograničava ceo postupak (EM podproblemi i spajanje dobijaju
+    preostalo vreme); seed daje ponovljive EM podprobleme i spajanje.
+
+    Returns:
+        (dodela kao indeksi čvorova, objective, valid)
+    """
+    solver_params = solver_params or {}
+    t0 = time.time()
+    deadline = t0 + time_limit if time_limit is not None else None
+    parts = partition(demand, capacity, max_tasks_per_part)
+    if verbose:
+        print(f"  Partitioned into {len(parts)} subproblems ({time.time() - t0:.2f}s)")
+
+    workers = workers or os.cpu_count() or 1
+    # Svaki podproblem dobija ravnomeran deo budžeta (delovi se izvršavaju u talasima po workers)
+    budget = time_limit * min(1.0, workers / max(1, len(parts))) if time_limit is not None else None
+    jobs = [(demand[t_idx], exec_times[t_idx], capacity[n_idx], solver, solver_params, deadline, budget,
+             seed + p if seed is not None else None)
+            for p, (t_idx, n_idx) in enumerate(parts)]
+    t1 = time.time()
+    if workers > 1 and len(jobs) > 1:
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            chunksize = max(1, len(jobs) // (workers * 4))
+            local_results = list(executor.map(_solve_part, jobs, chunksize=chunksize))
+    else:
+        local_results = [_solve_part(job) for job in jobs]
+    if verbose:
+        print(f"  Solved subproblems with {solver} on {workers} workers ({time.time() - t1:.2f}s)")
+
+    assignment = np.zeros(len(demand), dtype=int)
+    for (t_idx, n_idx), local in zip(parts, local_results):
+        assignment[t_idx] = n_idx[local]
+
+    t2 = time.time()
+    state = AssignmentState(assignment, demand, exec_times, capacity)
+    before = state.objective()
+    if deadline is not None:
+        remaining = max(0.0, deadline - time.time())
+        stitch_time_limit = remaining if stitch_time_limit is None else min(stitch_time_limit, remaining)
+    moves = stitch(state, max_rounds=stitch_rounds, time_limit=stitch_time_limit,
+                   seed=seed if seed is not None else 0)
+    if verbose:
+        print(f"  Stitching: {moves} moves, objective {before:.2f} -> {state.objective():.2f} "
+              f"({time.time() - t2:.2f}s)")
+
+    return state.assignment, state.objective(), state.is_valid()
+
+
+def decomposition_solve(tasks: List[Task], nodes: List[ComputeNode], solver: str = 'greedy',
+                        solver_params: Optional[dict] = None, max_tasks_per_part: int = 2000,
+                        workers: Optional[int] = None, stitch_rounds: int = 200,
+                        time_limit: Optional[float] = None,
+                        seed: Optional[int] = None) -> Tuple[List[int], float, bool, float]:
+    """
+    Dekompozicioni solver za velike instance.
+
+    Returns:
+        (assignment, objective, valid, runtime)
+    """
+    start_time = time.time()
+    demand, exec_times = tasks_to_arrays(tasks)
+    capacity, node_ids = nodes_to_arrays(nodes)
+    assignment, objective, valid = decompose_arrays(demand, exec_times, capacity, solver=solver,
+                                                    solver_params=solver_params,
+                                                    max_tasks_per_part=max_tasks_per_part,
+                                                    workers=workers, stitch_rounds=stitch_rounds,
+                                                    time_limit=time_limit, seed=seed)
+    runtime = time.time() - start_time
+    return [int(node_ids[i]) for i in assignment], objective, valid, runtime
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Dekompozicioni solver na generisanoj instanci')
+    parser.add_argument('--tasks', type=int, default=1000000)
+    parser.add_argument('--nodes', type=int, default=20000)
+    parser.add_argument('--tightness', type=float, default=0.6)
+    parser.add_argument('--solver', default='greedy', choices=['greedy', 'em'])
+    parser.add_argument('--part-size', type=int, default=2000)
+    parser.add_argument('--workers', type=int, default=None)
+    parser.add_argument('--time-limit', type=float, default=None,
+                        help='Vremenski budžet celog postupka u sekundama (deli se na podprobleme)')
+    parser.add_argument('--seed', type=int, default=0, help='Seme generatora instance i solvera podproblema')
+    args = parser.parse_args()
+
+    t0 = time.time()
+    demand, exec_times, capacity = generate_instance_arrays(args.tasks, args.nodes, args.tightness, args.seed)
+    print(f"Generated {args.tasks:,} tasks x {args.nodes:,} nodes ({time.time() - t0:.2f}s)")
+
+    t1 = time.time()
+    _, objective, valid = decompose_arrays(demand, exec_times, capacity, solver=args.solver,
+                                           max_tasks_per_part=args.part_size,
+                                           workers=args.workers, verbose=True,
+                                           time_limit=args.time_limit, seed=args.seed)
+    print(f"Objective: {objective:.2f}")
+    print(f"Valid: {valid}")
+    print(f"Time: {time.time() - t1:.2f}s")
+
+
+if __name__ == "__main__":
+    main()
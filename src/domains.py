@@ -0,0 +1,163 @@
+# src/domains.py
+import math
+from typing import List
+
+import numpy as np
+
+from task import Task
+from computerNode import ComputeNode
+from instance_arrays import tasks_to_arrays, nodes_to_arrays
+
+
+class _TaskIndices:
+
+    #Indeksi čvorova u domenu svakog zadatka, računaju se tek kada se zatraže
+    #(lista za sve zadatke odjednom bila bi T×N int64)
+
+    def __init__(self, feasible: np.ndarray):
+        self.feasible = feasible
+        self._cache = {}
+
+    def __len__(self):
+        return len(self.feasible)
+
+    def __getitem__(self, task_idx: int) -> np.ndarray:
+        if task_idx not in self._cache:
+            self._cache[task_idx] = np.flatnonzero(self.feasible[task_idx])
+        return self._cache[task_idx]
+
+
+class TaskDomains:
+
+    #Statička redukcija domena pre pretrage: za svaki zadatak skup čvorova
+    #čiji UKUPAN kapacitet može da ga primi (čvor van domena daje nevalidno rešenje
+    #bez obzira na ostale zadatke), plus klase identičnih zadataka i čvorova.
+    #Odmah se računa samo matrica feasible; ostalo (dominacija, klase, statistike)
+    #tek pri prvom pristupu, jer ga koristi samo simetrijsko odsecanje u pretrazi
+
+    def __init__(self, tasks: List[Task], nodes: List[ComputeNode]):
+        self.demand, self.exec_times = tasks_to_arrays(tasks)
+        self.capacity, self.node_ids = nodes_to_arrays(nodes)
+        self.n_tasks, self.n_nodes = len(tasks), len(nodes)
+
+        # feasible[t, k]: zadatak t sam staje na čvor k (po resursu, bez T×N×3 međuniza)
+        feasible = np.ones((self.n_tasks, self.n_nodes), dtype=bool)
+        for r in range(3):
+            feasible &= self.demand[:, r, None] <= self.capacity[None, :, r]
+        # Zadatak koji ne staje nigde zadržava pun domen (rešenje je ionako
+        # nevalidno, a pretraga kroz penal i dalje ima kuda da ide)
+        self.infeasible_tasks = np.flatnonzero(~feasible.any(axis=1))
+        feasible[self.infeasible_tasks] = True
+        self.feasible = feasible
+
+        # Indeksi čvorova u domenu svakog zadatka (id-jevi se prave po potrebi)
+        self.indices = _TaskIndices(feasible)
+        self._ids = {}
+        self.full = bool(feasible.all())
+        self._neighbors = None
+        self._dominated_nodes = None
+        self._node_class = None
+        self._previous_identical = None
+
+    @property
+    def fixed_tasks(self) -> dict:
+        """Zadaci sa jednim dozvoljenim čvorom: {zadatak: indeks čvora}"""
+        sizes = self.feasible.sum(axis=1)
+        return {int(t): int(np.argmax(self.feasible[t])) for t in np.flatnonzero(sizes == 1)}
+
+    @property
+    def everywhere_tasks(self) -> np.ndarray:
+        return np.flatnonzero(self.feasible.all(axis=1))
+
+    @property
+    def unusable_nodes(self) -> np.ndarray:
+        """Čvorovi koji ne mogu da prime nijedan zadatak ni sami"""
+        return np.flatnonzero(~self.feasible.any(axis=0))
+
+    @property
+    def dominated_nodes(self) -> np.ndarray:
+        """
+        Čvor je dominiran ako postoji čvor koji je po svim resursima bar
+        toliko jak, a po nekom jači (domen dominiranog čvora je podskup)
+        """
+        if self._dominated_nodes is None:
+            capacity = self.capacity
+            ge = np.all(capacity[:, None, :] >= capacity[None, :, :], axis=2)
+            gt = np.any(capacity[:, None, :] > capacity[None, :, :], axis=2)
+            self._dominated_nodes = np.flatnonzero((ge & gt).any(axis=0))
+        return self._dominated_nodes
+
+    @property
+    def node_class(self) -> np.ndarray:
+        """Klase identičnih čvorova (isti kapaciteti)"""
+        if self._node_class is None:
+            self._node_class = _class_labels(self.capacity)
+        return self._node_class
+
+    @property
+    def previous_identical(self) -> np.ndarray:
+        """previous_identical[t] je prethodni zadatak iz iste klase identičnih zadataka ili -1"""
+        if self._previous_identical is None:
+            task_class = _class_labels(np.column_stack([self.demand, self.exec_times]))
+            order = np.argsort(task_class, kind='stable')
+            previous = np.full(self.n_tasks, -1, dtype=int)
+            same = task_class[order[1:]] == task_class[order[:-1]]
+            previous[order[1:][same]] = order[:-1][same]
+            self._previous_identical = previous
+        return self._previous_identical
+
+    def ids_for(self, task_idx: int) -> List[int]:
+        """Id-jevi čvorova u domenu zadatka"""
+        if task_idx not in self._ids:
+            self._ids[task_idx] = self.node_ids[self.indices[task_idx]].tolist()
+        return self._ids[task_idx]
+
+    def neighbor_tables(self):
+        """
+        Tabele T×N (indeksi čvorova): sledeći i prethodni čvor iz domena zadatka
+        posle čvora k u kružnom redosledu (k ako u domenu nema drugog čvora).
+        Vraća None kada su svi domeni puni (tada je dovoljno (k ± 1) mod N).
+        """
+        if self.full:
+            return None
+        if self._neighbors is None:
+            n = self.n_nodes
+            doubled = np.concatenate([self.feasible, self.feasible], axis=1)
+            positions = np.arange(2 * n)
+            # Najbliži čvor iz domena desno (minimum sufiksa) i levo (maksimum prefiksa)
+            right = np.minimum.accumulate(np.where(doubled, positions, 2 * n)[:, ::-1], axis=1)[:, ::-1]
+            left = np.maximum.accumulate(np.where(doubled, positions, -1), axis=1)
+            k = np.arange(n)
+            self._neighbors = (right[:, k + 1] % n, left[:, k + n - 1] % n)
+        return self._neighbors
+
+    def summary(self) -> dict:
+        """Veličina prostora pretrage pre i posle redukcije (log10 broja rasporeda)"""
+        sizes = self.feasible.sum(axis=1)
+        return {
+            'tasks': self.n_tasks,
+            'nodes': self.n_nodes,
+            'fixed_tasks': len(self.fixed_tasks),
+            'everywhere_tasks': len(self.everywhere_tasks),
+            'infeasible_tasks': len(self.infeasible_tasks),
+            'unusable_nodes': len(self.unusable_nodes),
+            'dominated_nodes': len(self.dominated_nodes),
+            'node_classes': int(self.node_class.max()) + 1 if self.n_nodes else 0,
+            'log10_space': self.n_tasks * math.log10(max(1, self.n_nodes)),
+            'log10_reduced': float(np.sum(np.log10(np.maximum(sizes, 1))))
+        }
+
+
+def _class_labels(rows: np.ndarray) -> np.ndarray:
+    # Redni broj klase jednakih redova (redosled prve pojave)
+    if len(rows) == 0:
+        return np.zeros(0, dtype=int)
+    _, first, inverse = np.unique(rows, axis=0, return_index=True, return_inverse=True)
+    rank = np.empty(len(first), dtype=int)
+    rank[np.argsort(first)] = np.arange(len(first))
+    return rank[inverse.ravel()]
+
+
+def build_domains(tasks: List[Task], nodes: List[ComputeNode]) -> TaskDomains:
+    """Računa domene zadataka za instancu"""
+    return TaskDomains(tasks, nodes)
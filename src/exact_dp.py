@@ -0,0 +1,290 @@
+# src/exact_dp.py
+import time
+from typing import List, Tuple, Optional, Callable
+
+import numpy as np
+
+from task import Task
+from computerNode import ComputeNode
+from tabu import tabu_search
+from instance_arrays import tasks_to_arrays, nodes_to_arrays, ids_to_indices, evaluate_assignment
+from instance_arrays import BALANCE_WEIGHT
+from trajectory import Trajectory
+from domains import TaskDomains, build_domains
+
+# Egzaktni solver za instance sa malo čvorova (i proizvoljno mnogo zadataka).
+# Ciljna funkcija zavisi samo od agregata po čvoru (zauzeće 3 resursa, zbir
+# vremena izvršavanja, da li je čvor prazan), pa je stanje posle dodele prvih
+# i zadataka vektor tih agregata. Stanja sa istim agregatima se spajaju
+# (identični zadaci ili različit redosled istih zadataka daju isto stanje),
+# a stanja koja se razlikuju samo permutacijom identičnih čvorova su ista.
+# Broj stanja raste sa brojem različitih zbirova po čvoru, a ne sa nodes ** tasks.
+
+
+# Najveći deo sloja koji se širi odjednom (između delova se proverava rok)
+EXPAND_CHUNK = 65536
+
+# Najveći broj zadataka po broju čvorova za koji dp_search sa podrazumevanim
+# max_states dokazuje optimum (izmereno na generisanim instancama, tightness 0.6);
+# za veće instance slojevi prerastaju max_states i rezultat je samo heuristika
+EXACT_MAX_TASKS = {1: float('inf'), 2: 25, 3: 17, 4: 14, 5: 13, 6: 12, 7: 11, 8: 10}
+
+
+def proves_optimality(n_tasks: int, n_nodes: int) -> bool:
+    """Da li je instanca u opsegu u kome dp_search dokazuje optimum (EXACT_MAX_TASKS)"""
+    return n_tasks <= EXACT_MAX_TASKS.get(n_nodes, 0)
+
+
+def _quantize(values: np.ndarray, resolution: float) -> np.ndarray:
+    # Celobrojni ključ (zbirovi realnih brojeva se razlikuju u poslednjim bitovima)
+    return np.round(values / resolution).astype(np.int64)
+
+
+def _row_ids(rows: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    # Redni broj različitog reda za svaki red i indeks prve pojave svakog reda
+    # (kao np.unique(axis=0), ali lexsort nad celobrojnim kolonama je znatno brži)
+    order = np.lexsort(rows.T[::-1])
+    sorted_rows = rows[order]
+    new = np.ones(len(rows), dtype=bool)
+    new[1:] = np.any(sorted_rows[1:] != sorted_rows[:-1], axis=1)
+    ids = np.empty(len(rows), dtype=np.int64)
+    ids[order] = np.cumsum(new) - 1
+    return ids, order[new]
+
+
+def _assigned_bound(exec_sum: np.ndarray, loads: np.ndarray, capacity: np.ndarray,
+                    total_demand: np.ndarray) -> np.ndarray:
+    # Donja granica za zbir exec_sum_k * (1 + 2 L_k^2) po KONAČNIM opterećenjima:
+    # L_k je između trenutnog opterećenja i 1 (stanja su validna), a za svaki
+    # resurs r važi sum_k cap_kr * L_k >= ukupan zahtev r svih zadataka.
+    # Relaksacija sa jednim resursom ima rešenje L_k = clip(mu * cap_kr / (2 E_k), l_k, 1)
+    # (prazan zbir vremena: L_k = 1), a kapacitet sum_k cap_kr * L_k je po delovima
+    # linearan u mu sa prelomima u l_k * 2 E_k / cap_kr i 2 E_k / cap_kr, pa se mu
+    # nalazi tačno, interpolacijom između preloma. Vraća najjaču od tri granice.
+    bound = np.sum(exec_sum * (1.0 + 2.0 * loads ** 2), axis=1)
+    weight = 2.0 * exec_sum
+    safe_weight = np.where(weight > 0, weight, 1.0)
+    for r in range(3):
+        cap = capacity[None, :, r]
+        short = np.flatnonzero(np.sum(cap * loads, axis=1) < total_demand[r] - 1e-12)
+        if len(short) == 0:
+            continue
+        w, safe_w, low_load = weight[short, None, :], safe_weight[short, None, :], loads[short, None, :]
+
+        def relaxed(mu):
+            # Opterećenja za množioce mu (S×M) -> S×M×N
+            return np.clip(np.where(w > 0, mu[:, :, None] * cap / safe_w, 1.0), low_load, 1.0)
+
+        breaks = np.sort(np.concatenate([low_load[:, 0] * w[:, 0] / cap[0], w[:, 0] / cap[0]], axis=1), axis=1)
+        breaks = np.concatenate([np.zeros((len(short), 1)), breaks], axis=1)
+        supply = np.sum(cap * relaxed(breaks), axis=2)
+        # Prvi prelom na kome kapacitet dostiže zahtev (poslednji ako ga ne dostiže nijedan)
+        after = np.where(np.any(supply >= total_demand[r], axis=1), np.argmax(supply >= total_demand[r], axis=1),
+                         breaks.shape[1] - 1)
+        before = np.maximum(after - 1, 0)
+        rows = np.arange(len(short))
+        mu0, mu1 = breaks[rows, before], breaks[rows, after]
+        s0, s1 = supply[rows, before], supply[rows, after]
+        step = np.where(s1 > s0, (total_demand[r] - s0) / np.where(s1 > s0, s1 - s0, 1.0), 0.0)
+        mu = np.where(after == 0, 0.0, mu0 + np.clip(step, 0.0, 1.0) * (mu1 - mu0))
+        final = relaxed(mu[:, None])[:, 0]
+        bound[short] = np.maximum(bound[short], np.sum(exec_sum[short] * (1.0 + 2.0 * final ** 2), axis=1))
+    return bound
+
+
+def dp_search(tasks: List[Task], nodes: List[ComputeNode], time_limit: Optional[float] = None,
+              trajectory: Optional[Trajectory] = None, upper_bound: Optional[float] = None,
+              should_stop: Optional[Callable[[], bool]] = None, resolution: float = 1e-6,
+              max_states: int = 200000, initial_assignment: Optional[List[int]] = None,
+              report: Optional[dict] = None,
+              domains: Optional[TaskDomains] = None) -> Tuple[List[int], float, bool, float]:
+    """
+    Dinamičko programiranje po zadacima nad stanjima agregata po čvorovima.
+
+    Zadaci se dodeljuju po opadajućoj veličini (identični zadaci uzastopno);
+    u svakom sloju se svako stanje širi na čvorove iz domena zadatka,
+    odbacuju se stanja sa prekoračenim kapacitetom, spajaju se stanja sa istim
+    ključem (agregati zaokruženi na resolution, čvorovi iste klase sortirani)
+    i odsecaju stanja čija donja granica prelazi gornju (početno rešenje iz
+    kratke tabu pretrage ili initial_assignment, odnosno upper_bound). Kao i
+    brute_force_search sa prune=True, traži samo validna rešenja.
+
+    Sloj se širi u delovima od najviše EXPAND_CHUNK novih stanja; između delova
+    se proveravaju rok i should_stop, a sloj se spaja čim pređe 2 * max_states,
+    pa memorija ostaje reda max_states stanja. Kada broj stanja posle
+    spajanja pređe max_states, zadržava se max_states stanja sa najmanjom
+    donjom granicom (beam), a kada istekne vreme vraća se početno rešenje;
+    tada rezultat nije dokazan optimum (optimum se pouzdano dokazuje samo
+    u opsegu EXACT_MAX_TASKS, videti proves_optimality). Ako je prosleđen report, u njega se
+    upisuju 'proven', 'max_states' (najveći zadržani sloj), 'beam_layers'
+    (slojevi skraćeni na max_states) i 'layers'.
+    domains su unapred izračunati domeni instance (dele se i sa početnom tabu pretragom).
+
+    Returns:
+        (assignment, objective, valid, runtime)
+    """
+    start_time = time.time()
+    demand, exec_times = tasks_to_arrays(tasks)
+    capacity, node_ids = nodes_to_arrays(nodes)
+    n_tasks, n_nodes = len(tasks), len(nodes)
+    domains = domains if domains is not None else build_domains(tasks, nodes)
+
+    report = report if report is not None else {}
+    report.update(proven=False, max_states=0, beam_layers=0, layers=0)
+
+    def out_of_time():
+        if time_limit is not None and time.time() - start_time > time_limit:
+            return True
+        return should_stop is not None and should_stop()
+
+    # Početna gornja granica: kratka tabu pretraga (ili prosleđen raspored), ako je validna
+    best_assignment, best_objective, best_valid = None, float('inf'), False
+    if initial_assignment is None and not n_tasks:
+        initial_assignment = []
+    elif initial_assignment is None and n_nodes:
+        initial_assignment = tabu_search(tasks, nodes, seed=0, domains=domains,
+                                         time_limit=0.1 * time_limit if time_limit is not None else None)[0]
+    if initial_assignment is not None:
+        objective, valid = evaluate_assignment(ids_to_indices(initial_assignment, node_ids), demand,
+                                               exec_times, capacity)
+        if trajectory is not None:
+            trajectory.count()
+            trajectory.improve(objective, valid)
+        if valid:
+            best_assignment, best_objective, best_valid = list(initial_assignment), objective, True
+    bound = min(best_objective, upper_bound if upper_bound is not None else float('inf'))
+
+    if n_tasks == 0 or n_nodes == 0:
+        report['proven'] = True
+        return best_assignment, best_objective, best_valid, time.time() - start_time
+
+    # Redosled: veći zadaci prvo (ranije odsecanje po kapacitetu), identični zadaci uzastopno
+    size = np.max(demand / capacity.mean(axis=0), axis=1)
+    _, task_class = np.unique(np.column_stack([demand, exec_times]), axis=0, return_inverse=True)
+    order = np.lexsort((task_class.ravel(), -size))
+    total_demand = demand.sum(axis=0)
+
+    # Sopstveno opterećenje zadatka na najpogodnijem čvoru iz domena (za donju granicu)
+    own_load = np.where(domains.feasible, np.max(demand[:, None, :] / capacity[None, :, :], axis=2), np.inf)
+    own_load = own_load.min(axis=1)
+
+    # Grupe identičnih čvorova (kolone koje se sortiraju u ključu stanja)
+    node_groups = [np.flatnonzero(domains.node_class == c) for c in np.unique(domains.node_class)]
+    node_groups = [group for group in node_groups if len(group) > 1]
+
+    def expand(states, layer, t):
+        # Širi stanja na čvorove iz domena zadatka t; vraća preživela stanja
+        # (bez prekoračenja kapaciteta i sa donjom granicom do bound)
+        used, exec_sum, nonempty = states
+        candidates = domains.indices[t]
+        parent = np.repeat(np.arange(len(used)), len(candidates))
+        choice = np.tile(candidates, len(used))
+        rows = np.arange(len(parent))
+        used = used[parent]
+        used[rows, choice] += demand[t]
+        exec_sum = exec_sum[parent]
+        exec_sum[rows, choice] += exec_times[t]
+        nonempty = nonempty[parent]
+        nonempty[rows, choice] = True
+        keep = np.flatnonzero(np.all(used[rows, choice] <= capacity[choice], axis=1))
+        used, exec_sum, nonempty, parent, choice = used[keep], exec_sum[keep], nonempty[keep], parent[keep], choice[keep]
+
+        # Donja granica: dodeljeni zadaci po najmanjim mogućim konačnim opterećenjima
+        # (_assigned_bound) + preostali zadaci, svaki bar sa usporenjem
+        # max(najmanje trenutno opterećenje, sopstveno opterećenje)
+        loads = np.where(nonempty, np.max(used / capacity, axis=2), 0.0)
+        rest = order[layer + 1:]
+        rest = rest[np.argsort(own_load[rest])]
+        rest_loads, rest_exec = own_load[rest], exec_times[rest]
+        below_exec = np.concatenate([[0.0], np.cumsum(rest_exec)])
+        above = np.concatenate([np.cumsum((rest_exec * (1.0 + 2.0 * rest_loads ** 2))[::-1])[::-1], [0.0]])
+        min_load = loads.min(axis=1)
+        split = np.searchsorted(rest_loads, min_load, side='right')
+        rest_lower = below_exec[split] * (1.0 + 2.0 * min_load ** 2) + above[split]
+        # Prvo jeftina granica (trenutna opterećenja), pa relaksacija samo za preživela stanja
+        current = np.sum(exec_sum * (1.0 + 2.0 * loads ** 2), axis=1)
+        keep = np.flatnonzero(current + rest_lower <= bound + 1e-9)
+        lower = rest_lower[keep] + _assigned_bound(exec_sum[keep], loads[keep], capacity, total_demand)
+        keep, lower = keep[lower <= bound + 1e-9], lower[lower <= bound + 1e-9]
+        return used[keep], exec_sum[keep], nonempty[keep], parent[keep], choice[keep], lower
+
+    def merge(layer_states):
+        # Spajanje istih stanja (do na permutaciju identičnih čvorova) i beam do max_states
+        used, exec_sum, nonempty, parent, choice, lower = layer_states
+        if len(used):
+            node_rows = np.concatenate([_quantize(used, resolution),
+                                        _quantize(exec_sum, resolution)[:, :, None],
+                                        nonempty[:, :, None].astype(np.int64)], axis=2)
+            node_key = _row_ids(node_rows.reshape(-1, 5))[0].reshape(len(used), n_nodes)
+            for group in node_groups:
+                node_key[:, group] = np.sort(node_key[:, group], axis=1)
+            kept = np.sort(_row_ids(node_key)[1])
+        else:
+            kept = np.zeros(0, dtype=int)
+        truncated = len(kept) > max_states
+        if truncated:
+            # Prevelik sloj: zadržavamo stanja sa najmanjom donjom granicom
+            kept = np.sort(kept[np.argpartition(lower[kept], max_states)[:max_states]])
+        return tuple(a[kept] for a in layer_states), truncated
+
+    # Stanja: zauzeće S×N×3, zbir vremena S×N, neprazan čvor S×N
+    states = (np.zeros((1, n_nodes, 3)), np.zeros((1, n_nodes)), np.zeros((1, n_nodes), dtype=bool))
+    parents, choices = [], []  # Po sloju: indeks roditeljskog stanja i izabrani čvor
+    exact = True  # Nijedno stanje nije odbačeno zbog max_states
+    interrupted = False
+
+    for layer, t in enumerate(order):
+        # Širenje u delovima od najviše EXPAND_CHUNK novih stanja
+        chunk = max(1, min(max_states, EXPAND_CHUNK) // len(domains.indices[t]))
+        layer_states = None
+        for begin in range(0, len(states[0]), chunk):
+            if out_of_time():
+                interrupted = True
+                break
+            part = expand(tuple(a[begin:begin + chunk] for a in states), layer, t)
+            part = part[:3] + (part[3] + begin,) + part[4:]
+            if trajectory is not None:
+                trajectory.count(min(chunk, len(states[0]) - begin) * len(domains.indices[t]))
+            layer_states = part if layer_states is None else \
+                tuple(np.concatenate([a, b]) for a, b in zip(layer_states, part))
+            if len(layer_states[0]) > 2 * max_states:
+                layer_states, truncated = merge(layer_states)
+                exact &= not truncated
+                report['beam_layers'] += int(truncated)
+        if interrupted:
+            break
+        (used, exec_sum, nonempty, parent, choice, _), truncated = merge(layer_states)
+        exact &= not truncated
+        report['beam_layers'] += int(truncated)
+        report['max_states'] = max(report['max_states'], len(used))
+        states = (used, exec_sum, nonempty)
+        parents.append(parent)
+        choices.append(choice)
+        report['layers'] = len(parents)
+        if len(used) == 0:
+            # Nijedno stanje ne može da popravi gornju granicu: početno rešenje je optimum
+            report['proven'] = exact
+            break
+
+    used, exec_sum, nonempty = states
+    if len(parents) == n_tasks and len(used):
+        # Konačna stanja: tačna ciljna funkcija (sva su validna)
+        loads = np.where(nonempty, np.max(used / capacity, axis=2), 0.0)
+        objectives = np.sum(exec_sum * (1.0 + 2.0 * loads ** 2), axis=1)
+        if n_nodes > 1:
+            objectives = objectives + BALANCE_WEIGHT * np.std(loads, axis=1)
+        state = int(np.argmin(objectives))
+
+        # Rekonstrukcija rasporeda unazad kroz slojeve
+        assignment = np.zeros(n_tasks, dtype=int)
+        for layer in range(n_tasks - 1, -1, -1):
+            assignment[order[layer]] = choices[layer][state]
+            state = parents[layer][state]
+        objective, valid = evaluate_assignment(assignment, demand, exec_times, capacity)
+        if valid and objective < best_objective:
+            best_assignment = [int(node_ids[k]) for k in assignment]
+            best_objective, best_valid = objective, valid
+            if trajectory is not None:
+                trajectory.improve(objective, valid)
+        report['proven'] = exact
+    return best_assignment, best_objective, best_valid, time.time() - start_time
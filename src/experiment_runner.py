@@ -1,11 +1,19 @@
 # src/experiment_runner.py
 import os
 import json
+import argparse
+import random
 import time
 from pathlib import Path
+import numpy as np
 from bruteforce import brute_force_search
 from greedy import greedy_schedule
 from algorithm import ElectromagnetismAlgorithm
+from tabu import tabu_search
+from grasp import grasp_search
+from autotuner import best_config, instance_class
+from results_store import ResultsStore, META_KEYS, DEFAULT_DB_PATH
+from trajectory import Trajectory, time_to_target
 from task import Task
 from computerNode import ComputeNode
 
@@ -18,7 +26,34 @@ def load_test(path):
     return tasks, nodes
 
 
-def run_experiment(test_path, em_pop=30, em_iter=100, bf_limit=60):
+def compute_time_to_target(results, target_gap=0.01):
+    """
+    Računa vreme do cilja (TTT) za svako pokretanje svakog solvera.
+    Cilj je optimum brute-force pretrage (ili najbolje validno rešenje
+    svih solvera) uvećan za target_gap.
+    """
+    solvers = [k for k, v in results.items() if isinstance(v, dict) and 'trajectories' in v]
+    if results.get('bruteforce') and results['bruteforce']['valid']:
+        reference = results['bruteforce']['objective']
+    else:
+        valid_points = [p['objective'] for k in solvers for traj in results[k]['trajectories']
+                        for p in traj if p['valid']]
+        if not valid_points:
+            return None
+        reference = min(valid_points)
+
+    target = reference * (1 + target_gap)
+    results['target'] = target
+    for k in solvers:
+        results[k]['ttt'] = [time_to_target(traj, target) for traj in results[k]['trajectories']]
+    return target
+
+
+def run_experiment(test_path, em_pop=None, em_iter=None, bf_limit=60, n_seeds=3, target_gap=0.01,
+                   on_result=None):
+    # on_result(results, solver) se poziva čim se solver završi (npr. upis u bazu),
+    # pre poređenja sa brute force-om i TTT-a koji se dopunjuju na kraju.
+    # Stohastički solveri (STOCHASTIC_SOLVERS) rade sa istih n_seeds semena.
     print(f"\n{'='*50}")
     print(f"Test: {os.path.basename(test_path)}")
     print('='*50)
@@ -29,8 +64,13 @@ def run_experiment(test_path, em_pop=30, em_iter=100, bf_limit=60):
     results = {
         'test': os.path.basename(test_path),
         'tasks': len(tasks),
-        'nodes': len(nodes)
+        'nodes': len(nodes),
+        'instance_class': instance_class(tasks, nodes)
     }
+
+    def finished(solver):
+        if on_result is not None:
+            on_result(results, solver)
     
     # ---- Brute-force ----
     n_combinations = len(nodes) ** len(tasks)
@@ -41,13 +81,15 @@ def run_experiment(test_path, em_pop=30, em_iter=100, bf_limit=60):
         results['bruteforce'] = None
     else:
         try:
+            bf_trajectory = Trajectory()
             bf_assign, bf_obj, bf_valid, bf_time = brute_force_search(
-                tasks, nodes, time_limit=bf_limit, prune=True
+                tasks, nodes, time_limit=bf_limit, prune=True, trajectory=bf_trajectory
             )
             results['bruteforce'] = {
                 'objective': bf_obj,
                 'valid': bf_valid,
-                'time': bf_time
+                'time': bf_time,
+                'trajectories': [bf_trajectory.to_list()]
             }
             print(f"  Objective: {bf_obj:.2f}")
             print(f"  Valid: {bf_valid}")
@@ -55,15 +97,18 @@ def run_experiment(test_path, em_pop=30, em_iter=100, bf_limit=60):
         except Exception as e:
             print(f"  Failed: {e}")
             results['bruteforce'] = None
+    finished('bruteforce')
     
     # ---- Greedy ----
     print(f"\nGREEDY (Greedy-Load):")
     try:
-        assign, obj, valid, runtime = greedy_schedule(tasks, nodes)
+        greedy_trajectory = Trajectory()
+        assign, obj, valid, runtime = greedy_schedule(tasks, nodes, trajectory=greedy_trajectory)
         results['greedy'] = {
             'objective': obj,
             'valid': valid,
-            'time': runtime
+            'time': runtime,
+            'trajectories': [greedy_trajectory.to_list()]
         }
         print(f"  Objective: {obj:.2f}")
         print(f"  Valid: {valid}")
@@ -71,109 +116,316 @@ def run_experiment(test_path, em_pop=30, em_iter=100, bf_limit=60):
     except Exception as e:
         print(f"  Greedy Failed: {e}")
         results['greedy'] = None
+    finished('greedy')
     
     # ---- EM ----
-    print(f"\nEM ALGORITHM:")
-    em = ElectromagnetismAlgorithm(tasks, nodes, 
-                                   population_size=em_pop, 
-                                   max_iterations=em_iter)
-    
-    t0 = time.time()
-    best_particle, best_obj = em.run()
-    em_time = time.time() - t0
+    # Parametri se uzimaju iz podešene konfiguracije za klasu instance
+    em_config = best_config(tasks, nodes)
+    if em_pop is not None:
+        em_config['population_size'] = em_pop
+    if em_iter is not None:
+        em_config['max_iterations'] = em_iter
+    print(f"\nEM ALGORITHM ({results['instance_class']}: "
+          f"pop={em_config['population_size']}, iter={em_config['max_iterations']}):")
     
-    em_valid = False
-    if best_particle:
-        best_particle.update_nodes_from_position()
-        _, em_valid = best_particle.evaluate()
+    # Više semena daje raspodelu vremena do cilja; izveštavamo prvo seme
+    seeds = range(max(1, n_seeds))
+    em_trajectories = []
+    for seed in seeds:
+        random.seed(seed)
+        np.random.seed(seed)
+        em = ElectromagnetismAlgorithm(tasks, nodes, 
+                                       population_size=em_config['population_size'], 
+                                       max_iterations=em_config['max_iterations'],
+                                       local_search_attempts=em_config['local_search_attempts'],
+                                       verbose=(seed == 0))
+        
+        t0 = time.time()
+        best_particle, seed_obj = em.run()
+        seed_time = time.time() - t0
+        em_trajectories.append(em.trajectory.to_list())
+        
+        if seed == 0:
+            best_obj, em_time = seed_obj, seed_time
+            em_valid = False
+            if best_particle:
+                best_particle.update_nodes_from_position()
+                _, em_valid = best_particle.evaluate()
     
     results['em'] = {
         'objective': best_obj,
         'valid': em_valid,
-        'time': em_time
+        'time': em_time,
+        'params': em_config,
+        'trajectories': em_trajectories
     }
     print(f"  Objective: {best_obj:.2f}")
     print(f"  Valid: {em_valid}")
     print(f"  Time: {em_time:.2f}s")
+    finished('em')
     
-    # ---- Poređenje EM i Greedy vs BF ----
-    if results['bruteforce'] and results['bruteforce']['valid']:
-        # Standardno poređenje vs brute-force
-        bf_obj = results['bruteforce']['objective']
-        bf_time = results['bruteforce']['time']
-        
-        # EM gap i speedup
-        if em_valid:
-            em_gap = ((best_obj - bf_obj) / bf_obj) * 100
-            em_speedup = bf_time / em_time
-            print(f"\nCOMPARISON (EM vs BF):")
-            print(f"  Gap: {em_gap:.2f}%")
-            print(f"  Speedup: {em_speedup:.2f}x")
-            results['em']['gap_vs_bf'] = em_gap
-            results['em']['speedup_vs_bf'] = em_speedup
-
-        # Greedy gap i speedup
-        if results['greedy'] and results['greedy']['valid']:
-            greedy_obj = results['greedy']['objective']
-            greedy_time = results['greedy']['time']
-            greedy_gap = ((greedy_obj - bf_obj) / bf_obj) * 100
-            greedy_speedup = bf_time / greedy_time
-            print(f"\nCOMPARISON (Greedy vs BF):")
-            print(f"  Gap: {greedy_gap:.2f}%")
-            print(f"  Speedup: {greedy_speedup:.2f}x")
-            results['greedy']['gap_vs_bf'] = greedy_gap
-            results['greedy']['speedup_vs_bf'] = greedy_speedup
+    # ---- Tabu i GRASP (ista semena kao EM, izveštavamo prvo seme) ----
+    for solver, title, search in (('tabu', 'TABU SEARCH', tabu_search), ('grasp', 'GRASP', grasp_search)):
+        print(f"\n{title}:")
+        try:
+            trajectories = []
+            for seed in seeds:
+                trajectory = Trajectory()
+                _, seed_obj, seed_valid, seed_time = search(tasks, nodes, seed=seed, trajectory=trajectory)
+                trajectories.append(trajectory.to_list())
+                if seed == 0:
+                    obj, valid, runtime = seed_obj, seed_valid, seed_time
+            results[solver] = {
+                'objective': obj,
+                'valid': valid,
+                'time': runtime,
+                'trajectories': trajectories
+            }
+            print(f"  Objective: {obj:.2f}")
+            print(f"  Valid: {valid}")
+            print(f"  Time: {runtime:.4f}s")
+        except Exception as e:
+            print(f"  {title} Failed: {e}")
+            results[solver] = None
+        finished(solver)
+    
+    # ---- Poređenje svih solvera sa BF (ili sa EM ako BF nije dostupan) ----
+    if not _compare_to(results, 'bruteforce', verbose=True):
+        _compare_to(results, 'em', verbose=True)
 
-    else:
-        # Ako brute-force nije dostupan, EM je referenca
-        if results['greedy'] and results['greedy']['valid'] and em_valid:
-            greedy_obj = results['greedy']['objective']
-            greedy_time = results['greedy']['time']
-            
-            greedy_gap_vs_em = ((greedy_obj - best_obj) / best_obj) * 100
-            speedup_em_vs_greedy = em_time / greedy_time
-            
-            print(f"\nCOMPARISON (Greedy vs EM):")
-            print(f"  Gap: {greedy_gap_vs_em:.2f}%")
-            print(f"  Speedup (EM vs Greedy): {speedup_em_vs_greedy:.2f}x")
-            
-            results['greedy']['gap_vs_em'] = greedy_gap_vs_em
-            results['greedy']['speedup_vs_em'] = speedup_em_vs_greedy
-            # EM je referenca
-            results['em']['gap_vs_greedy'] = 0.0
-            results['em']['speedup_vs_greedy'] = 1.0
+    # ---- Vreme do cilja (TTT) ----
+    target = compute_time_to_target(results, target_gap)
+    if target is not None:
+        print(f"\nTIME-TO-TARGET (target {target:.2f}):")
+        for k, v in results.items():
+            if isinstance(v, dict) and 'ttt' in v:
+                reached = [t for t in v['ttt'] if t is not None]
+                median = f"{np.median(reached):.4f}s" if reached else "-"
+                print(f"  {k:12} reached {len(reached)}/{len(v['ttt'])}, median {median}")
 
     return results
 
 
+# ---- Distribuirano izvršavanje preko reda poslova (work_queue) ----
+QUEUE_SOLVERS = ('bruteforce', 'greedy', 'em', 'tabu', 'grasp')
+# Solveri koji se pokreću sa više semena (raspodela vremena do cilja)
+STOCHASTIC_SOLVERS = ('em', 'tabu', 'grasp')
+
+
+def publish_experiments(queue, test_paths, solvers=QUEUE_SOLVERS, n_seeds=3, bf_limit=60, run=None):
+    """
+    Objavljuje poslove (instanca, solver, seme) u red; vraća listu id-jeva poslova.
+    Stohastički solveri dobijaju po posao za svako od n_seeds semena.
+    run je oznaka pokretanja u ključu posla (podrazumevano verzija koda).
+    """
+    from work_queue import code_version
+
+    run = run if run is not None else code_version()  # Jednom za ceo sweep
+    job_ids = []
+    for order, test_path in enumerate(test_paths):
+        with open(test_path, 'r') as f:
+            payload = json.load(f)
+        tasks, nodes = load_test(test_path)
+        instance = {'tasks': payload['tasks'], 'nodes': payload['nodes']}
+        meta = {
+            'test': os.path.basename(test_path),
+            'category': Path(test_path).parent.name,
+            'tasks': len(tasks),
+            'nodes': len(nodes),
+            'instance_class': instance_class(tasks, nodes),
+            'order': order
+        }
+        for solver in solvers:
+            if solver == 'bruteforce' and len(nodes) ** len(tasks) > 10000000:
+                continue
+            seeds = range(max(1, n_seeds)) if solver in STOCHASTIC_SOLVERS else [0]
+            time_limit = bf_limit if solver == 'bruteforce' else None
+            for seed in seeds:
+                job_ids.append(queue.publish(instance, solver, seed=seed, time_limit=time_limit, meta=meta,
+                                             run=run))
+    return job_ids
+
+
+# Sufiks ključeva gap_vs_* i speedup_vs_* po referentnom solveru
+REFERENCE_KEYS = {'bruteforce': 'bf', 'em': 'em'}
+
+
+def _compare_to(results, reference, verbose=False):
+    # Gap i speedup svakog validnog solvera prema referentnom (bruteforce ili em);
+    # vraća False ako referenca nema validno rešenje
+    ref = results.get(reference)
+    if not ref or not ref['valid']:
+        return False
+    key = REFERENCE_KEYS[reference]
+    for solver, result in results.items():
+        if solver in META_KEYS or solver == reference or not result or not result['valid']:
+            continue
+        gap = ((result['objective'] - ref['objective']) / ref['objective']) * 100
+        speedup = ref['time'] / result['time'] if result['time'] > 0 else None
+        result[f'gap_vs_{key}'] = gap
+        result[f'speedup_vs_{key}'] = speedup
+        if verbose:
+            print(f"\nCOMPARISON ({solver} vs {reference}):")
+            print(f"  Gap: {gap:.2f}%")
+            if speedup is not None:
+                print(f"  Speedup: {speedup:.2f}x")
+    return True
+
+
+def collect_experiments(queue, job_ids, target_gap=0.01):
+    """
+    Skuplja završene poslove job_ids (koje je vratio publish_experiments) u isti
+    oblik koji vraća run_experiment (rečnik po instanci); prijavljuje se seme 0,
+    a sva semena daju putanje za TTT. Ostali poslovi u done/ se ne čitaju.
+    """
+    by_test = {}
+    for job in queue.results(job_ids):
+        meta = job['meta']
+        entry = by_test.setdefault((meta['category'], meta['test']), (meta, {}))
+        entry[1].setdefault(job['solver'], []).append(job)
+
+    all_results = []
+    for meta, jobs in sorted(by_test.values(), key=lambda e: (e[0].get('order', 0), e[0]['test'])):
+        results = {k: meta[k] for k in ('test', 'tasks', 'nodes', 'category', 'instance_class')}
+        for solver, runs in jobs.items():
+            runs.sort(key=lambda j: j['seed'] or 0)
+            first = runs[0]['result']
+            results[solver] = {
+                'objective': first['objective'],
+                'valid': first['valid'],
+                'time': first['time'],
+                'trajectories': [j['result']['trajectory'] for j in runs]
+            }
+        _compare_to(results, 'bruteforce')
+        compute_time_to_target(results, target_gap)
+        all_results.append(results)
+    return all_results
+
+
+def run_distributed(queue_dir, test_paths, local_workers=0, n_seeds=3, bf_limit=60, poll=2.0, run=None,
+                    on_result=None):
+    """
+    Objavljuje mrežu eksperimenata, čeka radnike (lokalne ili na drugim hostovima)
+    dok se ne završe poslovi ovog pokretanja i skuplja njihove rezultate.
+    on_result(job) se poziva za svaki posao čim se pojavi u done/.
+    """
+    from work_queue import WorkQueue, start_local_workers
+
+    queue = WorkQueue(queue_dir)
+    job_ids = publish_experiments(queue, test_paths, n_seeds=n_seeds, bf_limit=bf_limit, run=run)
+    print(f"Published {len(job_ids)} jobs to {queue_dir}")
+    workers = start_local_workers(queue_dir, local_workers) if local_workers > 0 else []
+
+    reported = set()
+    while True:
+        queue.requeue_expired()
+        states = [queue.state_of(jid) for jid in job_ids]
+        counts = {state: states.count(state) for state in ('pending', 'claimed', 'done', 'failed')}
+        new = [jid for jid, state in zip(job_ids, states) if state == 'done' and jid not in reported]
+        reported.update(new)
+        if on_result is not None:
+            for job in queue.results(new):
+                on_result(job)
+        print(f"  pending {counts['pending']}, claimed {counts['claimed']}, "
+              f"done {counts['done']}, failed {counts['failed']}")
+        if counts['pending'] == 0 and counts['claimed'] == 0:
+            break
+        time.sleep(poll)
+    for process in workers:
+        process.join()
+
+    for job in queue.failed(job_ids):
+        print(f"  FAILED {job['meta'].get('test')} {job['solver']} (seed {job['seed']}): {job.get('error')}")
+    return collect_experiments(queue, job_ids)
+
+
+def _instance_recorder(store, run_id, category, job_rows):
+    # Upisuje rezultat solvera iz run_experiment čim se završi; job_rows[solver] = id reda
+    def record(results, solver):
+        job_rows[solver] = store.record_job(run_id, results['test'], solver, results[solver],
+                                            category=category, instance_class=results['instance_class'],
+                                            n_tasks=results['tasks'], n_nodes=results['nodes'])
+    return record
+
+
+def _queue_recorder(store, run_id, job_rows):
+    # Upisuje završen posao iz reda čim stigne; prijavljuje se seme 0 (kao u
+    # collect_experiments), ostala semena ulaze samo u TTT pri dopuni
+    def record(job):
+        if (job['seed'] or 0) != 0:
+            return
+        meta, result = job['meta'], job['result']
+        job_rows[(meta['category'], meta['test'], job['solver'])] = store.record_job(
+            run_id, meta['test'], job['solver'], {k: result[k] for k in ('objective', 'valid', 'time')},
+            category=meta['category'], instance_class=meta['instance_class'],
+            n_tasks=meta['tasks'], n_nodes=meta['nodes'])
+    return record
+
+
+def emit_plots(all_results, results_dir):
+    """Crta comparison_plot.png, TTT i performance-profile grafike"""
+    from plot_results import plot_comparison, plot_ttt, plot_performance_profile
+    plot_comparison(all_results, results_dir / 'comparison_plot.png', show=False)
+    plot_ttt(all_results, results_dir / 'ttt_plot.png')
+    plot_performance_profile(all_results, results_dir / 'performance_profile.png')
+
+
 def main():
+    parser = argparse.ArgumentParser(description='Pokreće eksperimente nad data/ instancama')
+    parser.add_argument('--queue', default=None,
+                        help='Deljeni direktorijum reda poslova (distribuirano izvršavanje)')
+    parser.add_argument('--local-workers', type=int, default=0,
+                        help='Broj lokalnih radnika uz --queue')
+    args = parser.parse_args()
+
     data_dir = Path('data')
     results_dir = Path('results')
     results_dir.mkdir(exist_ok=True)
     
+    # Rezultati se upisuju u SQLite bazu čim se posao završi, a poređenja
+    # (gap, TTT) se dopunjuju kada se završe svi solveri instance
+    store = ResultsStore(DEFAULT_DB_PATH)
+    run_id = store.start_run()
+    
     all_results = []
     
-    for category in ['easy', 'medium', 'hard']:
-        cat_path = data_dir / category
-        if not cat_path.exists():
-            continue
+    if args.queue:
+        test_paths = [str(p) for category in ['easy', 'medium', 'hard']
+                      for p in sorted((data_dir / category).glob('test*.json'))]
+        job_rows = {}
+        all_results = run_distributed(args.queue, test_paths, local_workers=args.local_workers,
+                                      on_result=_queue_recorder(store, run_id, job_rows))
+        for result in all_results:
+            rows = {solver: job_rows.get((result['category'], result['test'], solver)) for solver in result}
+            store.record_experiment(run_id, result, rows)
+    else:
+        for category in ['easy', 'medium', 'hard']:
+            cat_path = data_dir / category
+            if not cat_path.exists():
+                continue
         
-        print(f"\n{'#'*50}")
-        print(f"CATEGORY: {category.upper()}")
-        print('#'*50)
+            print(f"\n{'#'*50}")
+            print(f"CATEGORY: {category.upper()}")
+            print('#'*50)
         
-        for test_file in sorted(cat_path.glob('test*.json')):
-            result = run_experiment(str(test_file))
-            result['category'] = category
-            all_results.append(result)
-    
+            for test_file in sorted(cat_path.glob('test*.json')):
+                job_rows = {}
+                result = run_experiment(str(test_file),
+                                        on_result=_instance_recorder(store, run_id, category, job_rows))
+                result['category'] = category
+                store.record_experiment(run_id, result, job_rows)
+                all_results.append(result)
+
     # Sačuvaj rezultate
     output_file = results_dir / f'results_{int(time.time())}.json'
     with open(output_file, 'w') as f:
         json.dump(all_results, f, indent=2)
+    store.close()
+    emit_plots(all_results, results_dir)
     
     print(f"\n{'='*50}")
     print(f"Results saved to: {output_file}")
+    print(f"Results database: {store.path} (run {run_id})")
     print('='*50)
 
 
@@ -0,0 +1,110 @@
+# src/forces.py
+from typing import Optional
+
+import numpy as np
+
+# Elektromagnetne sile za celu populaciju odjednom.
+# positions je P×T matrica (raspored svake čestice), charges je P naelektrisanja.
+# Sila na česticu i: sum_j s_ij * q_i * q_j / d_ij^2 * (x_j - x_i), gde je
+# s_ij = +1 ako je j bolja (privlačenje), inače -1 (odbijanje), a d_ij euklidsko rastojanje.
+# Par sa istim rasporedom (d_ij = 0) ne doprinosi sili.
+
+
+def normalize_charges(charges: np.ndarray) -> np.ndarray:
+    """Normalizuje naelektrisanja na zbir 1 (ravnomerno ako je zbir 0)"""
+    charges = np.asarray(charges, dtype=float)
+    total = charges.sum()
+    if total > 0:
+        return charges / total
+    return np.full(len(charges), 1.0 / max(1, len(charges)))
+
+
+def exact_forces(positions: np.ndarray, charges: np.ndarray) -> np.ndarray:
+    """
+    Tačne sile svih parova u O(P²·T) preko množenja matrica:
+    sum_j w_ij (x_j - x_i) = (W @ X)_i - (sum_j w_ij) x_i.
+
+    Returns:
+        P×T matrica sila
+    """
+    x = np.asarray(positions, dtype=float)
+    q = normalize_charges(charges)
+    sq = np.einsum('ij,ij->i', x, x)
+    d2 = np.maximum(sq[:, None] + sq[None, :] - 2.0 * (x @ x.T), 0.0)
+    # Rasporedi su celobrojni, pa je d² ceo broj: < 0.5 znači isti raspored (i sama čestica)
+    same = d2 < 0.5
+    dist = np.sqrt(d2) + 1e-10
+    sign = np.where(q[None, :] > q[:, None], 1.0, -1.0)
+    w = np.where(same, 0.0, sign * q[:, None] * q[None, :] / dist ** 2)
+    return w @ x - w.sum(axis=1)[:, None] * x
+
+
+def approximate_forces(positions: np.ndarray, charges: np.ndarray, top_k: int = 16, samples: int = 8,
+                       rng: Optional[np.random.Generator] = None) -> np.ndarray:
+    """
+    Približne sile u O(P·(k+m)·T): svaka čestica interaguje tačno sa pivotima
+    (top_k čestica najvećeg naelektrisanja i samples slučajnih čestica), a ostatak
+    populacije je podeljen u grupe po najbližem pivotu i svaka grupa deluje kao
+    agregat: rastojanje do člana se zamenjuje srednjim kvadratnim rastojanjem
+    do grupe. Slučajni pivoti pokrivaju delove populacije daleko od najboljih
+    čestica. Za top_k + samples >= P - 1 sile su tačne.
+
+    Returns:
+        P×T matrica sila
+    """
+    x = np.asarray(positions, dtype=float)
+    n = len(x)
+    if top_k + samples >= n - 1:
+        return exact_forces(x, charges)
+    rng = rng if rng is not None else np.random.default_rng()
+    q = normalize_charges(charges)
+    sq = np.einsum('ij,ij->i', x, x)
+
+    order = np.argsort(-q, kind='stable')
+    sampled = rng.choice(order[top_k:], size=samples, replace=False)
+    top = np.concatenate([order[:top_k], sampled])
+    rest = np.setdiff1d(order[top_k:], sampled)
+    rest = rest[np.argsort(-q[rest], kind='stable')]
+
+    # ---- Tačan deo: pivoti su zajednički za sve čestice (množenje matrica) ----
+    d2 = np.maximum(sq[:, None] + sq[top][None, :] - 2.0 * (x @ x[top].T), 0.0)
+    dist = np.sqrt(d2) + 1e-10
+    sign = np.where(q[top][None, :] > q[:, None], 1.0, -1.0)
+    w = np.where(d2 < 0.5, 0.0, sign * q[:, None] * q[top][None, :] / dist ** 2)
+    forces = w @ x[top] - w.sum(axis=1)[:, None] * x
+
+    # ---- Agregat ostatka po grupama ----
+    # Svaka čestica iz ostatka pripada grupi najbližeg pivota. Za grupu
+    # se rastojanje do svakog člana aproksimira srednjim kvadratnim rastojanjem
+    # do grupe, a sume q_j·x_j boljih i lošijih članova se dobijaju iz
+    # prefiksnih suma po opadajućem naelektrisanju (bolji članovi su prefiks).
+    group = np.argmin(d2[rest], axis=1)
+    for c in range(len(top)):
+        members = rest[group == c]
+        if len(members) == 0:
+            continue
+        q_m, x_m = q[members], x[members]
+        weighted = np.vstack([np.zeros(x.shape[1]), np.cumsum(q_m[:, None] * x_m, axis=0)])
+        mass = np.concatenate([[0.0], np.cumsum(q_m)])
+        better = np.searchsorted(-q_m, -q, side='left')  # broj članova sa q_j > q_i
+        pull = 2.0 * weighted[better] - weighted[-1]
+        net_mass = 2.0 * mass[better] - mass[-1]
+
+        # Srednje kvadratno rastojanje do članova (sama čestica doprinosi 0)
+        in_group = np.zeros(n, dtype=bool)
+        in_group[members] = True
+        others = len(members) - in_group
+        mean_d2 = (sq * len(members) - 2.0 * (x @ x_m.sum(axis=0)) + sq[members].sum()) / np.maximum(others, 1)
+        scale = np.where(mean_d2 > 0.5, q / np.maximum(mean_d2, 0.5), 0.0)
+        forces += scale[:, None] * (pull - net_mass[:, None] * x)
+    return forces
+
+
+def population_forces(positions: np.ndarray, charges: np.ndarray, mode: str = 'exact', top_k: int = 16,
+                      samples: int = 8, rng: Optional[np.random.Generator] = None) -> np.ndarray:
+    """Sile za populaciju; mode je 'exact' ili 'approx'"""
+    if mode == 'exact':
+        return exact_forces(positions, charges)
+    if mode == 'approx':
+        return approximate_forces(positions, charges, top_k=top_k, samples=samples, rng=rng)
+    raise ValueError(f"Nepoznat režim sila: {mode}")
@@ -0,0 +1,61 @@
+# src/generator.py
+from typing import List, Tuple
+import numpy as np
+
+from task import Task
+from computerNode import ComputeNode
+
+
+# Klase kapaciteta čvorova (cpu, mem GB, net Mbps), slične onima u data/
+NODE_CLASSES = np.array([
+    [4.0, 8.0, 60.0],
+    [6.0, 12.0, 90.0],
+    [8.0, 32.0, 100.0],
+    [16.0, 24.0, 200.0],
+])
+
+
+def generate_instance_arrays(n_tasks: int, n_nodes: int, tightness: float = 0.6,
+                             seed: int = 0) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Generiše slučajnu instancu direktno kao nizove.
+    tightness je odnos ukupnog zahteva i ukupnog kapaciteta po resursu.
+
+    Returns:
+        (demand T×3, exec_times T, capacity N×3)
+    """
+    rng = np.random.default_rng(seed)
+    capacity = NODE_CLASSES[rng.integers(0, len(NODE_CLASSES), size=n_nodes)].copy()
+
+    # Profili zadataka: CPU-intenzivni, memorijski, mrežni i uravnoteženi
+    profiles = np.array([
+        [1.6, 0.6, 0.6],
+        [0.6, 1.6, 0.6],
+        [0.6, 0.6, 1.6],
+        [1.0, 1.0, 1.0],
+    ])
+    kind = rng.integers(0, len(profiles), size=n_tasks)
+    raw = profiles[kind] * rng.uniform(0.5, 1.5, size=(n_tasks, 3))
+
+    # Skaliramo tako da ukupan zahtev bude tightness * ukupan kapacitet
+    scale = tightness * capacity.sum(axis=0) / raw.sum(axis=0)
+    demand = np.round(raw * scale, 2)
+    demand = np.maximum(demand, 0.01)
+
+    exec_times = np.round(10.0 + 30.0 * demand[:, 0] / demand[:, 0].max() + rng.uniform(0, 10, n_tasks), 1)
+    return demand, exec_times, capacity
+
+
+def arrays_to_objects(demand: np.ndarray, exec_times: np.ndarray,
+                      capacity: np.ndarray) -> Tuple[List[Task], List[ComputeNode]]:
+    """Pravi Task i ComputeNode objekte iz nizova"""
+    tasks = [Task(i, float(d[0]), float(d[1]), float(d[2]), float(e))
+             for i, (d, e) in enumerate(zip(demand, exec_times))]
+    nodes = [ComputeNode(i, float(c[0]), float(c[1]), float(c[2])) for i, c in enumerate(capacity)]
+    return tasks, nodes
+
+
+def generate_instance(n_tasks: int, n_nodes: int, tightness: float = 0.6,
+                      seed: int = 0) -> Tuple[List[Task], List[ComputeNode]]:
+    """Generiše slučajnu instancu kao liste zadataka i čvorova"""
+    return arrays_to_objects(*generate_instance_arrays(n_tasks, n_nodes, tightness, seed))
@@ -0,0 +1,227 @@
+# src/grasp.py
+import multiprocessing as mp
+import os
+import time
+from concurrent.futures import Executor, ProcessPoolExecutor, wait, FIRST_EXCEPTION
+from typing import List, Tuple, Optional, Callable
+
+import numpy as np
+
+from task import Task
+from computerNode import ComputeNode
+from instance_arrays import tasks_to_arrays, nodes_to_arrays, load_factors, AssignmentState
+from trajectory import Trajectory
+from domains import TaskDomains, build_domains
+
+# GRASP: mnogo nasumičnih greedy konstrukcija, svaka praćena brzim lokalnim
+# poboljšanjem. Konstrukcija ide istim redosledom zadataka kao greedy_schedule,
+# ali umesto čvora sa najmanjim budućim opterećenjem (calculate_future_load)
+# bira slučajan čvor iz ograničene liste kandidata (RCL): čvorovi čiji je skor
+# najviše alpha * (max - min) iznad najboljeg. alpha = 0 je čist greedy,
+# alpha = 1 je slučajan izbor među čvorovima koji mogu da prime zadatak.
+# Iteracije su nezavisne, pa se dele na procese kada posla ima dovoljno da
+# se isplati pokretanje procesa.
+
+# Najmanji posao (iteracije x zadaci x čvorovi) za koji se iteracije dele na
+# procese; ispod toga pokretanje poola traje duže od samih iteracija
+PARALLEL_MIN_WORK = 100_000
+STOP_POLL = 0.05  # Koliko često glavni proces proverava should_stop dok procesi rade
+
+
+def task_order(demand: np.ndarray) -> np.ndarray:
+    """Redosled zadataka kao u greedy_schedule (opadajuća težina)"""
+    weight = demand[:, 0] + demand[:, 1] / 10 + demand[:, 2] / 100
+    return np.argsort(-weight, kind='stable')
+
+
+def randomized_greedy(demand: np.ndarray, capacity: np.ndarray, feasible: np.ndarray, order: np.ndarray,
+                      alpha: float, rng: np.random.Generator) -> np.ndarray:
+    """
+    Jedna nasumična greedy konstrukcija; vraća dodelu kao indekse čvorova.
+    Zadatak koji ne staje nigde ide na najmanje opterećen čvor (kao u greedy_schedule).
+    """
+    n_nodes = len(capacity)
+    used = np.zeros((n_nodes, 3))
+    counts = np.zeros(n_nodes, dtype=int)
+    assignment = np.zeros(len(demand), dtype=int)
+    for t in order:
+        after = used + demand[t]
+        fits = feasible[t] & np.all(after <= capacity, axis=1)
+        if fits.any():
+            # Skor je buduće opterećenje čvora (calculate_future_load)
+            score = np.max(after / capacity, axis=1)
+            low, high = score[fits].min(), score[fits].max()
+            candidates = np.flatnonzero(fits & (score <= low + alpha * (high - low) + 1e-12))
+            k = int(candidates[rng.integers(len(candidates))])
+        else:
+            k = int(np.argmin(load_factors(used, capacity, counts)))
+        used[k] += demand[t]
+        counts[k] += 1
+        assignment[t] = k
+    return assignment
+
+
+def local_improve(state: AssignmentState, feasible: np.ndarray, max_moves: int = 100, candidate_nodes: int = 3,
+                  swap_sample: int = 32, rng: Optional[np.random.Generator] = None) -> int:
+    """
+    Spust najboljim poboljšanjem: premeštanje zadataka sa candidate_nodes
+    najopterećenijih čvorova na bilo koji čvor iz domena i zamena sa uzorkom
+    zadataka sa ostalih čvorova; procena je O(1) po potezu (AssignmentState).
+    Staje u lokalnom minimumu ili posle max_moves poteza; vraća broj poteza.
+    """
+    rng = rng if rng is not None else np.random.default_rng()
+    all_nodes = np.arange(state.n_nodes)
+    candidate_nodes = max(1, min(candidate_nodes, state.n_nodes - 1))
+    moves = 0
+    while moves < max_moves:
+        heavy = np.argsort(state.loads)[::-1][:candidate_nodes]
+        on_heavy = np.isin(state.assignment, heavy)
+        heavy_tasks = np.flatnonzero(on_heavy)
+        if len(heavy_tasks) == 0:
+            break
+
+        # Potezi koji povećavaju prekoračenje kapaciteta se ne prihvataju
+        reloc_delta, reloc_over = state.relocate_delta(heavy_tasks[:, None], all_nodes[None, :])
+        reloc_delta = np.where(feasible[heavy_tasks] & (reloc_over <= state.total_overflow + 1e-9),
+                               reloc_delta, np.inf)
+
+        others = np.flatnonzero(~on_heavy)
+        if len(others) > swap_sample:
+            others = rng.choice(others, size=swap_sample, replace=False)
+        if len(others) > 0:
+            swap_delta, swap_over = state.swap_delta(heavy_tasks[:, None], others[None, :])
+            node_a = state.assignment[heavy_tasks][:, None]
+            node_b = state.assignment[others][None, :]
+            swap_ok = feasible[heavy_tasks[:, None], node_b] & feasible[others[None, :], node_a] & \
+                (swap_over <= state.total_overflow + 1e-9)
+            swap_delta = np.where(swap_ok, swap_delta, np.inf)
+        else:
+            swap_delta = np.full((len(heavy_tasks), 1), np.inf)
+
+        best_reloc = np.unravel_index(np.argmin(reloc_delta), reloc_delta.shape)
+        best_swap = np.unravel_index(np.argmin(swap_delta), swap_delta.shape)
+        if min(reloc_delta[best_reloc], swap_delta[best_swap]) >= -1e-9:
+            break
+        if reloc_delta[best_reloc] <= swap_delta[best_swap]:
+            state.relocate(int(heavy_tasks[best_reloc[0]]), int(best_reloc[1]))
+        else:
+            state.swap(int(heavy_tasks[best_swap[0]]), int(others[best_swap[1]]))
+        moves += 1
+
+    state.refresh()
+    return moves
+
+
+def _is_better(objective: float, valid: bool, best_objective: float, best_valid: bool) -> bool:
+    # Validno rešenje je uvek bolje od nevalidnog
+    return (valid and not best_valid) or (valid == best_valid and objective < best_objective)
+
+
+def _grasp_worker(args) -> Tuple[np.ndarray, float, bool, int, List[dict]]:
+    # Blok GRASP iteracija u jednom procesu; vraća najbolje rešenje i tačke
+    # poboljšanja (vreme se meri od zajedničkog početka start). stop je
+    # should_stop u istom procesu ili deljeni Event (Manager) u radnom procesu
+    demand, exec_times, capacity, feasible, iterations, alpha, local_moves, seed, deadline, start, stop = args
+    should_stop = stop.is_set if hasattr(stop, 'is_set') else stop
+    rng = np.random.default_rng(seed)
+    trajectory = Trajectory(start=start)
+    order = task_order(demand)
+    best_assignment, best_objective, best_valid = None, float('inf'), False
+    for iteration in range(iterations):
+        # Prva iteracija se uvek izvršava (uvek postoji rešenje)
+        if iteration > 0 and deadline is not None and time.time() > deadline:
+            break
+        if iteration > 0 and should_stop is not None and should_stop():
+            break
+        state = AssignmentState(randomized_greedy(demand, capacity, feasible, order, alpha, rng),
+                                demand, exec_times, capacity)
+        moves = local_improve(state, feasible, max_moves=local_moves, rng=rng)
+        trajectory.count(1 + moves)
+        objective, valid = state.objective(), state.is_valid()
+        trajectory.improve(objective, valid)
+        if _is_better(objective, valid, best_objective, best_valid):
+            best_assignment, best_objective, best_valid = state.assignment.copy(), objective, valid
+    return best_assignment, best_objective, best_valid, trajectory.evaluations, trajectory.to_list()
+
+
+def _run_parallel(executor: Optional[Executor], workers: int, should_stop: Optional[Callable[[], bool]],
+                  jobs: List[tuple]) -> list:
+    # Blokovi iteracija na procesima; should_stop glavnog procesa se prenosi
+    # radnim procesima kroz Event (Manager), koji oni proveravaju između iteracija
+    manager = mp.Manager() if should_stop is not None else None
+    stop = manager.Event() if manager is not None else None
+    own = executor is None
+    executor = executor if executor is not None else ProcessPoolExecutor(max_workers=workers)
+    try:
+        futures = [executor.submit(_grasp_worker, job + (stop,)) for job in jobs]
+        pending = futures
+        while pending:
+            done, pending = wait(pending, timeout=STOP_POLL if stop is not None else None,
+                                 return_when=FIRST_EXCEPTION)
+            if stop is not None and not stop.is_set() and should_stop():
+                stop.set()
+        return [future.result() for future in futures]
+    finally:
+        if own:
+            executor.shutdown()
+        if manager is not None:
+            manager.shutdown()
+
+
+def grasp_search(tasks: List[Task], nodes: List[ComputeNode], iterations: int = 32, alpha: float = 0.3,
+                 local_moves: int = 100, workers: int = 1, time_limit: Optional[float] = None,
+                 seed: Optional[int] = None, trajectory: Optional[Trajectory] = None,
+                 should_stop: Optional[Callable[[], bool]] = None,
+                 domains: Optional[TaskDomains] = None,
+                 executor: Optional[Executor] = None) -> Tuple[List[int], float, bool, float]:
+    """
+    GRASP: iterations nasumičnih greedy konstrukcija (RCL sa parametrom alpha)
+    sa lokalnim poboljšanjem. Sa workers > 1 (ili prosleđenim executor-om koji
+    pozivalac ponovo koristi) iteracije se dele na procese, ali samo kada je
+    iterations x zadaci x čvorovi najmanje PARALLEL_MIN_WORK; svaki deo dobija
+    nezavisno seme iz seed. should_stop se proverava između iteracija i u
+    procesima (preko deljenog Event-a). domains su unapred izračunati domeni
+    instance (računaju se ako nisu prosleđeni).
+
+    Returns:
+        (assignment, objective, valid, runtime)
+    """
+    start_time = time.time()
+    demand, exec_times = tasks_to_arrays(tasks)
+    capacity, node_ids = nodes_to_arrays(nodes)
+    if len(tasks) == 0 or len(nodes) == 0:
+        state = AssignmentState(np.zeros(len(tasks), dtype=int), demand, exec_times, capacity)
+        return [], state.objective(), state.is_valid(), time.time() - start_time
+    feasible = (domains if domains is not None else build_domains(tasks, nodes)).feasible
+    deadline = start_time + time_limit if time_limit is not None else None
+
+    if executor is not None:
+        workers = max(workers, getattr(executor, '_max_workers', os.cpu_count() or 1))
+    if iterations * len(tasks) * len(nodes) < PARALLEL_MIN_WORK:
+        workers = 1
+    workers = max(1, min(workers, iterations))
+    seeds = np.random.SeedSequence(seed).spawn(workers)
+    chunks = [iterations // workers + (1 if k < iterations % workers else 0) for k in range(workers)]
+    if workers > 1:
+        results = _run_parallel(executor, workers, should_stop,
+                                [(demand, exec_times, capacity, feasible, chunk, alpha, local_moves, child, deadline,
+                                  start_time) for chunk, child in zip(chunks, seeds)])
+    else:
+        results = [_grasp_worker((demand, exec_times, capacity, feasible, iterations, alpha, local_moves, seeds[0],
+                                  deadline, start_time, should_stop))]
+
+    best_assignment, best_objective, best_valid = None, float('inf'), False
+    for assignment, objective, valid, _, _ in results:
+        if _is_better(objective, valid, best_objective, best_valid):
+            best_assignment, best_objective, best_valid = assignment, objective, valid
+
+    if trajectory is not None:
+        # Tačke poboljšanja svih procesa spajamo po vremenu (broj evaluacija je po procesu)
+        trajectory.count(sum(result[3] for result in results))
+        for point in sorted((p for result in results for p in result[4]), key=lambda p: p['time']):
+            if _is_better(point['objective'], point['valid'], trajectory.best_objective, trajectory.best_valid):
+                trajectory.best_objective, trajectory.best_valid = point['objective'], point['valid']
+                trajectory.points.append(point)
+
+    runtime = time.time() - start_time
+    return [int(node_ids[k]) for k in best_assignment], best_objective, best_valid, runtime
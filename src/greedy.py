@@ -1,15 +1,18 @@
 # src/greedy_scheduler.py
-from typing import List, Tuple
+from typing import List, Tuple, Optional
 from task import Task
 from computerNode import ComputeNode
+from trajectory import Trajectory
 import numpy as np
 
 
-def greedy_schedule(tasks: List[Task], nodes: List[ComputeNode]) -> Tuple[List[int], float, bool, float]:
+def greedy_schedule(tasks: List[Task], nodes: List[ComputeNode],
+                    trajectory: Optional[Trajectory] = None) -> Tuple[List[int], float, bool, float]:
     """
     Greedy algoritam za raspodelu zadataka.
     Strategija: Sortira zadatke po težini i za svaki bira čvor
     sa najmanjim budućim opterećenjem koji može da ga primi.
+    Ako je prosleđena putanja (trajectory), u nju se beleži konačno rešenje.
     
     Returns:
         (assignment, objective, valid, runtime)
@@ -58,6 +61,9 @@ def greedy_schedule(tasks: List[Task], nodes: List[ComputeNode]) -> Tuple[List[i
     # Evaluacija
     objective, valid = evaluate_greedy_solution(node_copies)
     runtime = time.time() - start_time
+    if trajectory is not None:
+        trajectory.count()
+        trajectory.improve(objective, valid)
     
     return assignment, objective, valid, runtime
 
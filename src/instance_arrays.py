@@ -0,0 +1,240 @@
+# src/instance_arrays.py
+from typing import List, Tuple, Dict
+import numpy as np
+
+from task import Task
+from computerNode import ComputeNode
+
+
+# Koeficijenti ciljne funkcije (isti kao u Particle.evaluate i evaluate_solution)
+BALANCE_WEIGHT = 500
+OVERFLOW_PENALTY = 100000
+
+
+def tasks_to_arrays(tasks: List[Task]) -> Tuple[np.ndarray, np.ndarray]:
+    """Vraća (zahtevi T×3 [cpu, mem, net], vremena izvršavanja T)"""
+    demand = np.array([[t.cpu_req, t.memory_req, t.network_req] for t in tasks], dtype=float).reshape(-1, 3)
+    exec_times = np.array([t.execution_time for t in tasks], dtype=float)
+    return demand, exec_times
+
+
+def nodes_to_arrays(nodes: List[ComputeNode]) -> Tuple[np.ndarray, np.ndarray]:
+    """Vraća (kapaciteti N×3 [cpu, mem, net], id-jevi čvorova N)"""
+    capacity = np.array([[n.cpu_capacity, n.memory_capacity, n.network_capacity] for n in nodes],
+                        dtype=float).reshape(-1, 3)
+    node_ids = np.array([n.id for n in nodes], dtype=int)
+    return capacity, node_ids
+
+
+def ids_to_indices(assignment, node_ids: np.ndarray) -> np.ndarray:
+    """Prevodi dodelu po id-jevima čvorova u indekse čvorova"""
+    lookup: Dict[int, int] = {int(node_id): i for i, node_id in enumerate(node_ids)}
+    return np.array([lookup[int(a)] for a in assignment], dtype=int)
+
+
+def node_usage(assignment: np.ndarray, demand: np.ndarray, exec_times: np.ndarray,
+               n_nodes: int) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Sabira zauzeće resursa, zbir vremena i broj zadataka po čvoru"""
+    used = np.stack([np.bincount(assignment, weights=demand[:, r], minlength=n_nodes)
+                     for r in range(3)], axis=1)
+    exec_sum = np.bincount(assignment, weights=exec_times, minlength=n_nodes)
+    counts = np.bincount(assignment, minlength=n_nodes)
+    return used, exec_sum, counts
+
+
+def load_factors(used: np.ndarray, capacity: np.ndarray, counts: np.ndarray) -> np.ndarray:
+    """Faktor opterećenja po čvoru (isti kao ComputeNode.calculate_load_factor)"""
+    loads = np.max(used / capacity, axis=-1)
+    return np.where(counts > 0, loads, 0.0)
+
+
+def objective_from_usage(used: np.ndarray, exec_sum: np.ndarray, counts: np.ndarray,
+                         capacity: np.ndarray) -> Tuple[float, bool]:
+    """Računa (vrednost_funkcije, validnost) iz agregata po čvorovima"""
+    loads = load_factors(used, capacity, counts)
+    total_execution_time = np.sum(exec_sum * (1.0 + 2.0 * loads ** 2))
+    load_balance = np.std(loads) if len(loads) > 1 else 0.0
+    overflow = np.maximum(0.0, used - capacity)
+    valid = not np.any(used > capacity)
+    penalty = OVERFLOW_PENALTY * np.sum(overflow) if not valid else 0.0
+    return float(total_execution_time + BALANCE_WEIGHT * load_balance + penalty), bool(valid)
+
+
+def evaluate_assignment(assignment: np.ndarray, demand: np.ndarray, exec_times: np.ndarray,
+                        capacity: np.ndarray) -> Tuple[float, bool]:
+    """Vektorska verzija Particle.evaluate; dodela je niz indeksa čvorova"""
+    used, exec_sum, counts = node_usage(np.asarray(assignment, dtype=int), demand, exec_times, len(capacity))
+    return objective_from_usage(used, exec_sum, counts, capacity)
+
+
+def evaluate_population(positions: np.ndarray, demand: np.ndarray, exec_times: np.ndarray,
+                        capacity: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Evaluacija cele populacije odjednom (ista ciljna funkcija kao Particle.evaluate).
+    positions je P×T niz indeksa čvorova.
+
+    Returns:
+        (objective P, valid P)
+    """
+    positions = np.asarray(positions, dtype=int)
+    n_particles, n_nodes = len(positions), len(capacity)
+    # Jedan bincount nad spljoštenim indeksima (čestica, čvor)
+    flat = (np.arange(n_particles)[:, None] * n_nodes + positions).ravel()
+    total = n_particles * n_nodes
+    used = np.stack([np.bincount(flat, weights=np.tile(demand[:, r], n_particles), minlength=total)
+                     for r in range(3)], axis=1).reshape(n_particles, n_nodes, 3)
+    exec_sum = np.bincount(flat, weights=np.tile(exec_times, n_particles),
+                           minlength=total).reshape(n_particles, n_nodes)
+    counts = np.bincount(flat, minlength=total).reshape(n_particles, n_nodes)
+
+    loads = load_factors(used, capacity, counts)
+    total_execution_time = np.sum(exec_sum * (1.0 + 2.0 * loads ** 2), axis=1)
+    load_balance = np.std(loads, axis=1) if n_nodes > 1 else np.zeros(n_particles)
+    overflow = np.maximum(0.0, used - capacity)
+    valid = ~np.any(used > capacity, axis=(1, 2))
+    penalty = np.where(valid, 0.0, OVERFLOW_PENALTY * overflow.sum(axis=(1, 2)))
+    return total_execution_time + BALANCE_WEIGHT * load_balance + penalty, valid
+
+
+class AssignmentState:
+
+    #Stanje jedne dodele sa agregatima po čvorovima koje omogućava
+    #O(1) procenu premeštanja zadatka (menjaju se samo dva čvora)
+
+    def __init__(self, assignment: np.ndarray, demand: np.ndarray, exec_times: np.ndarray,
+                 capacity: np.ndarray):
+        self.demand = demand
+        self.exec_times = exec_times
+        self.capacity = capacity
+        self.n_nodes = len(capacity)
+        self.assignment = np.array(assignment, dtype=int)
+        self.refresh()
+
+    def refresh(self):
+        #Ponovo računa sve agregate (uklanja akumuliranu numeričku grešku)
+        self.used, self.exec_sum, self.counts = node_usage(self.assignment, self.demand,
+                                                           self.exec_times, self.n_nodes)
+        self.loads = load_factors(self.used, self.capacity, self.counts)
+        self.sum_loads = float(np.sum(self.loads))
+        self.sum_loads_sq = float(np.sum(self.loads ** 2))
+        self.exec_terms = self.exec_sum * (1.0 + 2.0 * self.loads ** 2)
+        self.total_exec = float(np.sum(self.exec_terms))
+        self.overflow = np.sum(np.maximum(0.0, self.used - self.capacity), axis=1)
+        self.total_overflow = float(np.sum(self.overflow))
+
+    def _std(self, sum_loads, sum_loads_sq):
+        if self.n_nodes <= 1:
+            return 0.0 if np.isscalar(sum_loads) else np.zeros_like(sum_loads)
+        mean = sum_loads / self.n_nodes
+        return np.sqrt(np.maximum(0.0, sum_loads_sq / self.n_nodes - mean ** 2))
+
+    def objective(self) -> float:
+        penalty = OVERFLOW_PENALTY * self.total_overflow if self.total_overflow > 0 else 0.0
+        return self.total_exec + BALANCE_WEIGHT * self._std(self.sum_loads, self.sum_loads_sq) + penalty
+
+    def is_valid(self) -> bool:
+        return self.total_overflow <= 0
+
+    def _node_after(self, node, d_used, d_exec, d_count):
+        # Stanje čvora (opterećenje, član vremena, prekoračenje) posle promene
+        used = self.used[node] + d_used
+        count = self.counts[node] + d_count
+        load = np.where(count > 0, np.max(used / self.capacity[node], axis=-1), 0.0)
+        exec_term = (self.exec_sum[node] + d_exec) * (1.0 + 2.0 * load ** 2)
+        overflow = np.sum(np.maximum(0.0, used - self.capacity[node]), axis=-1)
+        return load, exec_term, overflow
+
+    def _delta(self, changed_nodes):
+        # changed_nodes: lista (node, load, exec_term, overflow) sa nizovima iste dužine
+        sum_loads = self.sum_loads
+        sum_loads_sq = self.sum_loads_sq
+        total_exec = self.total_exec
+        total_overflow = self.total_overflow
+        for node, load, exec_term, overflow in changed_nodes:
+            sum_loads = sum_loads - self.loads[node] + load
+            sum_loads_sq = sum_loads_sq - self.loads[node] ** 2 + load ** 2
+            total_exec = total_exec - self.exec_terms[node] + exec_term
+            total_overflow = total_overflow - self.overflow[node] + overflow
+        penalty = np.where(total_overflow > 1e-12, OVERFLOW_PENALTY * total_overflow, 0.0)
+        new_obj = total_exec + BALANCE_WEIGHT * self._std(sum_loads, sum_loads_sq) + penalty
+        return new_obj - self.objective(), total_overflow
+
+    def target_terms(self, task_idx, target) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """Stanje ciljnih čvorova (opterećenje, član vremena, prekoračenje) posle
+        prijema zadataka; zavisi samo od zadatka i ciljnog čvora, ne od izvora."""
+        task_idx = np.atleast_1d(np.asarray(task_idx, dtype=int))
+        target = np.atleast_1d(np.asarray(target, dtype=int))
+        task_idx, target = np.broadcast_arrays(task_idx, target)
+        return self._node_after(target, self.demand[task_idx], self.exec_times[task_idx], 1)
+
+    def relocate_delta(self, task_idx, target, target_terms=None) -> Tuple[np.ndarray, np.ndarray]:
+        """Vektorski računa promenu cilja za premeštanje zadataka na ciljne čvorove.
+
+        Vraća (delta_cilja, ukupno_prekoračenje_posle); parovi gde je
+        ciljni čvor isti kao trenutni dobijaju delta = +inf. target_terms su
+        unapred izračunati rezultati target_terms(task_idx, target) (npr. keš
+        u kome se posle poteza ponovo računaju samo kolone promenjenih čvorova).
+        """
+        task_idx = np.atleast_1d(np.asarray(task_idx, dtype=int))
+        target = np.atleast_1d(np.asarray(target, dtype=int))
+        task_idx, target = np.broadcast_arrays(task_idx, target)
+        source = self.assignment[task_idx]
+        d = self.demand[task_idx]
+        e = self.exec_times[task_idx]
+        src = self._node_after(source, -d, -e, -1)
+        dst = target_terms if target_terms is not None else self._node_after(target, d, e, 1)
+        delta, overflow = self._delta([(source, *src), (target, *dst)])
+        delta = np.where(source == target, np.inf, delta)
+        return delta, overflow
+
+    def swap_delta(self, task_a, task_b) -> Tuple[np.ndarray, np.ndarray]:
+        """Vektorski računa promenu cilja za zamenu čvorova dva zadatka"""
+        task_a = np.atleast_1d(np.asarray(task_a, dtype=int))
+        task_b = np.atleast_1d(np.asarray(task_b, dtype=int))
+        task_a, task_b = np.broadcast_arrays(task_a, task_b)
+        node_a = self.assignment[task_a]
+        node_b = self.assignment[task_b]
+        d_used = self.demand[task_b] - self.demand[task_a]
+        d_exec = self.exec_times[task_b] - self.exec_times[task_a]
+        a_after = self._node_after(node_a, d_used, d_exec, 0)
+        b_after = self._node_after(node_b, -d_used, -d_exec, 0)
+        delta, overflow = self._delta([(node_a, *a_after), (node_b, *b_after)])
+        delta = np.where(node_a == node_b, np.inf, delta)
+        return delta, overflow
+
+    def _update_node(self, node):
+        load, exec_term, overflow = self._node_after(node, 0.0, 0.0, 0)
+        load, exec_term, overflow = float(load), float(exec_term), float(overflow)
+        self.sum_loads += load - self.loads[node]
+        self.sum_loads_sq += load ** 2 - self.loads[node] ** 2
+        self.total_exec += exec_term - self.exec_terms[node]
+        self.total_overflow += overflow - self.overflow[node]
+        if self.total_overflow < 1e-12:
+            self.total_overflow = 0.0
+        self.loads[node] = load
+        self.exec_terms[node] = exec_term
+        self.overflow[node] = overflow
+
+    def relocate(self, task: int, target: int):
+        """Premešta zadatak na ciljni čvor i ažurira agregate"""
+        source = self.assignment[task]
+        if source == target:
+            return
+        self.used[source] -= self.demand[task]
+        self.used[target] += self.demand[task]
+        self.exec_sum[source] -= self.exec_times[task]
+        self.exec_sum[target] += self.exec_times[task]
+        self.counts[source] -= 1
+        self.counts[target] += 1
+        self.assignment[task] = target
+        self._update_node(source)
+        self._update_node(target)
+
+    def swap(self, task_a: int, task_b: int):
+        """Menja čvorove dva zadatka"""
+        node_a = self.assignment[task_a]
+        node_b = self.assignment[task_b]
+        if node_a == node_b:
+            return
+        self.relocate(task_a, node_b)
+        self.relocate(task_b, node_a)
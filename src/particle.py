@@ -1,23 +1,41 @@
 import numpy as np
 import random
 from task import Task
-from typing import List,Tuple
+from typing import List,Tuple,Optional
 from computerNode import ComputeNode
+from domains import TaskDomains, build_domains
+from population import position_dtype
 
 class Particle:
 
     #Čestica u EM algoritmu koja predstavlja jedno rešenje
     #(raspored zadataka po čvorovima)
 
-    def __init__(self, tasks: List[Task], nodes: List[ComputeNode]):
+    def __init__(self, tasks: List[Task], nodes: List[ComputeNode], domains: Optional[TaskDomains] = None,
+                 position: Optional[np.ndarray] = None):
         self.tasks = tasks
-        self.nodes = [ComputeNode(node.id, node.cpu_capacity, node.memory_capacity, node.network_capacity)
-                      for node in nodes]  # Pravi kopije čvorova
-        self.position = np.zeros(len(tasks), dtype=int)  # Pozicija čestice (raspored zadataka)
+        self._source_nodes = nodes
+        self._nodes = None  # Kopije čvorova se prave tek kada zatrebaju
+        self.domains = domains if domains is not None else build_domains(tasks, nodes)  # Dozvoljeni čvorovi po zadatku
         self.charge = 0.0  # Naelektrisanje čestice (kvalitet rešenja)
 
-        # Inicijalno slučajno raspoređujemo zadatke
-        self.randomize_allocation()
+        if position is not None:
+            # Pozicija je zadata (npr. red matrice populacije), bez slučajnog rasporeda
+            self.position = position
+        else:
+            # Pozicija čestice (raspored zadataka) u najmanjem tipu u koji staje id čvora
+            max_id = max((node.id for node in nodes), default=0)
+            self.position = np.zeros(len(tasks), dtype=position_dtype(max_id + 1))
+            # Inicijalno slučajno raspoređujemo zadatke
+            self.randomize_allocation()
+
+    @property
+    def nodes(self) -> List[ComputeNode]:
+        #Kopije čvorova sa stanjem ove čestice (prave se pri prvom pristupu)
+        if self._nodes is None:
+            self._nodes = [ComputeNode(node.id, node.cpu_capacity, node.memory_capacity, node.network_capacity)
+                           for node in self._source_nodes]
+        return self._nodes
 
     def randomize_allocation(self):
         #Slučajno raspoređuje zadatke na čvorove
@@ -33,8 +51,9 @@ class Particle:
         for i, task in enumerate(self.tasks):
             task.assigned_node = None
 
-            # Pravimo listu čvorova koji mogu da prime zadatak
-            valid_nodes = [node for node in self.nodes if node.can_accommodate(task)]
+            # Pravimo listu čvorova iz domena zadatka koji trenutno mogu da ga prime
+            domain = self.domains.indices[i]
+            valid_nodes = [self.nodes[k] for k in domain if self.nodes[k].can_accommodate(task)]
 
             if valid_nodes:
                 # Biramo slučajni čvor iz liste validnih
@@ -42,9 +61,9 @@ class Particle:
                 selected_node.assign_task(task)
                 self.position[i] = selected_node.id
             else:
-                # Ako nema validnih čvorova, biramo slučajan čvor
+                # Ako nema validnih čvorova, biramo slučajan čvor iz domena
                 # (ovo će biti nevalidno rešenje ali omogućava dalju pretragu)
-                self.position[i] = random.randint(0, len(self.nodes) - 1)
+                self.position[i] = self.nodes[random.choice(domain)].id
 
     def update_nodes_from_position(self):
         #Ažurira stanje čvorova na osnovu trenutne pozicije
@@ -1,154 +1,260 @@
+import argparse
 import json
-import matplotlib.pyplot as plt
 import numpy as np
 from pathlib import Path
 
-# Putanja do JSON fajla sa rezultatima
-results_file = Path("results/results_1759346162.json")
-with open(results_file, 'r') as f:
-    data = json.load(f)
-
-# --- Priprema podataka ---
-bf_data = []  # samo testovi gde postoji BF
-greedy_data = []
-em_data = []
-
-for res in data:
-    tasks = res['tasks']
-    nodes = res['nodes']
-    n_comb = nodes ** tasks
-    
-    # Proveri da li postoji BF rezultat
-    bf_exists = res.get('bruteforce') is not None
-    
-    if bf_exists:
+from results_store import ResultsStore, DEFAULT_DB_PATH
+
+
+def load_data(db_path=DEFAULT_DB_PATH, run_id=None, json_path=None):
+    """Učitava rezultate iz SQLite baze (podrazumevano poslednje pokretanje) ili iz JSON fajla"""
+    if json_path is not None:
+        with open(json_path, 'r') as f:
+            return json.load(f)
+    store = ResultsStore(db_path)
+    try:
+        return store.load_results(run_id)
+    finally:
+        store.close()
+
+
+SOLVER_STYLES = {
+    'bruteforce': ('Brute-Force', '#F18F01', 'x'),
+    'greedy': ('Greedy', '#2E86AB', 'o'),
+    'em': ('EM', '#A23B72', 's'),
+    'tabu': ('Tabu', '#3B8F4A', '^'),
+    'grasp': ('GRASP', '#C73E1D', 'D'),
+}
+
+
+def _solver_label(solver):
+    # (oznaka, boja) solvera za legende
+    return SOLVER_STYLES.get(solver, (solver, None))[:2]
+
+
+def plot_comparison(data, output_path='results/comparison_plot.png', show=True):
+    import matplotlib.pyplot as plt
+    # --- Priprema podataka ---
+    # Gap i speedup prema BF za svaki solver iz SOLVER_STYLES (samo testovi gde postoji BF)
+    solvers = [solver for solver in SOLVER_STYLES if solver != 'bruteforce']
+    solver_data = {solver: [] for solver in solvers}
+
+    for res in data:
+        tasks = res['tasks']
+        nodes = res['nodes']
+        n_comb = nodes ** tasks
+
+        # Proveri da li postoji BF rezultat
+        if res.get('bruteforce') is None:
+            continue
         bf_obj = res['bruteforce']['objective']
         bf_time = res['bruteforce']['time']
-        
-        # Greedy
-        if res.get('greedy') and res['greedy'].get('valid'):
-            greedy_obj = res['greedy']['objective']
-            greedy_time = res['greedy']['time']
-            greedy_gap = ((greedy_obj - bf_obj) / bf_obj) * 100
-            greedy_speedup = bf_time / greedy_time if greedy_time > 0 else 0
-            
-            greedy_data.append({
-                'combinations': n_comb,
-                'gap': greedy_gap,
-                'speedup': greedy_speedup,
-                'test': res['test']
-            })
-        
-        # EM
-        if res.get('em') and res['em'].get('valid'):
-            em_obj = res['em']['objective']
-            em_time = res['em']['time']
-            em_gap = ((em_obj - bf_obj) / bf_obj) * 100
-            em_speedup = bf_time / em_time if em_time > 0 else 0
-            
-            em_data.append({
+
+        for solver in solvers:
+            result = res.get(solver)
+            if not result or not result.get('valid'):
+                continue
+            solver_data[solver].append({
                 'combinations': n_comb,
-                'gap': em_gap,
-                'speedup': em_speedup,
+                'gap': ((result['objective'] - bf_obj) / bf_obj) * 100,
+                'speedup': bf_time / result['time'] if result['time'] > 0 else 0,
                 'test': res['test']
             })
 
-# Sortiraj po broju kombinacija
-greedy_data.sort(key=lambda x: x['combinations'])
-em_data.sort(key=lambda x: x['combinations'])
-
-# Ekstraktuj podatke
-greedy_combs = [d['combinations'] for d in greedy_data]
-greedy_gaps = [d['gap'] for d in greedy_data]
-greedy_speedups = [d['speedup'] for d in greedy_data]
-
-em_combs = [d['combinations'] for d in em_data]
-em_gaps = [d['gap'] for d in em_data]
-em_speedups = [d['speedup'] for d in em_data]
-
-# --- Plot ---
-fig, (ax1, ax2) = plt.subplots(1, 2, figsize=(15, 6))
-
-# 1. Gap graf
-if greedy_combs:
-    ax1.plot(greedy_combs, greedy_gaps, 'o-', 
-             label='Greedy', color='#2E86AB', linewidth=2.5, markersize=8)
-
-if em_combs:
-    ax1.plot(em_combs, em_gaps, 's-', 
-             label='EM', color='#A23B72', linewidth=2.5, markersize=8)
-
-ax1.set_xscale('log')
-ax1.set_xlabel('Broj kombinacija', fontsize=12, fontweight='bold')
-ax1.set_ylabel('Gap od optimalnog (%)', fontsize=12, fontweight='bold')
-ax1.set_title('Kvalitet resenja - odstupanje od BF optimuma', fontsize=14, fontweight='bold')
-ax1.legend(fontsize=11, framealpha=0.9)
-ax1.grid(True, which="both", ls="--", alpha=0.3)
-ax1.axhline(y=0, color='green', linestyle='--', linewidth=1, alpha=0.5, label='Optimalno')
-
-# Dodaj anotacije za zanimljive tacke
-if em_gaps and max(em_gaps) > 0:
-    max_gap_idx = em_gaps.index(max(em_gaps))
-    ax1.annotate(f'{em_gaps[max_gap_idx]:.2f}%', 
-                xy=(em_combs[max_gap_idx], em_gaps[max_gap_idx]),
-                xytext=(10, 10), textcoords='offset points',
-                fontsize=9, alpha=0.7)
-
-# 2. Speedup graf
-if greedy_combs:
-    ax2.plot(greedy_combs, greedy_speedups, 'o-', 
-             label='Greedy', color='#2E86AB', linewidth=2.5, markersize=8)
-
-if em_combs:
-    ax2.plot(em_combs, em_speedups, 's-', 
-             label='EM', color='#A23B72', linewidth=2.5, markersize=8)
-
-ax2.set_xscale('log')
-ax2.set_yscale('log')
-ax2.set_xlabel('Broj kombinacija', fontsize=12, fontweight='bold')
-ax2.set_ylabel('Speedup (BF vreme / algoritam vreme)', fontsize=12, fontweight='bold')
-ax2.set_title('Brzina izvrsavanja - ubrzanje u odnosu na BF', fontsize=14, fontweight='bold')
-ax2.legend(fontsize=11, framealpha=0.9)
-ax2.grid(True, which="both", ls="--", alpha=0.3)
-ax2.axhline(y=1, color='red', linestyle='--', linewidth=1, alpha=0.5, label='Jednako brzo')
-
-# Dodaj anotaciju za najbolji speedup
-if em_speedups:
-    max_speedup_idx = em_speedups.index(max(em_speedups))
-    ax2.annotate(f'{em_speedups[max_speedup_idx]:.1f}x', 
-                xy=(em_combs[max_speedup_idx], em_speedups[max_speedup_idx]),
-                xytext=(10, -15), textcoords='offset points',
-                fontsize=9, alpha=0.7)
-
-plt.tight_layout()
-plt.savefig('results/comparison_plot.png', dpi=300, bbox_inches='tight')
-plt.show()
-
-# --- Ispis statistike ---
-print("\n" + "="*60)
-print("STATISTIKA POREDJENJA SA BRUTE-FORCE")
-print("="*60)
-
-if greedy_data:
-    print("\nGREEDY:")
-    avg_gap = np.mean(greedy_gaps)
-    avg_speedup = np.mean(greedy_speedups)
-    print(f"  Prosecan gap: {avg_gap:.2f}%")
-    print(f"  Prosecan speedup: {avg_speedup:.2f}x")
-    print(f"  Najbolji gap: {min(greedy_gaps):.2f}%")
-    print(f"  Najgori gap: {max(greedy_gaps):.2f}%")
-
-if em_data:
-    print("\nEM:")
-    avg_gap = np.mean(em_gaps)
-    avg_speedup = np.mean(em_speedups)
-    print(f"  Prosecan gap: {avg_gap:.2f}%")
-    print(f"  Prosecan speedup: {avg_speedup:.2f}x")
-    print(f"  Najbolji gap: {min(em_gaps):.2f}%")
-    print(f"  Najgori gap: {max(em_gaps):.2f}%")
-
-print("\n" + "="*60)
-print(f"Ukupno testova sa BF: {len(set(greedy_combs + em_combs))}")
-print(f"Testova sa Greedy: {len(greedy_data)}")
-print(f"Testova sa EM: {len(em_data)}")
-print("="*60)
+    # Sortiraj po broju kombinacija i ekstraktuj podatke
+    series = {}
+    for solver, points in solver_data.items():
+        points.sort(key=lambda x: x['combinations'])
+        series[solver] = ([d['combinations'] for d in points],
+                          [d['gap'] for d in points],
+                          [d['speedup'] for d in points])
+    em_combs, em_gaps, em_speedups = series.get('em', ([], [], []))
+
+    # --- Plot ---
+    fig, (ax1, ax2) = plt.subplots(1, 2, figsize=(15, 6))
+
+    # 1. Gap graf i 2. Speedup graf
+    for solver, (combs, gaps, speedups) in series.items():
+        if not combs:
+            continue
+        label, color, marker = SOLVER_STYLES[solver]
+        ax1.plot(combs, gaps, marker + '-', label=label, color=color, linewidth=2.5, markersize=8)
+        ax2.plot(combs, speedups, marker + '-', label=label, color=color, linewidth=2.5, markersize=8)
+
+    ax1.set_xscale('log')
+    ax1.set_xlabel('Broj kombinacija', fontsize=12, fontweight='bold')
+    ax1.set_ylabel('Gap od optimalnog (%)', fontsize=12, fontweight='bold')
+    ax1.set_title('Kvalitet resenja - odstupanje od BF optimuma', fontsize=14, fontweight='bold')
+    ax1.legend(fontsize=11, framealpha=0.9)
+    ax1.grid(True, which="both", ls="--", alpha=0.3)
+    ax1.axhline(y=0, color='green', linestyle='--', linewidth=1, alpha=0.5, label='Optimalno')
+
+    # Dodaj anotacije za zanimljive tacke
+    if em_gaps and max(em_gaps) > 0:
+        max_gap_idx = em_gaps.index(max(em_gaps))
+        ax1.annotate(f'{em_gaps[max_gap_idx]:.2f}%', 
+                    xy=(em_combs[max_gap_idx], em_gaps[max_gap_idx]),
+                    xytext=(10, 10), textcoords='offset points',
+                    fontsize=9, alpha=0.7)
+
+    ax2.set_xscale('log')
+    ax2.set_yscale('log')
+    ax2.set_xlabel('Broj kombinacija', fontsize=12, fontweight='bold')
+    ax2.set_ylabel('Speedup (BF vreme / algoritam vreme)', fontsize=12, fontweight='bold')
+    ax2.set_title('Brzina izvrsavanja - ubrzanje u odnosu na BF', fontsize=14, fontweight='bold')
+    ax2.legend(fontsize=11, framealpha=0.9)
+    ax2.grid(True, which="both", ls="--", alpha=0.3)
+    ax2.axhline(y=1, color='red', linestyle='--', linewidth=1, alpha=0.5, label='Jednako brzo')
+
+    # Dodaj anotaciju za najbolji speedup
+    if em_speedups:
+        max_speedup_idx = em_speedups.index(max(em_speedups))
+        ax2.annotate(f'{em_speedups[max_speedup_idx]:.1f}x', 
+                    xy=(em_combs[max_speedup_idx], em_speedups[max_speedup_idx]),
+                    xytext=(10, -15), textcoords='offset points',
+                    fontsize=9, alpha=0.7)
+
+    plt.tight_layout()
+    plt.savefig(output_path, dpi=300, bbox_inches='tight')
+    if show:
+        plt.show()
+    plt.close()
+
+    # --- Ispis statistike ---
+    print("\n" + "="*60)
+    print("STATISTIKA POREDJENJA SA BRUTE-FORCE")
+    print("="*60)
+
+    for solver, (combs, gaps, speedups) in series.items():
+        if not combs:
+            continue
+        print(f"\n{SOLVER_STYLES[solver][0].upper()}:")
+        print(f"  Prosecan gap: {np.mean(gaps):.2f}%")
+        print(f"  Prosecan speedup: {np.mean(speedups):.2f}x")
+        print(f"  Najbolji gap: {min(gaps):.2f}%")
+        print(f"  Najgori gap: {max(gaps):.2f}%")
+
+    print("\n" + "="*60)
+    print(f"Ukupno testova sa BF: {len({d['test'] for points in solver_data.values() for d in points})}")
+    for solver, points in solver_data.items():
+        print(f"Testova sa {SOLVER_STYLES[solver][0]}: {len(points)}")
+    print("="*60)
+
+
+def _ttt_samples(data):
+    # Skuplja vremena do cilja po solveru: {solver: {test: [vremena ili None]}}
+    samples = {}
+    for res in data:
+        for solver, result in res.items():
+            if isinstance(result, dict) and result.get('ttt') is not None:
+                samples.setdefault(solver, {})[res['test']] = result['ttt']
+    return samples
+
+
+def plot_ttt(data, output_path='results/ttt_plot.png', show=False):
+    """
+    TTT grafik: empirijska raspodela vremena do cilja po solveru
+    (sva pokretanja sa svih instanci; nedostignut cilj se računa kao neuspeh).
+    """
+    samples = _ttt_samples(data)
+    if not samples:
+        print("Nema podataka o vremenu do cilja")
+        return
+    import matplotlib.pyplot as plt
+
+    plt.figure(figsize=(8, 6))
+    for solver, per_test in samples.items():
+        runs = [t for ttt in per_test.values() for t in ttt]
+        reached = sorted(max(t, 1e-6) for t in runs if t is not None)
+        if not reached:
+            continue
+        probs = [(i + 0.5) / len(runs) for i in range(len(reached))]
+        label, color = _solver_label(solver)
+        plt.step([reached[0]] + reached, [0.0] + probs, where='post',
+                 label=f"{label} ({len(reached)}/{len(runs)})", color=color, linewidth=2, marker='o')
+
+    plt.xscale('log')
+    plt.ylim(0, 1.05)
+    plt.xlabel('Vreme do cilja (s)', fontsize=12, fontweight='bold')
+    plt.ylabel('Kumulativna verovatnoca', fontsize=12, fontweight='bold')
+    plt.title('Time-to-target raspodela', fontsize=14, fontweight='bold')
+    plt.legend(fontsize=11, framealpha=0.9)
+    plt.grid(True, which="both", ls="--", alpha=0.3)
+    plt.tight_layout()
+    plt.savefig(output_path, dpi=300, bbox_inches='tight')
+    if show:
+        plt.show()
+    plt.close()
+
+
+def plot_performance_profile(data, output_path='results/performance_profile.png', show=False):
+    """
+    Performance profile (Dolan-More) nad medijanom vremena do cilja:
+    udeo instanci na kojima je solver najviše tau puta sporiji od najboljeg.
+    """
+    samples = _ttt_samples(data)
+    if not samples:
+        print("Nema podataka o vremenu do cilja")
+        return
+    import matplotlib.pyplot as plt
+
+    tests = sorted({test for per_test in samples.values() for test in per_test})
+    solvers = list(samples.keys())
+    times = np.full((len(solvers), len(tests)), np.inf)
+    for si, solver in enumerate(solvers):
+        for ti, test in enumerate(tests):
+            ttt = samples[solver].get(test)
+            if not ttt:
+                continue
+            reached = [t for t in ttt if t is not None]
+            # Solver "rešava" instancu ako dostigne cilj u bar pola pokretanja
+            if len(reached) * 2 >= len(ttt):
+                times[si, ti] = max(np.median(reached), 1e-6)
+
+    best = times.min(axis=0)
+    solved = np.isfinite(best)
+    if not solved.any():
+        print("Nijedan solver nije dostigao cilj")
+        return
+    ratios = times[:, solved] / best[solved]
+    finite = ratios[np.isfinite(ratios)]
+    max_tau = max(2.0, float(finite.max()) * 1.5) if finite.size else 2.0
+    taus = np.logspace(0, np.log10(max_tau), 200)
+
+    plt.figure(figsize=(8, 6))
+    for si, solver in enumerate(solvers):
+        profile = [(ratios[si] <= tau).mean() for tau in taus]
+        label, color = _solver_label(solver)
+        plt.step(taus, profile, where='post', label=label, color=color, linewidth=2)
+
+    plt.xscale('log')
+    plt.ylim(0, 1.05)
+    plt.xlabel('tau (odnos prema najbržem solveru)', fontsize=12, fontweight='bold')
+    plt.ylabel('Udeo instanci', fontsize=12, fontweight='bold')
+    plt.title('Performance profile - vreme do cilja', fontsize=14, fontweight='bold')
+    plt.legend(fontsize=11, framealpha=0.9)
+    plt.grid(True, which="both", ls="--", alpha=0.3)
+    plt.tight_layout()
+    plt.savefig(output_path, dpi=300, bbox_inches='tight')
+    if show:
+        plt.show()
+    plt.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Grafik poređenja solvera sa brute-force rešenjem')
+    parser.add_argument('--db', default=str(DEFAULT_DB_PATH), help='SQLite baza rezultata')
+    parser.add_argument('--run', type=int, default=None, help='Id pokretanja (podrazumevano poslednje)')
+    parser.add_argument('--json', default=None, help='Stari results_<timestamp>.json umesto baze')
+    parser.add_argument('--output', default='results/comparison_plot.png')
+    args = parser.parse_args()
+
+    data = load_data(args.db, args.run, args.json)
+    plot_comparison(data, args.output)
+    output_dir = Path(args.output).parent
+    plot_ttt(data, output_dir / 'ttt_plot.png')
+    plot_performance_profile(data, output_dir / 'performance_profile.png')
+
+
+if __name__ == "__main__":
+    main()
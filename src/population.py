@@ -0,0 +1,133 @@
+# src/population.py
+import math
+from typing import Optional
+
+import numpy as np
+
+from domains import TaskDomains
+
+# Kompaktno čuvanje populacije: pozicije svih čestica su jedna P×T matrica
+# najmanjeg celobrojnog tipa u koji staje id čvora, uz opciono pakovanje po
+# bitovima (bit-ravni) za mali broj čvorova i Hamingovo rastojanje nad
+# spakovanim oblikom.
+
+# Procena radne memorije jednog koraka EM po elementu P×T (float kopije,
+# sile, verovatnoće, indeksi i privremeni nizovi evaluacije); izmereno
+# tracemalloc-om nad korakom calculate_forces + move_population (~65 B)
+STEP_BYTES_PER_ENTRY = 66
+# Tačne sile drže nekoliko P×P float matrica
+EXACT_BYTES_PER_PAIR = 48
+
+# Broj jedinica u svakom bajtu (popcount)
+_POPCOUNT = np.array([bin(i).count('1') for i in range(256)], dtype=np.uint8)
+
+
+def position_dtype(n_values: int) -> np.dtype:
+    """Najmanji neoznačeni celobrojni tip za vrednosti 0..n_values-1"""
+    for dtype in (np.uint8, np.uint16, np.uint32):
+        if n_values <= np.iinfo(dtype).max + 1:
+            return np.dtype(dtype)
+    return np.dtype(np.uint64)
+
+
+def bits_per_position(n_nodes: int) -> int:
+    """Broj bitova za indeks čvora"""
+    return max(1, math.ceil(math.log2(max(2, n_nodes))))
+
+
+def pack_positions(positions: np.ndarray, n_nodes: int) -> np.ndarray:
+    """
+    Pakuje pozicije (P×T ili T) u bit-ravni: bit j svih zadataka jedne čestice
+    je jedan niz bajtova. Oblik je P×b×ceil(T/8) (ili b×ceil(T/8) za jednu česticu),
+    tj. b/8 bajtova po zadatku umesto 8 za int64.
+    """
+    positions = np.asarray(positions)
+    single = positions.ndim == 1
+    positions = np.atleast_2d(positions)
+    bits = bits_per_position(n_nodes)
+    planes = np.stack([(positions >> j) & 1 for j in range(bits)], axis=1).astype(np.uint8)
+    packed = np.packbits(planes, axis=2)
+    return packed[0] if single else packed
+
+
+def unpack_positions(packed: np.ndarray, n_tasks: int, n_nodes: int) -> np.ndarray:
+    """Obrnuto od pack_positions; vraća pozicije u position_dtype(n_nodes)"""
+    single = packed.ndim == 2
+    packed = packed[None] if single else packed
+    planes = np.unpackbits(packed, axis=2, count=n_tasks).astype(position_dtype(n_nodes))
+    positions = np.zeros((packed.shape[0], n_tasks), dtype=position_dtype(n_nodes))
+    for j in range(planes.shape[1]):
+        positions |= planes[:, j] << j
+    return positions[0] if single else positions
+
+
+def hamming_distance(a: np.ndarray, b: np.ndarray) -> np.ndarray:
+    """
+    Broj zadataka na različitim čvorovima između spakovanih pozicija.
+    a i b su b×B (jedna čestica) ili P×b×B; zadatak se razlikuje ako se
+    razlikuje u bar jednoj bit-ravni.
+    """
+    diff = np.bitwise_or.reduce(np.bitwise_xor(a, b), axis=-2)
+    return _POPCOUNT[diff].sum(axis=-1, dtype=np.int64)
+
+
+def hamming_matrix(packed: np.ndarray, block_elements: int = 1 << 24) -> np.ndarray:
+    """Hamingova rastojanja svih parova (P×P) nad spakovanom populacijom, po blokovima redova"""
+    n = len(packed)
+    result = np.zeros((n, n), dtype=np.int64)
+    block = max(1, block_elements // max(1, packed[0].size * n))
+    for start in range(0, n, block):
+        rows = packed[start:start + block]
+        result[start:start + block] = hamming_distance(rows[:, None], packed[None, :])
+    return result
+
+
+def random_positions(domains: TaskDomains, demand: np.ndarray, capacity: np.ndarray, n_particles: int,
+                     node_ids: np.ndarray, dtype: Optional[np.dtype] = None) -> np.ndarray:
+    """
+    Slučajne početne pozicije za celu populaciju (isto pravilo kao
+    Particle.randomize_allocation): svaki zadatak ide na slučajan čvor iz
+    domena koji ga trenutno može primiti, a ako takvog nema na slučajan čvor
+    iz domena. Petlja je po zadacima, a sve čestice se obrađuju odjednom.
+    """
+    n_tasks, n_nodes = len(demand), len(capacity)
+    dtype = dtype if dtype is not None else position_dtype(int(node_ids.max()) + 1 if n_nodes else 1)
+    positions = np.empty((n_particles, n_tasks), dtype=dtype)
+    used = np.zeros((n_particles, n_nodes, 3))
+    rows = np.arange(n_particles)
+    for t in range(n_tasks):
+        domain = domains.feasible[t]
+        fits = np.all(capacity[None, :, :] - used >= demand[t], axis=2) & domain
+        # Slučajan izbor među dozvoljenim čvorovima: najveći slučajni ključ
+        keys = np.random.random((n_particles, n_nodes))
+        chosen = np.where(fits.any(axis=1),
+                          np.argmax(np.where(fits, keys, -1.0), axis=1),
+                          np.argmax(np.where(domain, keys, -1.0), axis=1))
+        placed = fits.any(axis=1)
+        used[rows[placed], chosen[placed]] += demand[t]
+        positions[:, t] = node_ids[chosen]
+    return positions
+
+
+def population_bytes(n_particles: int, n_tasks: int, n_nodes: int, force_mode: str = 'exact',
+                     pivots: int = 24) -> int:
+    """Procena vršne memorije EM populacije: pozicije + radna memorija jednog koraka"""
+    entries = n_particles * n_tasks
+    resident = entries * position_dtype(n_nodes).itemsize
+    pairs = n_particles * (n_particles if force_mode == 'exact' else min(n_particles, pivots))
+    return int(resident + entries * STEP_BYTES_PER_ENTRY + pairs * EXACT_BYTES_PER_PAIR)
+
+
+def population_size_for_budget(memory_budget: int, n_tasks: int, n_nodes: int, force_mode: str = 'exact',
+                               pivots: int = 24) -> int:
+    """Najveća populacija čija procenjena vršna memorija staje u memory_budget bajtova"""
+    low, high = 0, 1
+    while population_bytes(high, n_tasks, n_nodes, force_mode, pivots) <= memory_budget:
+        low, high = high, high * 2
+    while high - low > 1:
+        mid = (low + high) // 2
+        if population_bytes(mid, n_tasks, n_nodes, force_mode, pivots) <= memory_budget:
+            low = mid
+        else:
+            high = mid
+    return low
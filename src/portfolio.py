@@ -0,0 +1,275 @@
+# src/portfolio.py
+import argparse
+import json
+import multiprocessing as mp
+import queue
+import random
+import time
+from typing import List, Tuple, Optional
+
+import numpy as np
+
+from task import Task
+from computerNode import ComputeNode
+from greedy import greedy_schedule
+from trajectory import Trajectory
+from domains import build_domains
+from instance_arrays import tasks_to_arrays, nodes_to_arrays, ids_to_indices, evaluate_assignment
+
+# Portfolio: više solvera (i više EM semena) radi istovremeno do zajedničkog roka.
+# Greedy se izvršava prvi i odmah postaje seme za EM i tabu i gornja granica
+# za brute force. Najbolje validno rešenje svih solvera se deli kroz mp.Value:
+# EM i tabu ga spuštaju usput, a brute force ga čita kao gornju granicu.
+# Kada brute force završi pretragu (dokazan optimum) ili istekne rok, ostali
+# procesi dobijaju signal za prekid i vraća se najbolje rešenje.
+
+DEFAULT_TIME_LIMIT = 10.0
+POLL_INTERVAL = 0.1  # Koliko često se proveravaju procesi koji su pali bez rezultata
+
+
+def _remaining(deadline: float) -> float:
+    return max(0.0, deadline - time.time())
+
+
+def _lower(incumbent, objective: float):
+    # Spušta deljenu granicu (najbolji validan cilj svih solvera)
+    with incumbent.get_lock():
+        if objective < incumbent.value:
+            incumbent.value = objective
+
+
+def _publishing(stop, incumbent, best):
+    # should_stop za EM i tabu: pri svakoj proveri objavljuje najbolje validno
+    # rešenje solvera (best() vraća (cilj, validnost)) u deljenu granicu
+    def should_stop():
+        objective, valid = best()
+        if valid:
+            _lower(incumbent, objective)
+        return stop.is_set()
+    return should_stop
+
+
+def _bruteforce_worker(tasks, nodes, domains, deadline, upper_bound, incumbent, stop, results):
+    from bruteforce import brute_force_search
+
+    interrupted = [False]
+
+    def should_stop():
+        if stop.is_set():
+            interrupted[0] = True
+        return interrupted[0]
+
+    # Granica samo opada, pa se čita bez zaključavanja (get_obj zaobilazi lock)
+    shared = incumbent.get_obj()
+    limit = _remaining(deadline)
+    assignment, objective, valid, runtime = brute_force_search(
+        tasks, nodes, time_limit=limit, prune=True, upper_bound=upper_bound, should_stop=should_stop,
+        domains=domains, shared_bound=lambda: shared.value
+    )
+    # Pretraga koja nije prekinuta ni signalom ni rokom je prošla ceo prostor: bolje
+    # od njenog rešenja i deljene granice ne postoji (rešenje na granici drži drugi solver)
+    complete = not interrupted[0] and runtime < limit
+    results.put({'solver': 'bruteforce', 'assignment': assignment, 'objective': objective,
+                 'valid': valid, 'runtime': runtime, 'optimal': complete})
+
+
+def _em_worker(tasks, nodes, domains, deadline, seed, config, initial_assignment, incumbent, stop, results):
+    from algorithm import ElectromagnetismAlgorithm
+
+    random.seed(seed)
+    np.random.seed(seed)
+    em = ElectromagnetismAlgorithm(tasks, nodes,
+                                   population_size=config['population_size'],
+                                   max_iterations=config['max_iterations'],
+                                   local_search_attempts=config['local_search_attempts'],
+                                   verbose=False, time_limit=_remaining(deadline),
+                                   initial_positions=[initial_assignment] if initial_assignment else None,
+                                   domains=domains)
+    # EM pravi novu putanju u run(), pa se čita preko em.trajectory pri svakoj proveri
+    em.should_stop = _publishing(stop, incumbent,
+                                 lambda: (em.trajectory.best_objective, em.trajectory.best_valid))
+    t0 = time.time()
+    best_particle, objective = em.run()
+    runtime = time.time() - t0
+    assignment, valid = None, False
+    if best_particle is not None:
+        _, valid = best_particle.evaluate()
+        assignment = [int(x) for x in best_particle.position]
+    results.put({'solver': f'em[{seed}]', 'assignment': assignment, 'objective': objective,
+                 'valid': valid, 'runtime': runtime, 'optimal': False})
+
+
+def _tabu_worker(tasks, nodes, domains, deadline, seed, initial_assignment, incumbent, stop, results):
+    from tabu import tabu_search
+
+    trajectory = Trajectory()
+    assignment, objective, valid, runtime = tabu_search(
+        tasks, nodes, time_limit=_remaining(deadline), initial_assignment=initial_assignment,
+        seed=seed, trajectory=trajectory, domains=domains,
+        should_stop=_publishing(stop, incumbent, lambda: (trajectory.best_objective, trajectory.best_valid))
+    )
+    results.put({'solver': 'tabu', 'assignment': assignment, 'objective': objective,
+                 'valid': valid, 'runtime': runtime, 'optimal': False})
+
+
+def _rescore(result: dict, demand, exec_times, capacity, node_ids) -> dict:
+    # Svaki vraćeni raspored se ocenjuje istom ciljnom funkcijom (greedy ima
+    # sopstveni penal za prekoračenje, pa ciljevi solvera nisu uporedivi)
+    if result['assignment'] is not None:
+        result['objective'], result['valid'] = evaluate_assignment(
+            ids_to_indices(result['assignment'], node_ids), demand, exec_times, capacity)
+    return result
+
+
+def _better(a: dict, b: Optional[dict]) -> bool:
+    # Validno rešenje je uvek bolje od nevalidnog, zatim manja ciljna vrednost;
+    # pri istoj vrednosti prednost ima dokazani optimum
+    if b is None or b['assignment'] is None:
+        return a['assignment'] is not None
+    if a['assignment'] is None or a['valid'] != b['valid']:
+        return a['assignment'] is not None and a['valid']
+    if a['objective'] < b['objective'] - 1e-9:
+        return True
+    return a['optimal'] and not b['optimal'] and a['objective'] <= b['objective'] + 1e-9
+
+
+def portfolio_solve(tasks: List[Task], nodes: List[ComputeNode], time_limit: float = DEFAULT_TIME_LIMIT,
+                    em_seeds: int = 2, use_bruteforce: bool = True, use_tabu: bool = True,
+                    bruteforce_max_tasks: int = 20, seed: Optional[int] = None, grace: float = 0.5,
+                    trajectory: Optional[Trajectory] = None,
+                    report: Optional[dict] = None) -> Tuple[List[int], float, bool, float]:
+    """
+    Pokreće portfolio solvera nad istom instancom do zajedničkog roka.
+
+    Greedy se računa odmah; brute force (samo za instance do bruteforce_max_tasks
+    zadataka) ga koristi kao gornju granicu, a EM (em_seeds semena) i tabu kao
+    početno rešenje. Kada brute force dokaže optimum, ostali se prekidaju.
+    Procesi koji se ne zaustave za grace sekundi posle roka se gase, a na
+    procese koji padnu bez rezultata se ne čeka. Svi rasporedi se ocenjuju
+    istom ciljnom funkcijom (evaluate_assignment). Ako je prosleđen report
+    rečnik, u njega se upisuju rezultati po solveru.
+
+    Returns:
+        (assignment, objective, valid, runtime)
+    """
+    from autotuner import best_config
+
+    start_time = time.time()
+    deadline = start_time + time_limit
+    base_seed = 0 if seed is None else seed
+
+    demand, exec_times = tasks_to_arrays(tasks)
+    capacity, node_ids = nodes_to_arrays(nodes)
+
+    greedy_assign, _, _, greedy_time = greedy_schedule(tasks, nodes)
+    best = _rescore({'solver': 'greedy', 'assignment': greedy_assign, 'objective': float('inf'),
+                     'valid': False, 'runtime': greedy_time, 'optimal': False},
+                    demand, exec_times, capacity, node_ids)
+    greedy_obj, greedy_valid = best['objective'], best['valid']
+    finished = [best]
+    if trajectory is not None:
+        trajectory.count()
+        trajectory.improve(greedy_obj, greedy_valid)
+
+    # fork čuva već učitane module; spawn je rezerva na platformama bez fork-a
+    methods = mp.get_all_start_methods()
+    ctx = mp.get_context('fork' if 'fork' in methods else 'spawn')
+    stop = ctx.Event()
+    results = ctx.Queue()
+    incumbent = ctx.Value('d', greedy_obj if greedy_valid else float('inf'))
+
+    # Domeni se računaju jednom i dele svim solverima
+    domains = build_domains(tasks, nodes)
+    # Poslovi: (oznaka solvera u rezultatu, funkcija, argumenti)
+    jobs = []
+    if use_bruteforce and len(tasks) <= bruteforce_max_tasks:
+        upper_bound = greedy_obj if greedy_valid else None
+        jobs.append(('bruteforce', _bruteforce_worker,
+                     (tasks, nodes, domains, deadline, upper_bound, incumbent, stop, results)))
+    config = best_config(tasks, nodes)
+    for k in range(em_seeds):
+        jobs.append((f'em[{base_seed + k}]', _em_worker,
+                     (tasks, nodes, domains, deadline, base_seed + k, config, greedy_assign, incumbent, stop,
+                      results)))
+    if use_tabu:
+        jobs.append(('tabu', _tabu_worker,
+                     (tasks, nodes, domains, deadline, base_seed, greedy_assign, incumbent, stop, results)))
+
+    labels = [label for label, _, _ in jobs]
+    processes = [ctx.Process(target=target, args=args, daemon=True) for _, target, args in jobs]
+    for process in processes:
+        process.start()
+
+    # Čekamo rezultate do roka ili do dokazanog optimuma, pa još grace sekundi
+    # da prekinuti solveri pošalju svoje najbolje rešenje. Proces koji je završio
+    # sa greškom (izuzetak, OOM, signal) nikad neće poslati rezultat, pa se na njega ne čeka.
+    reported, crashed = set(), []
+    proven = False
+    grace_end = None
+    while len(reported) + len(crashed) < len(processes):
+        now = time.time()
+        if grace_end is None and now >= deadline:
+            stop.set()
+            grace_end = deadline + grace
+        if grace_end is not None and now >= grace_end:
+            break
+        try:
+            result = results.get(timeout=max(0.01, min(POLL_INTERVAL, (grace_end or deadline) - now)))
+        except queue.Empty:
+            crashed += [label for label, process in zip(labels, processes)
+                        if label not in reported and label not in crashed and process.exitcode not in (None, 0)]
+            continue
+        reported.add(result['solver'])
+        finished.append(_rescore(result, demand, exec_times, capacity, node_ids))
+        if trajectory is not None:
+            trajectory.improve(result['objective'], result['valid'])
+        if _better(result, best):
+            best = result
+        if result['optimal'] and grace_end is None:
+            proven = True
+            stop.set()
+            grace_end = time.time() + grace
+
+    stop.set()
+    for process in processes:
+        process.join(timeout=0.1)
+        if process.is_alive():
+            process.terminate()
+            process.join()
+    results.close()
+
+    runtime = time.time() - start_time
+    if report is not None:
+        report['winner'] = best['solver']
+        report['proven_optimal'] = proven
+        report['solvers'] = [{k: r[k] for k in ('solver', 'objective', 'valid', 'runtime', 'optimal')}
+                             for r in finished]
+        report['crashed'] = crashed
+        report['terminated'] = len(processes) - len(reported) - len(crashed)
+    return best['assignment'], best['objective'], best['valid'], runtime
+
+
+def main(argv=None):
+    from solve import load_instance
+
+    parser = argparse.ArgumentParser(description='Portfolio solvera sa zajedničkim rokom')
+    parser.add_argument('instance', help='Putanja do JSON instance')
+    parser.add_argument('--time-limit', type=float, default=DEFAULT_TIME_LIMIT)
+    parser.add_argument('--em-seeds', type=int, default=2)
+    parser.add_argument('--no-bruteforce', action='store_true')
+    parser.add_argument('--no-tabu', action='store_true')
+    parser.add_argument('--seed', type=int, default=None)
+    args = parser.parse_args(argv)
+
+    tasks, nodes = load_instance(args.instance)
+    report = {}
+    assignment, objective, valid, runtime = portfolio_solve(
+        tasks, nodes, time_limit=args.time_limit, em_seeds=args.em_seeds,
+        use_bruteforce=not args.no_bruteforce, use_tabu=not args.no_tabu, seed=args.seed, report=report
+    )
+    print(json.dumps({'instance': args.instance, 'assignment': assignment, 'objective': objective,
+                      'valid': valid, 'runtime': runtime, 'report': report}, indent=2, default=float))
+
+
+if __name__ == "__main__":
+    main()
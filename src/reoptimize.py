@@ -0,0 +1,170 @@
+# src/reoptimize.py
+import time
+from typing import List, Tuple, Optional
+
+import numpy as np
+
+from task import Task
+from computerNode import ComputeNode
+from instance_arrays import tasks_to_arrays, nodes_to_arrays, AssignmentState
+
+DEFAULT_TIME_LIMIT = 5.0
+
+
+def count_migrations(old_assignment: List[int], new_assignment: List[int]) -> int:
+    """Broj zadataka čiji se čvor promenio"""
+    return sum(1 for a, b in zip(old_assignment, new_assignment) if a != b)
+
+
+def _evict_overloaded(assignment: np.ndarray, demand: np.ndarray, capacity: np.ndarray) -> List[int]:
+    # Sa svakog prepunjenog čvora skidamo zadatke (najveći doprinos prekoračenju prvi)
+    # dok čvor ponovo ne stane u kapacitet; vraća listu skinutih zadataka
+    evicted = []
+    for node in range(len(capacity)):
+        on_node = np.flatnonzero(assignment == node)
+        if len(on_node) == 0:
+            continue
+        used = demand[on_node].sum(axis=0)
+        if np.all(used <= capacity[node]):
+            continue
+        order = on_node[np.argsort(-np.max(demand[on_node] / capacity[node], axis=1))]
+        for task in order:
+            if np.all(used <= capacity[node]):
+                break
+            used = used - demand[task]
+            evicted.append(int(task))
+    return evicted
+
+
+def _repair(assignment: np.ndarray, displaced: List[int], demand: np.ndarray,
+            capacity: np.ndarray) -> np.ndarray:
+    # Greedy vraćanje premeštenih zadataka (isto pravilo kao greedy_schedule):
+    # najteži prvi, na čvor sa najmanjim budućim opterećenjem koji može da ga primi
+    placed = np.flatnonzero(assignment >= 0)
+    used = np.zeros_like(capacity)
+    np.add.at(used, assignment[placed], demand[placed])
+    counts = np.bincount(assignment[placed], minlength=len(capacity))
+
+    weight = demand[:, 0] + demand[:, 1] / 10 + demand[:, 2] / 100
+    for task in sorted(displaced, key=lambda t: -weight[t]):
+        d = demand[task]
+        fits = np.all(capacity - used >= d, axis=1)
+        if fits.any():
+            future = np.max((used + d) / capacity, axis=1)
+            node = int(np.argmin(np.where(fits, future, np.inf)))
+        else:
+            current = np.where(counts > 0, np.max(used / capacity, axis=1), 0.0)
+            node = int(np.argmin(current))
+        assignment[task] = node
+        used[node] += d
+        counts[node] += 1
+    return assignment
+
+
+def reoptimize(tasks: List[Task], current_assignment: List[int], nodes: List[ComputeNode],
+               migration_budget: Optional[int] = None, migration_cost: float = 0.0,
+               max_iterations: int = 1000, time_limit: Optional[float] = DEFAULT_TIME_LIMIT,
+               candidate_nodes: int = 3) -> Tuple[List[int], float, bool, float]:
+    """
+    Ponovna optimizacija posle otkaza čvora ili promene kapaciteta.
+
+    current_assignment je postojeći raspored (id-jevi čvorova), a nodes je
+    novi skup čvorova. Prvo se premeštaju samo pogođeni zadaci (sa nestalih
+    ili prepunjenih čvorova), a zatim lokalna pretraga poboljšava rešenje uz
+    ograničenje migracija:
+      - migration_budget: najviše toliko dobrovoljnih premeštanja zadataka
+        (prinudna premeštanja iz popravke se ne računaju)
+      - migration_cost: dodatni trošak po premeštenom zadatku u ciljnoj funkciji
+    Kandidati za premeštanje su zadaci sa candidate_nodes najopterećenijih
+    čvorova i sa dva čvora promenjena poslednjim potezom. Poboljšanje traje
+    najviše time_limit sekundi (None = bez ograničenja).
+
+    Returns:
+        (assignment, objective, valid, runtime)
+    """
+    start_time = time.time()
+    demand, exec_times = tasks_to_arrays(tasks)
+    capacity, node_ids = nodes_to_arrays(nodes)
+    lookup = {int(node_id): i for i, node_id in enumerate(node_ids)}
+
+    # ---- Popravka: samo zadaci na nestalim ili prepunjenim čvorovima ----
+    original = np.array([lookup.get(int(a), -1) for a in current_assignment], dtype=int)
+    assignment = original.copy()
+    displaced = [int(t) for t in np.flatnonzero(assignment < 0)]
+    displaced += _evict_overloaded(assignment, demand, capacity)
+    for task in displaced:
+        assignment[task] = -1
+    assignment = _repair(assignment, displaced, demand, capacity)
+
+    # Referentni raspored za brojanje migracija je stanje posle popravke
+    # za premeštene zadatke, a originalni čvor za sve ostale
+    home = np.where(original >= 0, original, assignment)
+    home[displaced] = assignment[displaced]
+
+    # ---- Poboljšanje: lokalna pretraga sa ograničenjem migracija ----
+    state = AssignmentState(assignment, demand, exec_times, capacity)
+    n_nodes = len(nodes)
+    migrated = state.assignment != home
+    n_migrated = int(migrated.sum())
+    targets = np.arange(n_nodes)
+    candidate_nodes = max(1, min(candidate_nodes, n_nodes))
+
+    # Zadaci po čvoru (ažuriraju se pri svakom premeštanju, bez prolaza kroz sve zadatke)
+    members = [set() for _ in range(n_nodes)]
+    for task, node in enumerate(state.assignment):
+        members[node].add(task)
+
+    # Keš stanja ciljnih čvorova (target_terms) za zadatke kandidate: zavisi samo
+    # od zadatka i ciljnog čvora, pa se posle poteza ponovo računaju samo kolone
+    # izvora i cilja, a nove vrste samo za zadatke koji su tek postali kandidati
+    cached = np.zeros(0, dtype=int)
+    cache = tuple(np.zeros((0, n_nodes)) for _ in range(3))
+    changed = []
+
+    for _ in range(max_iterations):
+        if time_limit is not None and time.time() - start_time > time_limit:
+            break
+        heavy = np.argsort(state.loads)[::-1][:candidate_nodes]
+        rows = np.array(sorted(set().union(*(members[k] for k in set(heavy.tolist()) | set(changed)))),
+                        dtype=int)
+        if len(rows) == 0:
+            break
+
+        new = np.setdiff1d(rows, cached)
+        if len(new):
+            fresh = state.target_terms(new[:, None], targets[None, :])
+            cached = np.concatenate([cached, new])
+            cache = tuple(np.concatenate([c, f]) for c, f in zip(cache, fresh))
+        order = np.argsort(cached)
+        position = order[np.searchsorted(cached, rows, sorter=order)]
+        cached, cache = rows, tuple(c[position] for c in cache)
+        delta, _ = state.relocate_delta(rows[:, None], targets[None, :], target_terms=cache)
+
+        # Promena broja migracija: +1 ako zadatak napušta "dom", -1 ako se vraća
+        d_migrations = (np.where(targets[None, :] != home[rows][:, None], 1, 0)
+                        - migrated[rows][:, None].astype(int))
+        total = delta + migration_cost * d_migrations
+        if migration_budget is not None:
+            total = np.where(n_migrated + d_migrations > migration_budget, np.inf, total)
+
+        row, node = np.unravel_index(np.argmin(total), total.shape)
+        if total[row, node] >= -1e-9:
+            break
+        task, source, node = int(rows[row]), int(state.assignment[rows[row]]), int(node)
+        state.relocate(task, node)
+        members[source].discard(task)
+        members[node].add(task)
+        n_migrated -= int(migrated[task])
+        migrated[task] = state.assignment[task] != home[task]
+        n_migrated += int(migrated[task])
+
+        changed = [source, node]
+        columns = np.array(changed)
+        fresh = state.target_terms(cached[:, None], columns[None, :])
+        for c, f in zip(cache, fresh):
+            c[:, columns] = f
+
+    state.refresh()
+    runtime = time.time() - start_time
+    assignment_ids = [int(node_ids[i]) for i in state.assignment]
+    return assignment_ids, state.objective(), state.is_valid(), runtime
@@ -0,0 +1,249 @@
+# src/results_store.py
+import json
+import sqlite3
+import subprocess
+import time
+from pathlib import Path
+from typing import List, Optional
+
+# Uz modul, a ne uz radni direktorijum: pokretanje iz korena i iz src/ koristi istu bazu
+DEFAULT_DB_PATH = Path(__file__).parent / 'results' / 'results.db'
+
+# Ključevi u rečniku rezultata koji nisu solveri
+META_KEYS = {'test', 'tasks', 'nodes', 'category', 'instance_class', 'target'}
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS runs (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    started_at REAL NOT NULL,
+    commit_hash TEXT,
+    label TEXT
+);
+CREATE TABLE IF NOT EXISTS jobs (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    run_id INTEGER NOT NULL REFERENCES runs(id),
+    instance TEXT NOT NULL,
+    category TEXT,
+    instance_class TEXT,
+    n_tasks INTEGER,
+    n_nodes INTEGER,
+    solver TEXT NOT NULL,
+    params TEXT,
+    objective REAL,
+    valid INTEGER,
+    time REAL,
+    gap_vs_bf REAL,
+    speedup_vs_bf REAL,
+    extra TEXT,
+    commit_hash TEXT,
+    finished_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_jobs_instance_solver ON jobs(instance, solver);
+CREATE INDEX IF NOT EXISTS idx_jobs_class_solver_time ON jobs(instance_class, solver, finished_at);
+CREATE INDEX IF NOT EXISTS idx_jobs_run ON jobs(run_id);
+CREATE INDEX IF NOT EXISTS idx_jobs_params ON jobs(solver, params);
+CREATE INDEX IF NOT EXISTS idx_jobs_commit ON jobs(commit_hash);
+"""
+
+
+def current_commit() -> Optional[str]:
+    """Vraća hash trenutnog git commit-a (ili None van repozitorijuma)"""
+    try:
+        out = subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True,
+                             text=True, timeout=5)
+        return out.stdout.strip() or None
+    except Exception:
+        return None
+
+
+class ResultsStore:
+
+    #Ugrađena SQLite baza rezultata eksperimenata
+    #Svaki posao (instanca, solver) se upisuje odmah po završetku
+
+    def __init__(self, path=DEFAULT_DB_PATH):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.conn = sqlite3.connect(str(self.path))
+        self.conn.row_factory = sqlite3.Row
+        self.conn.execute('PRAGMA journal_mode=WAL')
+        self.conn.executescript(SCHEMA)
+
+    def close(self):
+        self.conn.close()
+
+    def start_run(self, commit: Optional[str] = None, label: Optional[str] = None) -> int:
+        """Otvara novo pokretanje i vraća njegov id"""
+        commit = commit if commit is not None else current_commit()
+        cur = self.conn.execute('INSERT INTO runs (started_at, commit_hash, label) VALUES (?, ?, ?)',
+                                (time.time(), commit, label))
+        self.conn.commit()
+        return cur.lastrowid
+
+    def _run_commit(self, run_id: int) -> Optional[str]:
+        row = self.conn.execute('SELECT commit_hash FROM runs WHERE id = ?', (run_id,)).fetchone()
+        return row['commit_hash'] if row else None
+
+    def record_job(self, run_id: int, instance: str, solver: str, result: Optional[dict],
+                   category: Optional[str] = None, instance_class: Optional[str] = None,
+                   n_tasks: Optional[int] = None, n_nodes: Optional[int] = None,
+                   params: Optional[dict] = None) -> int:
+        """Upisuje rezultat jednog solvera na jednoj instanci; vraća id reda"""
+        cur = self.conn.execute(
+            'INSERT INTO jobs (run_id, instance, category, instance_class, n_tasks, n_nodes, solver, '
+            'params, objective, valid, time, gap_vs_bf, speedup_vs_bf, extra, commit_hash, finished_at) '
+            'VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)',
+            (run_id, instance, category, instance_class, n_tasks, n_nodes, solver,
+             *_result_columns(result, params), self._run_commit(run_id), time.time()))
+        self.conn.commit()
+        return cur.lastrowid
+
+    def update_job(self, job_row: int, result: Optional[dict], params: Optional[dict] = None):
+        """
+        Dopunjuje već upisan posao (npr. gap prema brute force-u i TTT koji se
+        znaju tek kada se završe svi solveri instance)
+        """
+        self.conn.execute(
+            'UPDATE jobs SET params = ?, objective = ?, valid = ?, time = ?, gap_vs_bf = ?, '
+            'speedup_vs_bf = ?, extra = ? WHERE id = ?', (*_result_columns(result, params), job_row))
+        self.conn.commit()
+
+    def record_experiment(self, run_id: int, results: dict, job_rows: Optional[dict] = None):
+        """
+        Upisuje sve solvere iz rečnika koji vraća run_experiment; solveri iz
+        job_rows ({solver: id reda}) su već upisani po završetku posla i samo se dopunjuju
+        """
+        job_rows = job_rows or {}
+        for solver, result in results.items():
+            if solver in META_KEYS:
+                continue
+            if job_rows.get(solver) is not None:
+                self.update_job(job_rows[solver], result)
+                continue
+            self.record_job(run_id, results['test'], solver, result,
+                            category=results.get('category'),
+                            instance_class=results.get('instance_class'),
+                            n_tasks=results.get('tasks'), n_nodes=results.get('nodes'))
+
+    def import_json(self, path, label: Optional[str] = None) -> int:
+        """Uvozi stari results_<timestamp>.json fajl kao jedno pokretanje"""
+        with open(path, 'r') as f:
+            data = json.load(f)
+        run_id = self.start_run(commit='', label=label or Path(path).name)
+        for results in data:
+            self.record_experiment(run_id, results)
+        return run_id
+
+    def runs(self) -> List[sqlite3.Row]:
+        return self.conn.execute('SELECT * FROM runs ORDER BY id').fetchall()
+
+    def latest_run(self) -> Optional[int]:
+        row = self.conn.execute('SELECT MAX(run_id) AS run_id FROM jobs').fetchone()
+        return row['run_id'] if row else None
+
+    def load_results(self, run_id: Optional[int] = None) -> List[dict]:
+        """
+        Vraća rezultate jednog pokretanja u istom obliku kao JSON fajlovi
+        (lista rečnika po instanci, sa ključem po solveru).
+        """
+        run_id = run_id if run_id is not None else self.latest_run()
+        rows = self.conn.execute('SELECT * FROM jobs WHERE run_id = ? ORDER BY id', (run_id,)).fetchall()
+        by_instance = {}
+        for row in rows:
+            entry = by_instance.setdefault(row['instance'], {
+                'test': row['instance'],
+                'tasks': row['n_tasks'],
+                'nodes': row['n_nodes'],
+                'category': row['category'],
+                'instance_class': row['instance_class']
+            })
+            if row['valid'] is None:
+                entry[row['solver']] = None
+                continue
+            result = {'objective': row['objective'], 'valid': bool(row['valid']), 'time': row['time']}
+            if row['gap_vs_bf'] is not None:
+                result['gap_vs_bf'] = row['gap_vs_bf']
+            if row['speedup_vs_bf'] is not None:
+                result['speedup_vs_bf'] = row['speedup_vs_bf']
+            if row['params']:
+                result['params'] = json.loads(row['params'])
+            if row['extra']:
+                result.update(json.loads(row['extra']))
+            entry[row['solver']] = result
+        return list(by_instance.values())
+
+    def trend(self, solver: str, instance_class: Optional[str] = None,
+              instance: Optional[str] = None) -> List[dict]:
+        """Trend vremena i gap-a solvera po pokretanjima (za klasu ili instancu)"""
+        query = ('SELECT j.run_id, r.started_at, r.commit_hash, COUNT(*) AS jobs, '
+                 'AVG(j.time) AS mean_time, AVG(j.gap_vs_bf) AS mean_gap, '
+                 'AVG(j.objective) AS mean_objective, SUM(j.valid) AS valid_jobs '
+                 'FROM jobs j JOIN runs r ON r.id = j.run_id WHERE j.solver = ?')
+        args = [solver]
+        if instance_class is not None:
+            query += ' AND j.instance_class = ?'
+            args.append(instance_class)
+        if instance is not None:
+            query += ' AND j.instance = ?'
+            args.append(instance)
+        query += ' GROUP BY j.run_id ORDER BY r.started_at'
+        return [dict(row) for row in self.conn.execute(query, args).fetchall()]
+
+    def detect_regressions(self, baseline_run: int, candidate_run: int,
+                           time_tolerance: float = 0.2, gap_tolerance: float = 0.5,
+                           min_time: float = 1e-3) -> List[dict]:
+        """
+        Poredi dva pokretanja po (instanca, solver) i vraća regresije:
+        vreme sporije za više od time_tolerance (relativno), gap veći za više
+        od gap_tolerance procentnih poena, ili gubitak validnosti.
+        Više redova istog para u pokretanju (npr. semena) se prvo sažima:
+        najbolji cilj i gap, prosečno vreme, validno ako je bilo koje seme validno.
+        """
+        rows = self.conn.execute(
+            'WITH agg AS (SELECT run_id, instance, solver, MIN(objective) AS objective, AVG(time) AS time, '
+            'MIN(gap_vs_bf) AS gap_vs_bf, MAX(valid) AS valid FROM jobs WHERE run_id IN (?, ?) '
+            'GROUP BY run_id, instance, solver) '
+            'SELECT b.instance, b.solver, b.time AS base_time, c.time AS new_time, '
+            'b.gap_vs_bf AS base_gap, c.gap_vs_bf AS new_gap, '
+            'b.objective AS base_objective, c.objective AS new_objective, '
+            'b.valid AS base_valid, c.valid AS new_valid '
+            'FROM agg b JOIN agg c ON b.instance = c.instance AND b.solver = c.solver '
+            'WHERE b.run_id = ? AND c.run_id = ?',
+            (baseline_run, candidate_run, baseline_run, candidate_run)).fetchall()
+
+        regressions = []
+        for row in rows:
+            reasons = []
+            if row['base_valid'] and not row['new_valid']:
+                reasons.append('lost validity')
+            if (row['base_time'] is not None and row['new_time'] is not None
+                    and max(row['base_time'], row['new_time']) > min_time
+                    and row['new_time'] > row['base_time'] * (1 + time_tolerance)):
+                reasons.append(f"time {row['base_time']:.4f}s -> {row['new_time']:.4f}s")
+            if (row['base_gap'] is not None and row['new_gap'] is not None
+                    and row['new_gap'] > row['base_gap'] + gap_tolerance):
+                reasons.append(f"gap {row['base_gap']:.2f}% -> {row['new_gap']:.2f}%")
+            if reasons:
+                entry = dict(row)
+                entry['reasons'] = reasons
+                regressions.append(entry)
+        return regressions
+
+
+def _result_columns(result: Optional[dict], params: Optional[dict] = None) -> tuple:
+    # Kolone (params, objective, valid, time, gap_vs_bf, speedup_vs_bf, extra) iz rečnika rezultata
+    result = result or {}
+    known = {'objective', 'valid', 'time', 'gap_vs_bf', 'speedup_vs_bf', 'params'}
+    extra = {k: v for k, v in result.items() if k not in known}
+    params = params if params is not None else result.get('params')
+    return (json.dumps(params, sort_keys=True) if params is not None else None,
+            _as_float(result.get('objective')),
+            int(bool(result.get('valid'))) if result else None,
+            _as_float(result.get('time')),
+            _as_float(result.get('gap_vs_bf')),
+            _as_float(result.get('speedup_vs_bf')),
+            json.dumps(extra, default=float) if extra else None)
+
+
+def _as_float(value):
+    return float(value) if value is not None else None
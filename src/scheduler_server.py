@@ -0,0 +1,385 @@
+# src/scheduler_server.py
+import argparse
+import asyncio
+import json
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import List, Optional
+
+from batch import InstanceBatch, batch_greedy_schedule
+from solvers import SOLVERS, solve
+from task import Task
+from computerNode import ComputeNode
+
+
+# Solveri koji se mogu grupisati u jedan batch (brzi, bez parametara)
+BATCHABLE_SOLVERS = {'greedy'}
+# Koliko dugo posle roka čekamo da solver sam završi pre nego što se radni procesi zamene
+ABANDON_GRACE = 1.0
+
+
+def parse_instance(payload: dict):
+    """Pravi Task i ComputeNode objekte iz JSON zahteva"""
+    tasks = [Task(**t) for t in payload['tasks']]
+    nodes = [ComputeNode(**n) for n in payload['nodes']]
+    return tasks, nodes
+
+
+def validate_request(payload: dict):
+    """Proverava zahtev pre slanja radnom procesu (greška se vraća odmah, bez čekanja u redu)"""
+    solver = payload.get('solver', 'greedy')
+    if solver not in SOLVERS:
+        raise ValueError(f"Nepoznat solver: {solver}")
+    parse_instance(payload)
+
+
+def solve_one(payload: dict, deadline: Optional[float] = None) -> dict:
+    """
+    Rešava jedan zahtev solverom iz registra (solvers.SOLVERS) i vraća rezultat kao rečnik.
+    deadline je apsolutni rok zahteva (time.time()); preostalo vreme se prosleđuje
+    solveru kao time_limit, pa posao ne drži radni proces posle isteka roka.
+    Parametri time_limit i seed iz params idu registru, ostali solveru.
+    """
+    tasks, nodes = parse_instance(payload)
+    solver = payload.get('solver', 'greedy')
+    params = dict(payload.get('params', {}))
+    time_limit = params.pop('time_limit', None)
+    seed = params.pop('seed', payload.get('seed'))
+    if deadline is not None:
+        remaining = max(0.0, deadline - time.time())
+        time_limit = remaining if time_limit is None else min(time_limit, remaining)
+
+    assign, obj, valid, runtime = solve(solver, tasks, nodes, time_limit=time_limit, params=params, seed=seed)
+
+    return {
+        'assignment': assign,
+        'objective': obj,
+        'valid': valid,
+        'runtime': runtime
+    }
+
+
+def solve_batch(payloads: List[dict]) -> List[dict]:
+    """Rešava grupu malih greedy zahteva jednim vektorskim prolazom (batch_greedy)"""
+    try:
+        batch = InstanceBatch.from_payloads(payloads)
+        solved = batch_greedy_schedule(batch)
+    except Exception:
+        # Neispravan zahtev ne sme da obori ceo batch: rešavamo pojedinačno
+        results = []
+        for payload in payloads:
+            try:
+                results.append(solve_one(payload))
+            except Exception as e:
+                results.append({'error': str(e)})
+        return results
+
+    return [{'assignment': assign, 'objective': obj, 'valid': valid, 'runtime': runtime}
+            for assign, obj, valid, runtime in solved]
+
+
+def _warm_up():
+    # Zagrevamo radni proces: jedan mali problem učita sve module i keševe
+    solve_one({
+        'solver': 'greedy',
+        'tasks': [{'id': 0, 'cpu_req': 1.0, 'memory_req': 1.0, 'network_req': 1.0, 'execution_time': 1.0}],
+        'nodes': [{'id': 0, 'cpu_capacity': 2, 'memory_capacity': 2, 'network_capacity': 2}]
+    })
+
+
+class ServerMetrics:
+
+    #Metrike latencije i propusnosti servera
+
+    def __init__(self, window: int = 10000):
+        self.started = time.time()
+        self.received = 0
+        self.completed = 0
+        self.errors = 0
+        self.deadline_misses = 0
+        self.batches = 0
+        self.batched_requests = 0
+        self.latencies = deque(maxlen=window)
+        self.finish_times = deque(maxlen=window)
+
+    def record(self, latency: float):
+        self.completed += 1
+        self.latencies.append(latency)
+        self.finish_times.append(time.time())
+
+    def snapshot(self) -> dict:
+        now = time.time()
+        lat = sorted(self.latencies)
+
+        def percentile(p):
+            if not lat:
+                return None
+            return lat[min(len(lat) - 1, int(p / 100 * len(lat)))]
+
+        recent = [t for t in self.finish_times if now - t <= 60]
+        uptime = now - self.started
+        return {
+            'uptime': uptime,
+            'received': self.received,
+            'completed': self.completed,
+            'errors': self.errors,
+            'deadline_misses': self.deadline_misses,
+            'batches': self.batches,
+            'mean_batch_size': (self.batched_requests / self.batches) if self.batches else 0.0,
+            'latency_p50': percentile(50),
+            'latency_p95': percentile(95),
+            'latency_p99': percentile(99),
+            'throughput_total': self.completed / uptime if uptime > 0 else 0.0,
+            'throughput_last_60s': len(recent) / min(60.0, uptime) if uptime > 0 else 0.0
+        }
+
+
+class SchedulerServer:
+
+    #Asyncio server koji drži solvere "tople" i grupiše male zahteve
+    #Protokol: jedan JSON objekat po liniji (zahtev i odgovor)
+
+    def __init__(self, workers: int = 2, max_batch: int = 64, batch_window: float = 0.005,
+                 default_deadline: Optional[float] = 5.0):
+        self.workers = workers
+        self.max_batch = max_batch
+        self.batch_window = batch_window
+        self.default_deadline = default_deadline
+        self.metrics = ServerMetrics()
+        self.executor = None
+        self.recycled_pools = 0
+        self.queue = None
+        self.batcher_task = None
+
+    async def start(self):
+        self.executor = ProcessPoolExecutor(max_workers=self.workers, initializer=_warm_up)
+        self.queue = asyncio.Queue()
+        self.batcher_task = asyncio.create_task(self._batcher())
+
+    def _recycle_executor(self, stale):
+        # Radni proces i dalje radi napušten posao: pravimo nov pool za nove
+        # zahteve, a procese starog gasimo (poslovi na njemu dobijaju BrokenProcessPool)
+        if stale is not self.executor:
+            return
+        self.executor = ProcessPoolExecutor(max_workers=self.workers, initializer=_warm_up)
+        self.recycled_pools += 1
+        for process in list(getattr(stale, '_processes', {}).values()):
+            process.terminate()
+        stale.shutdown(wait=False, cancel_futures=True)
+
+    async def _watch_abandoned(self, future, executor):
+        # Posao kome je istekao rok treba sam da stane (dobio je time_limit);
+        # ako ne stane ni posle ABANDON_GRACE, menjamo radne procese
+        future.add_done_callback(lambda f: f.cancelled() or f.exception())  # rezultat se ne čita
+        try:
+            await asyncio.wait_for(asyncio.shield(future), ABANDON_GRACE)
+        except (asyncio.TimeoutError, TimeoutError):
+            self._recycle_executor(executor)
+        except Exception:
+            pass
+
+    async def _run_solo(self, payload: dict, deadline: Optional[float]):
+        # Nebatch solver u radnom procesu; posao izgubljen zbog zamene poola se ponavlja jednom
+        loop = asyncio.get_running_loop()
+        for attempt in range(2):
+            executor = self.executor
+            try:
+                # Slanje na već pokvaren pool odmah baca BrokenProcessPool
+                future = loop.run_in_executor(executor, solve_one, payload, deadline)
+                timeout = None if deadline is None else max(0.0, deadline - time.time())
+                return await asyncio.wait_for(asyncio.shield(future), timeout)
+            except (asyncio.TimeoutError, TimeoutError):
+                asyncio.create_task(self._watch_abandoned(future, executor))
+                raise
+            except BrokenProcessPool:
+                # Pool je pokvaren (zamenjen ili je radni proces pao: OOM, segfault);
+                # menjamo ga ako je još aktuelan, pa posao ide na nov pool
+                self._recycle_executor(executor)
+                if attempt == 1 or (deadline is not None and time.time() >= deadline):
+                    raise
+
+    async def stop(self):
+        if self.batcher_task:
+            self.batcher_task.cancel()
+            try:
+                await self.batcher_task
+            except asyncio.CancelledError:
+                pass
+        if self.executor:
+            self.executor.shutdown(wait=False, cancel_futures=True)
+
+    async def _batcher(self):
+        # Skuplja zahteve tokom kratkog prozora i šalje ih zajedno izvršiocu
+        loop = asyncio.get_running_loop()
+        while True:
+            first = await self.queue.get()
+            batch = [first]
+            window_end = loop.time() + self.batch_window
+            while len(batch) < self.max_batch:
+                remaining = window_end - loop.time()
+                if remaining <= 0:
+                    break
+                try:
+                    batch.append(await asyncio.wait_for(self.queue.get(), remaining))
+                except asyncio.TimeoutError:
+                    break
+
+            # Izbacujemo zahteve kojima je rok već istekao
+            now = time.time()
+            live = []
+            for payload, future, deadline in batch:
+                if future.done():
+                    continue
+                if deadline is not None and now > deadline:
+                    future.set_exception(TimeoutError("deadline exceeded"))
+                else:
+                    live.append((payload, future, deadline))
+            if not live:
+                continue
+
+            self.metrics.batches += 1
+            self.metrics.batched_requests += len(live)
+            asyncio.create_task(self._run_batch(live))
+
+    async def _run_batch(self, live):
+        loop = asyncio.get_running_loop()
+        executor = self.executor
+        try:
+            results = await loop.run_in_executor(executor, solve_batch,
+                                                 [payload for payload, _, _ in live])
+        except BrokenProcessPool as e:
+            # Sledeći batch-evi idu na nov pool
+            self._recycle_executor(executor)
+            results = [{'error': str(e)}] * len(live)
+        except Exception as e:
+            results = [{'error': str(e)}] * len(live)
+        for (_, future, _), result in zip(live, results):
+            if not future.done():
+                future.set_result(result)
+
+    async def submit(self, payload: dict) -> dict:
+        """Obrađuje jedan zahtev uz poštovanje roka (deadline_ms)"""
+        self.metrics.received += 1
+        t0 = time.time()
+        deadline_ms = payload.get('deadline_ms')
+        timeout = deadline_ms / 1000.0 if deadline_ms is not None else self.default_deadline
+        deadline = t0 + timeout if timeout is not None else None
+
+        # Neispravan zahtev vraća svoju grešku odmah, ne čeka slobodan radni proces
+        try:
+            validate_request(payload)
+        except Exception as e:
+            self.metrics.errors += 1
+            return {'id': payload.get('id'), 'error': f'{type(e).__name__}: {e}'}
+
+        loop = asyncio.get_running_loop()
+        try:
+            if payload.get('solver', 'greedy') in BATCHABLE_SOLVERS:
+                future = loop.create_future()
+                await self.queue.put((payload, future, deadline))
+                result = await asyncio.wait_for(future, timeout)
+            else:
+                result = await self._run_solo(payload, deadline)
+        except (asyncio.TimeoutError, TimeoutError):
+            self.metrics.deadline_misses += 1
+            return {'id': payload.get('id'), 'error': 'deadline exceeded'}
+        except Exception as e:
+            self.metrics.errors += 1
+            return {'id': payload.get('id'), 'error': str(e)}
+
+        if 'error' in result:
+            self.metrics.errors += 1
+        else:
+            self.metrics.record(time.time() - t0)
+        response = dict(result)
+        response['id'] = payload.get('id')
+        response['latency'] = time.time() - t0
+        return response
+
+    async def handle_connection(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        # Svaka linija je nezavisan zahtev; odgovori se šalju čim su gotovi
+        write_lock = asyncio.Lock()
+        pending = set()
+
+        async def process(line: bytes):
+            try:
+                payload = json.loads(line)
+                if payload.get('op') == 'metrics':
+                    response = self.metrics.snapshot()
+                else:
+                    response = await self.submit(payload)
+            except Exception as e:
+                response = {'error': str(e)}
+            async with write_lock:
+                writer.write((json.dumps(response) + '\n').encode())
+                await writer.drain()
+
+        try:
+            while True:
+                line = await reader.readline()
+                if not line:
+                    break
+                if not line.strip():
+                    continue
+                task = asyncio.create_task(process(line))
+                pending.add(task)
+                task.add_done_callback(pending.discard)
+            if pending:
+                await asyncio.gather(*pending)
+        finally:
+            writer.close()
+
+    async def serve(self, host: str = '127.0.0.1', port: int = 8765, unix_path: Optional[str] = None):
+        await self.start()
+        if unix_path:
+            server = await asyncio.start_unix_server(self.handle_connection, path=unix_path)
+        else:
+            server = await asyncio.start_server(self.handle_connection, host, port)
+        print(f"Scheduler server listening on {unix_path or f'{host}:{port}'}")
+        try:
+            async with server:
+                await server.serve_forever()
+        finally:
+            await self.stop()
+
+
+async def send_requests(payloads: List[dict], host: str = '127.0.0.1', port: int = 8765,
+                        unix_path: Optional[str] = None) -> List[dict]:
+    """Jednostavan klijent: šalje sve zahteve preko jedne konekcije i čeka odgovore"""
+    if unix_path:
+        reader, writer = await asyncio.open_unix_connection(unix_path)
+    else:
+        reader, writer = await asyncio.open_connection(host, port)
+    for payload in payloads:
+        writer.write((json.dumps(payload) + '\n').encode())
+    await writer.drain()
+    responses = []
+    for _ in payloads:
+        responses.append(json.loads(await reader.readline()))
+    writer.close()
+    await writer.wait_closed()
+    return responses
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Lokalni asyncio servis za raspoređivanje')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--unix', default=None, help='Putanja Unix soketa umesto TCP-a')
+    parser.add_argument('--workers', type=int, default=2)
+    parser.add_argument('--max-batch', type=int, default=64)
+    parser.add_argument('--batch-window-ms', type=float, default=5.0)
+    args = parser.parse_args()
+
+    server = SchedulerServer(workers=args.workers, max_batch=args.max_batch,
+                             batch_window=args.batch_window_ms / 1000.0)
+    try:
+        asyncio.run(server.serve(args.host, args.port, args.unix))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,74 @@
+# src/solve.py
+# Lagana komandna linija za pokretanje jednog solvera (bez grafika)
+import time
+_PROCESS_T0 = time.perf_counter()
+
+import argparse
+import json
+import sys
+
+from task import Task
+from computerNode import ComputeNode
+from solvers import SOLVERS, ITERATION_PARAMS, solve
+
+
+def load_instance(path):
+    with open(path, 'r') as f:
+        data = json.load(f)
+    tasks = [Task(**t) for t in data['tasks']]
+    nodes = [ComputeNode(**n) for n in data['nodes']]
+    return tasks, nodes
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Pokreće jedan solver nad jednom instancom')
+    parser.add_argument('instance', help='Putanja do JSON instance (npr. data/easy/test1.json)')
+    parser.add_argument('--solver', default='greedy', choices=sorted(SOLVERS))
+    parser.add_argument('--time-limit', type=float, default=None, help='Vremenski budžet u sekundama')
+    parser.add_argument('--iterations', type=int, default=None,
+                        help=f"Broj iteracija ({', '.join(sorted(ITERATION_PARAMS))})")
+    parser.add_argument('--seed', type=int, default=None)
+    parser.add_argument('--output', default=None, help='JSON fajl za rezultat (podrazumevano stdout)')
+    parser.add_argument('--report-startup', action='store_true',
+                        help='Dodaje merenje hladnog starta u izlaz')
+    args = parser.parse_args(argv)
+    if args.iterations is not None and args.solver not in ITERATION_PARAMS:
+        parser.error(f"--iterations nije podržan za solver {args.solver}")
+
+    tasks, nodes = load_instance(args.instance)
+    params = {}
+    if args.iterations is not None:
+        params[ITERATION_PARAMS[args.solver]] = args.iterations
+
+    t_ready = time.perf_counter()
+    assignment, objective, valid, runtime = solve(args.solver, tasks, nodes, time_limit=args.time_limit,
+                                                  params=params, seed=args.seed)
+    t_done = time.perf_counter()
+
+    result = {
+        'instance': args.instance,
+        'solver': args.solver,
+        'assignment': assignment,
+        'objective': objective,
+        'valid': valid,
+        'runtime': runtime
+    }
+    if args.report_startup:
+        result['startup'] = {
+            # od početka izvršavanja modula do spremne instance
+            'startup_ms': (t_ready - _PROCESS_T0) * 1000,
+            # uključuje lenjo učitavanje modula solvera
+            'solve_ms': (t_done - t_ready) * 1000,
+            'matplotlib_loaded': 'matplotlib' in sys.modules
+        }
+
+    text = json.dumps(result, indent=2, default=float)
+    if args.output:
+        with open(args.output, 'w') as f:
+            f.write(text)
+    else:
+        print(text)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,122 @@
+# src/solvers.py
+import inspect
+import time
+from typing import List, Tuple, Optional
+
+from task import Task
+from computerNode import ComputeNode
+
+# Registar solvera sa lenjim (lazy) učitavanjem: modul solvera se uvozi tek
+# kada se solver pozove, pa kratkotrajni procesi plaćaju samo ono što koriste.
+# Svaki solver vraća (assignment, objective, valid, runtime).
+
+# Ime parametra broja iteracija po solveru (solveri koji ga nemaju ne primaju --iterations)
+ITERATION_PARAMS = {
+    'em': 'max_iterations',
+    'tabu': 'max_iterations',
+    'grasp': 'iterations',
+}
+
+
+def _check_params(function, params: dict, fixed=()):
+    # Parametri koje funkcija solvera ne prima (ili ih registar već postavlja) su greška korisnika
+    accepted = set(inspect.signature(function).parameters) - {'tasks', 'nodes'} - set(fixed)
+    unknown = sorted(set(params) - accepted)
+    if unknown:
+        raise ValueError(f"{function.__name__} ne prima parametre: {', '.join(unknown)} "
+                         f"(dozvoljeni: {', '.join(sorted(accepted))})")
+
+
+def _run_greedy(tasks, nodes, time_limit, params, seed, trajectory):
+    from greedy import greedy_schedule
+    return greedy_schedule(tasks, nodes, trajectory=trajectory)
+
+
+def _run_bruteforce(tasks, nodes, time_limit, params, seed, trajectory):
+    from bruteforce import brute_force_search
+    return brute_force_search(tasks, nodes, time_limit=time_limit, prune=True, trajectory=trajectory)
+
+
+def _run_dp(tasks, nodes, time_limit, params, seed, trajectory):
+    from exact_dp import dp_search, proves_optimality
+    _check_params(dp_search, params, ('time_limit', 'trajectory'))
+    # Registrovan je kao egzaktan solver, pa se ne pokreće van opsega u kome dokazuje optimum
+    if not proves_optimality(len(tasks), len(nodes)):
+        raise ValueError(f"dp dokazuje optimum samo za malo čvorova (EXACT_MAX_TASKS); "
+                         f"{len(tasks)} zadataka na {len(nodes)} čvorova je van opsega")
+    return dp_search(tasks, nodes, time_limit=time_limit, trajectory=trajectory, **params)
+
+
+def _run_em(tasks, nodes, time_limit, params, seed, trajectory):
+    import random
+    import numpy as np
+    from algorithm import ElectromagnetismAlgorithm
+    from autotuner import best_config
+
+    if seed is not None:
+        random.seed(seed)
+        np.random.seed(seed)
+    config = best_config(tasks, nodes)
+    config.update(params)
+    em = ElectromagnetismAlgorithm(tasks, nodes,
+                                   population_size=config['population_size'],
+                                   max_iterations=config['max_iterations'],
+                                   local_search_attempts=config['local_search_attempts'],
+                                   verbose=False, time_limit=time_limit,
+                                   **{k: config[k] for k in ('force_mode', 'force_top_k', 'force_samples', 'memory_budget')
+                                      if k in config})
+    t0 = time.time()
+    best_particle, objective = em.run()
+    runtime = time.time() - t0
+    if trajectory is not None:
+        trajectory.points.extend(em.trajectory.points)
+    if best_particle is None:
+        return None, objective, False, runtime
+    _, valid = best_particle.evaluate()
+    return [int(x) for x in best_particle.position], objective, valid, runtime
+
+
+def _run_tabu(tasks, nodes, time_limit, params, seed, trajectory):
+    from tabu import tabu_search
+    _check_params(tabu_search, params, ('time_limit', 'seed', 'trajectory'))
+    return tabu_search(tasks, nodes, time_limit=time_limit, seed=seed, trajectory=trajectory, **params)
+
+
+def _run_grasp(tasks, nodes, time_limit, params, seed, trajectory):
+    from grasp import grasp_search
+    _check_params(grasp_search, params, ('time_limit', 'seed', 'trajectory'))
+    return grasp_search(tasks, nodes, time_limit=time_limit, seed=seed, trajectory=trajectory, **params)
+
+
+def _run_decomposition(tasks, nodes, time_limit, params, seed, trajectory):
+    from decomposition import decomposition_solve
+    _check_params(decomposition_solve, params, ('time_limit', 'seed'))
+    return decomposition_solve(tasks, nodes, time_limit=time_limit, seed=seed, **params)
+
+
+def _run_portfolio(tasks, nodes, time_limit, params, seed, trajectory):
+    from portfolio import portfolio_solve, DEFAULT_TIME_LIMIT
+    _check_params(portfolio_solve, params, ('time_limit', 'seed', 'trajectory'))
+    return portfolio_solve(tasks, nodes, time_limit=time_limit or DEFAULT_TIME_LIMIT, seed=seed,
+                           trajectory=trajectory, **params)
+
+
+SOLVERS = {
+    'greedy': _run_greedy,
+    'bruteforce': _run_bruteforce,
+    'dp': _run_dp,
+    'em': _run_em,
+    'tabu': _run_tabu,
+    'grasp': _run_grasp,
+    'decomposition': _run_decomposition,
+    'portfolio': _run_portfolio,
+}
+
+
+def solve(solver: str, tasks: List[Task], nodes: List[ComputeNode], time_limit: Optional[float] = None,
+          params: Optional[dict] = None, seed: Optional[int] = None,
+          trajectory=None) -> Tuple[List[int], float, bool, float]:
+    """Pokreće solver po imenu; vraća (assignment, objective, valid, runtime)"""
+    if solver not in SOLVERS:
+        raise ValueError(f"Nepoznat solver: {solver} (dostupni: {', '.join(SOLVERS)})")
+    return SOLVERS[solver](tasks, nodes, time_limit, dict(params or {}), seed, trajectory)
@@ -0,0 +1,141 @@
+# src/tabu.py
+import time
+from typing import List, Tuple, Optional, Callable
+
+import numpy as np
+
+from task import Task
+from computerNode import ComputeNode
+from greedy import greedy_schedule
+from instance_arrays import tasks_to_arrays, nodes_to_arrays, ids_to_indices, AssignmentState
+from trajectory import Trajectory
+from domains import TaskDomains, build_domains
+
+
+def tabu_search(tasks: List[Task], nodes: List[ComputeNode], max_iterations: int = 2000,
+                max_no_improve: int = 300, candidate_nodes: int = 3, swap_sample: int = 64,
+                tenure: Optional[int] = None, time_limit: Optional[float] = None,
+                initial_assignment: Optional[List[int]] = None, seed: Optional[int] = None,
+                trajectory: Optional[Trajectory] = None,
+                should_stop: Optional[Callable[[], bool]] = None,
+                domains: Optional[TaskDomains] = None) -> Tuple[List[int], float, bool, float]:
+    """
+    Tabu pretraga nad istom ciljnom funkcijom kao Particle.evaluate.
+
+    Potezi su premeštanje zadatka (relocate) i zamena dva zadatka (swap),
+    procenjeni u O(1) preko agregata po čvorovima (AssignmentState).
+    Lista kandidata sadrži samo poteze koji diraju najopterećenije čvorove:
+    zadatke sa candidate_nodes najopterećenijih čvorova premeštamo na bilo
+    koji čvor ili menjamo sa zadacima sa najmanje opterećenih čvorova.
+    Vraćanje zadatka na čvor koji je upravo napustio je zabranjeno tenure
+    iteracija, osim ako potez daje novo najbolje rešenje (aspiracija).
+    domains su unapred izračunati domeni instance (računaju se ako nisu prosleđeni).
+
+    Returns:
+        (assignment, objective, valid, runtime)
+    """
+    start_time = time.time()
+    rng = np.random.default_rng(seed)
+    demand, exec_times = tasks_to_arrays(tasks)
+    capacity, node_ids = nodes_to_arrays(nodes)
+    n_tasks, n_nodes = len(tasks), len(nodes)
+    feasible = (domains if domains is not None else build_domains(tasks, nodes)).feasible
+
+    # Početno rešenje: greedy (ili prosleđeni raspored)
+    if initial_assignment is None:
+        initial_assignment, _, _, _ = greedy_schedule(tasks, nodes)
+    state = AssignmentState(ids_to_indices(initial_assignment, node_ids), demand, exec_times, capacity)
+
+    best_assignment = state.assignment.copy()
+    best_objective = state.objective()
+    best_valid = state.is_valid()
+    if trajectory is not None:
+        trajectory.count()
+        trajectory.improve(best_objective, best_valid)
+
+    if n_nodes < 2 or n_tasks == 0:
+        return [int(node_ids[i]) for i in best_assignment], best_objective, best_valid, time.time() - start_time
+
+    if tenure is None:
+        tenure = 5 + n_tasks // 10
+    tabu_until = np.zeros((n_tasks, n_nodes), dtype=np.int64)
+    candidate_nodes = max(1, min(candidate_nodes, n_nodes - 1))
+    all_nodes = np.arange(n_nodes)
+    no_improve = 0
+
+    for iteration in range(1, max_iterations + 1):
+        if time_limit is not None and time.time() - start_time > time_limit:
+            break
+        if should_stop is not None and iteration % 16 == 0 and should_stop():
+            break
+        if iteration % 200 == 0:
+            state.refresh()
+
+        current = state.objective()
+        by_load = np.argsort(state.loads)
+        heavy = by_load[::-1][:candidate_nodes]
+        light = by_load[:candidate_nodes]
+        heavy_tasks = np.flatnonzero(np.isin(state.assignment, heavy))
+        if len(heavy_tasks) == 0:
+            break
+
+        # Relocate: zadaci sa opterećenih čvorova na bilo koji čvor
+        reloc_delta, _ = state.relocate_delta(heavy_tasks[:, None], all_nodes[None, :])
+        reloc_tabu = tabu_until[heavy_tasks] >= iteration
+        reloc_ok = (~reloc_tabu | (current + reloc_delta < best_objective - 1e-9)) & feasible[heavy_tasks]
+        reloc_delta = np.where(reloc_ok, reloc_delta, np.inf)
+
+        # Swap: zadatak sa opterećenog čvora <-> zadatak sa lakog čvora
+        light_tasks = np.flatnonzero(np.isin(state.assignment, light))
+        if len(light_tasks) > swap_sample:
+            light_tasks = rng.choice(light_tasks, size=swap_sample, replace=False)
+        if len(light_tasks) > 0:
+            swap_delta, _ = state.swap_delta(heavy_tasks[:, None], light_tasks[None, :])
+            node_a = state.assignment[heavy_tasks][:, None]
+            node_b = state.assignment[light_tasks][None, :]
+            swap_tabu = (tabu_until[heavy_tasks[:, None], node_b] >= iteration) | \
+                        (tabu_until[light_tasks[None, :], node_a] >= iteration)
+            swap_ok = (~swap_tabu | (current + swap_delta < best_objective - 1e-9)) & \
+                      feasible[heavy_tasks[:, None], node_b] & feasible[light_tasks[None, :], node_a]
+            swap_delta = np.where(swap_ok, swap_delta, np.inf)
+        else:
+            swap_delta = np.full((len(heavy_tasks), 1), np.inf)
+
+        if trajectory is not None:
+            trajectory.count(reloc_delta.size + swap_delta.size)
+
+        best_reloc = np.unravel_index(np.argmin(reloc_delta), reloc_delta.shape)
+        best_swap = np.unravel_index(np.argmin(swap_delta), swap_delta.shape)
+        if not np.isfinite(min(reloc_delta[best_reloc], swap_delta[best_swap])):
+            break
+
+        # Primenjujemo najbolji dozvoljeni potez (i ako pogoršava rešenje)
+        if reloc_delta[best_reloc] <= swap_delta[best_swap]:
+            task = int(heavy_tasks[best_reloc[0]])
+            source = int(state.assignment[task])
+            state.relocate(task, int(best_reloc[1]))
+            tabu_until[task, source] = iteration + tenure + rng.integers(0, 3)
+        else:
+            task_a = int(heavy_tasks[best_swap[0]])
+            task_b = int(light_tasks[best_swap[1]])
+            node_a, node_b = int(state.assignment[task_a]), int(state.assignment[task_b])
+            state.swap(task_a, task_b)
+            tabu_until[task_a, node_a] = iteration + tenure + rng.integers(0, 3)
+            tabu_until[task_b, node_b] = iteration + tenure + rng.integers(0, 3)
+
+        objective, valid = state.objective(), state.is_valid()
+        if (valid and not best_valid) or (valid == best_valid and objective < best_objective - 1e-9):
+            best_assignment = state.assignment.copy()
+            best_objective, best_valid = objective, valid
+            no_improve = 0
+            if trajectory is not None:
+                trajectory.improve(objective, valid)
+        else:
+            no_improve += 1
+            if no_improve >= max_no_improve:
+                break
+
+    # Konačna vrednost se računa ponovo (bez akumulirane numeričke greške)
+    final = AssignmentState(best_assignment, demand, exec_times, capacity)
+    runtime = time.time() - start_time
+    return [int(node_ids[i]) for i in best_assignment], final.objective(), final.is_valid(), runtime
@@ -0,0 +1,61 @@
+# src/test_batch.py
+# batch_greedy_schedule i batch_evaluate moraju da daju isto što i greedy_schedule
+# i Particle.evaluate po instanci (i za instance različitih veličina u istom batch-u)
+import glob
+import os
+
+import numpy as np
+import pytest
+
+from batch import InstanceBatch, batch_evaluate, batch_greedy_schedule
+from generator import generate_instance
+from greedy import greedy_schedule
+from particle import Particle
+from solve import load_instance
+
+DATA_DIR = os.path.join(os.path.dirname(__file__), 'data')
+
+
+def _generated(count, seed=0):
+    rng = np.random.default_rng(seed)
+    return [generate_instance(int(rng.integers(1, 30)), int(rng.integers(1, 8)),
+                              float(rng.uniform(0.3, 1.1)), seed=k)
+            for k in range(count)]
+
+
+def _data_instances():
+    return [load_instance(path) for path in sorted(glob.glob(os.path.join(DATA_DIR, '*', 'test*.json')))]
+
+
+@pytest.mark.parametrize('instances', [_generated(300), _data_instances()], ids=['generated', 'data'])
+def test_batch_greedy_matches_greedy_schedule(instances):
+    solved = batch_greedy_schedule(InstanceBatch.from_objects(instances))
+    assert len(solved) == len(instances)
+    for (tasks, nodes), (assign, objective, valid, _) in zip(instances, solved):
+        expected_assign, expected_objective, expected_valid, _ = greedy_schedule(tasks, nodes)
+        assert assign == expected_assign
+        assert valid == expected_valid
+        assert objective == pytest.approx(expected_objective, rel=1e-9)
+
+
+def test_batch_evaluate_matches_particle_evaluate():
+    instances = _generated(100, seed=1)
+    batch = InstanceBatch.from_objects(instances)
+    rng = np.random.default_rng(2)
+    assignment = np.zeros(batch.demand.shape[:2], dtype=int)
+    for b, n_nodes in enumerate(batch.n_nodes):
+        assignment[b, :batch.n_tasks[b]] = rng.integers(0, n_nodes, size=batch.n_tasks[b])
+
+    objectives, valid = batch_evaluate(batch, assignment)
+    for b, (tasks, nodes) in enumerate(instances):
+        position = np.array([nodes[k].id for k in assignment[b, :len(tasks)]])
+        expected_objective, expected_valid = Particle(tasks, nodes, position=position).evaluate()
+        assert valid[b] == expected_valid
+        assert objectives[b] == pytest.approx(expected_objective, rel=1e-9)
+
+
+def test_from_payloads_matches_from_objects():
+    paths = sorted(glob.glob(os.path.join(DATA_DIR, '*', 'test*.json')))
+    from_files = batch_greedy_schedule(InstanceBatch.from_files(paths))
+    from_objects = batch_greedy_schedule(InstanceBatch.from_objects(_data_instances()))
+    assert [r[:3] for r in from_files] == [r[:3] for r in from_objects]
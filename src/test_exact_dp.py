@@ -0,0 +1,40 @@
+# src/test_exact_dp.py
+# dp_search u opsegu proves_optimality mora da da isti optimum kao brute force
+import pytest
+
+from bruteforce import brute_force_search
+from exact_dp import dp_search, proves_optimality, EXACT_MAX_TASKS
+from generator import generate_instance
+
+
+@pytest.mark.parametrize('n_tasks,n_nodes,tightness', [(7, 3, 0.6), (9, 3, 0.7), (8, 2, 0.8),
+                                                        (6, 4, 0.7), (5, 5, 0.5)])
+@pytest.mark.parametrize('seed', range(8))
+def test_dp_matches_bruteforce(n_tasks, n_nodes, tightness, seed):
+    tasks, nodes = generate_instance(n_tasks, n_nodes, tightness, seed)
+    assert proves_optimality(n_tasks, n_nodes)
+
+    report = {}
+    dp_assign, dp_obj, dp_valid, _ = dp_search(tasks, nodes, report=report)
+    _, bf_obj, bf_valid, _ = brute_force_search(tasks, nodes, prune=True)
+
+    assert report['proven']
+    assert dp_valid == bf_valid
+    assert dp_obj == pytest.approx(bf_obj, rel=1e-9, abs=1e-6)
+    if bf_valid:
+        assert len(dp_assign) == n_tasks
+
+
+def test_dp_respects_time_limit():
+    tasks, nodes = generate_instance(40, 4, 0.6, seed=0)
+    _, _, _, runtime = dp_search(tasks, nodes, time_limit=0.5)
+    assert runtime < 0.5 + 1.0
+
+
+def test_proves_optimality_range():
+    assert proves_optimality(100, 1)
+    for n_nodes, max_tasks in EXACT_MAX_TASKS.items():
+        if max_tasks != float('inf'):
+            assert proves_optimality(max_tasks, n_nodes)
+            assert not proves_optimality(max_tasks + 1, n_nodes)
+    assert not proves_optimality(5, max(EXACT_MAX_TASKS) + 1)
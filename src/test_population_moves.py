@@ -0,0 +1,81 @@
+# src/test_population_moves.py
+# Vektorsko pomeranje i evaluacija populacije (move_population) moraju da se
+# slažu sa Particle.evaluate i sa kružnim pretraživanjem domena po zadatku
+import random
+
+import numpy as np
+import pytest
+
+from algorithm import ElectromagnetismAlgorithm
+from generator import generate_instance
+from instance_arrays import evaluate_population
+from particle import Particle
+
+# (zadaci, čvorovi, tesnost): tesne instance imaju nepune domene (neighbor_tables)
+INSTANCES = [(12, 4, 0.6), (20, 6, 0.9), (30, 8, 1.2), (15, 3, 0.4)]
+
+
+def _em(n_tasks, n_nodes, tightness, seed, population_size=12):
+    random.seed(seed)
+    np.random.seed(seed)
+    tasks, nodes = generate_instance(n_tasks, n_nodes, tightness, seed)
+    em = ElectromagnetismAlgorithm(tasks, nodes, population_size=population_size, verbose=False)
+    em.initialize()
+    return em
+
+
+def _cyclic_neighbor(feasible_row, k, step):
+    # Referentna implementacija: prvi čvor iz domena posle k u kružnom redosledu (k ako nema drugog)
+    n = len(feasible_row)
+    for offset in range(1, n):
+        candidate = (k + step * offset) % n
+        if feasible_row[candidate]:
+            return candidate
+    return k
+
+
+@pytest.mark.parametrize('instance', INSTANCES)
+@pytest.mark.parametrize('seed', range(5))
+def test_evaluate_population_matches_particle_evaluate(instance, seed):
+    em = _em(*instance, seed)
+    objectives, valid = evaluate_population(em.node_index[em.positions], em.demand, em.exec_times, em.capacity)
+    for particle, objective, ok in zip(em.particles, objectives, valid):
+        expected_objective, expected_valid = Particle(em.tasks, em.nodes, em.domains,
+                                                      position=particle.position.copy()).evaluate()
+        assert ok == expected_valid
+        assert objective == pytest.approx(expected_objective, rel=1e-9)
+
+
+@pytest.mark.parametrize('instance', INSTANCES)
+@pytest.mark.parametrize('seed', range(5))
+def test_target_nodes_match_cyclic_domain_scan(instance, seed):
+    em = _em(*instance, seed)
+    rng = np.random.default_rng(seed)
+    current = em.node_index[em.positions]
+    forward = rng.random(current.shape) < 0.5
+    targets = em._target_nodes(current, forward)
+    feasible = em.domains.feasible
+    for p, t in np.ndindex(current.shape):
+        expected = _cyclic_neighbor(feasible[t], current[p, t], 1 if forward[p, t] else -1)
+        assert targets[p, t] == expected
+
+
+@pytest.mark.parametrize('instance', INSTANCES)
+@pytest.mark.parametrize('seed', range(5))
+def test_move_population_charges_and_best(instance, seed):
+    em = _em(*instance, seed)
+    forces = np.random.default_rng(seed).normal(size=em.positions.shape)
+    em.move_population(em.particles, forces)
+
+    # Čestice su pogledi na matricu populacije i ostaju u domenima zadataka
+    assert all(np.shares_memory(particle.position, em.positions) for particle in em.particles)
+    columns = np.arange(len(em.tasks))
+    assert em.domains.feasible[columns[None, :], em.node_index[em.positions]].all()
+
+    for particle in em.particles:
+        objective, _ = Particle(em.tasks, em.nodes, em.domains, position=particle.position.copy()).evaluate()
+        assert particle.charge == pytest.approx(1.0 / (1.0 + objective), rel=1e-9)
+
+    # Zapamćeni inkumbent (može biti nevalidan ako validnog još nema) odgovara svojoj poziciji
+    objective, _ = Particle(em.tasks, em.nodes, em.domains, position=em.best_position.copy()).evaluate()
+    assert em.best_objective == pytest.approx(objective, rel=1e-9)
@@ -0,0 +1,49 @@
+# src/trajectory.py
+import time
+from typing import List, Optional
+
+
+class Trajectory:
+
+    #Vremenski označena putanja najboljeg rešenja (inkumbenta) jednog solvera
+    #Tačka se beleži pri svakom poboljšanju: (vreme, broj evaluacija, cilj, validnost)
+
+    def __init__(self, start: Optional[float] = None):
+        self.start = start if start is not None else time.time()
+        self.evaluations = 0
+        self.best_objective = float('inf')
+        self.best_valid = False
+        self.points = []
+
+    def count(self, n: int = 1):
+        """Broji evaluacije ciljne funkcije"""
+        self.evaluations += n
+
+    def improve(self, objective: float, valid: bool) -> bool:
+        """Beleži tačku ako je rešenje bolje od trenutnog (validno je uvek bolje od nevalidnog)"""
+        better = ((valid and not self.best_valid) or
+                  (valid == self.best_valid and objective < self.best_objective))
+        if better:
+            self.best_objective = float(objective)
+            self.best_valid = bool(valid)
+            self.points.append({
+                'time': time.time() - self.start,
+                'evaluations': self.evaluations,
+                'objective': float(objective),
+                'valid': bool(valid)
+            })
+        return better
+
+    def time_to_target(self, target: float) -> Optional[float]:
+        return time_to_target(self.points, target)
+
+    def to_list(self) -> List[dict]:
+        return list(self.points)
+
+
+def time_to_target(points: List[dict], target: float) -> Optional[float]:
+    """Vreme prvog validnog rešenja sa ciljem <= target (None ako nije dostignut)"""
+    for point in points:
+        if point['valid'] and point['objective'] <= target:
+            return point['time']
+    return None
@@ -1,5 +1,4 @@
 from typing import List
-import matplotlib.pyplot as plt
 import numpy as np
 from computerNode import ComputeNode
 
@@ -23,11 +22,20 @@ def compare_results(bf_result, em_result):
     return comparison
     
     
-def plot_time_comparison(results):
+def plot_time_comparison(results=None, db_path=None, run_id=None):
     """
     Crta grafik zavisnosti vremena izvršavanja od broja kombinacija
     Poredi brute-force i EM algoritam
+    Ako rezultati nisu prosleđeni, čitaju se iz SQLite baze rezultata
     """
+    if results is None:
+        from results_store import ResultsStore, DEFAULT_DB_PATH
+        store = ResultsStore(db_path or DEFAULT_DB_PATH)
+        try:
+            results = store.load_results(run_id)
+        finally:
+            store.close()
+
     # Izvuci podatke samo za testove gde je BF rađen
     bf_data = []
     em_data = []
@@ -46,6 +54,9 @@ def plot_time_comparison(results):
     if not bf_data:
         print("Nema podataka za poređenje (svi BF preskočeni)")
         return
+
+    # matplotlib se učitava tek kada se crta (solveri ga ne zahtevaju)
+    import matplotlib.pyplot as plt
     
     # Sortiraj po broju kombinacija
     bf_data.sort()
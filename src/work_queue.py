@@ -0,0 +1,274 @@
+# src/work_queue.py
+import argparse
+import hashlib
+import json
+import multiprocessing as mp
+import os
+import socket
+import threading
+import time
+from pathlib import Path
+from typing import List, Optional
+
+# Red poslova na deljenom fajl sistemu (npr. NFS direktorijum koji vide svi hostovi).
+# Posao je JSON fajl koji prolazi kroz poddirektorijume:
+#   pending/ -> claimed/ -> done/   (ili nazad u pending/ posle pada, pa failed/)
+# Preuzimanje je atomski os.rename, pa isti posao ne mogu da uzmu dva radnika.
+# Radnik dok radi osvežava mtime preuzetog fajla (lease); posao čiji lease
+# istekne (radnik je pao) vraća se u pending/ dok se ne potroše pokušaji.
+
+STATES = ('pending', 'claimed', 'done', 'failed')
+DEFAULT_LEASE = 120.0
+DEFAULT_MAX_ATTEMPTS = 3
+
+
+def code_version() -> str:
+    """Heš izvornog koda solvera (*.py u ovom direktorijumu), isti na svim hostovima sa istim kodom"""
+    digest = hashlib.sha1()
+    for path in sorted(Path(__file__).resolve().parent.glob('*.py')):
+        digest.update(path.name.encode('utf-8'))
+        digest.update(path.read_bytes())
+    return digest.hexdigest()[:12]
+
+
+def job_id(instance: dict, solver: str, params: Optional[dict] = None, seed: Optional[int] = None,
+           time_limit: Optional[float] = None, run: Optional[str] = None) -> str:
+    """
+    Id posla je heš sadržaja i oznake pokretanja run (verzija koda ili id
+    pokretanja), pa ponovno objavljivanje istog posla u istom pokretanju nema
+    efekta, a posle promene koda se posao izvršava ponovo
+    """
+    key = json.dumps({'instance': instance, 'solver': solver, 'params': params or {},
+                      'seed': seed, 'time_limit': time_limit, 'run': run}, sort_keys=True)
+    return hashlib.sha1(key.encode('utf-8')).hexdigest()[:16]
+
+
+def _write_atomic(path: Path, data: dict):
+    # Upis u privremeni fajl pa os.replace: čitalac nikad ne vidi polovičan JSON
+    tmp = path.with_name(f'.{path.name}.{os.getpid()}.tmp')
+    with open(tmp, 'w') as f:
+        json.dump(data, f, default=float)
+    os.replace(tmp, path)
+
+
+class WorkQueue:
+
+    #Red poslova (instanca, solver, parametri, seme) u deljenom direktorijumu
+    #Svi hostovi koji vide direktorijum mogu da objavljuju i preuzimaju poslove
+
+    def __init__(self, root, lease: float = DEFAULT_LEASE, max_attempts: int = DEFAULT_MAX_ATTEMPTS):
+        self.root = Path(root)
+        self.lease = lease
+        self.max_attempts = max_attempts
+        for state in STATES:
+            (self.root / state).mkdir(parents=True, exist_ok=True)
+
+    def _path(self, state: str, jid: str) -> Path:
+        return self.root / state / f'{jid}.json'
+
+    def state_of(self, jid: str) -> Optional[str]:
+        for state in STATES:
+            if self._path(state, jid).exists():
+                return state
+        return None
+
+    def publish(self, instance: dict, solver: str, params: Optional[dict] = None,
+                seed: Optional[int] = None, time_limit: Optional[float] = None,
+                meta: Optional[dict] = None, run: Optional[str] = None) -> str:
+        """
+        Objavljuje posao i vraća njegov id. instance je rečnik {'tasks', 'nodes'}
+        (posao je samodovoljan, radnicima ne trebaju test fajlovi). Posao koji
+        već postoji u bilo kom stanju se ne objavljuje ponovo. run je oznaka
+        pokretanja u ključu posla (podrazumevano code_version()).
+        """
+        run = run if run is not None else code_version()
+        jid = job_id(instance, solver, params, seed, time_limit, run)
+        if self.state_of(jid) is not None:
+            return jid
+        _write_atomic(self._path('pending', jid), {
+            'id': jid, 'instance': instance, 'solver': solver, 'params': params or {},
+            'seed': seed, 'time_limit': time_limit, 'meta': meta or {}, 'run': run,
+            'attempts': 0, 'published_at': time.time()
+        })
+        return jid
+
+    def claim(self, worker: str) -> Optional[dict]:
+        """Preuzima jedan posao (atomski rename pending -> claimed) ili vraća None"""
+        for path in sorted((self.root / 'pending').glob('*.json')):
+            target = self.root / 'claimed' / path.name
+            try:
+                os.rename(path, target)
+                os.utime(target)  # rename ne menja mtime, a lease se meri od preuzimanja
+            except OSError:
+                continue  # drugi radnik je bio brži
+            if self._path('done', path.stem).exists():
+                # Kasni radnik je završio posao koji je u međuvremenu vraćen u red
+                os.remove(target)
+                continue
+            with open(target, 'r') as f:
+                job = json.load(f)
+            job['attempts'] += 1
+            job['worker'] = worker
+            job['claimed_at'] = time.time()
+            _write_atomic(target, job)
+            return job
+        return None
+
+    def heartbeat(self, jid: str):
+        """Produžava lease preuzetog posla"""
+        try:
+            os.utime(self._path('claimed', jid))
+        except OSError:
+            pass
+
+    def complete(self, job: dict, result: dict):
+        """Upisuje rezultat i zatvara posao"""
+        job = dict(job, result=result, finished_at=time.time())
+        _write_atomic(self._path('done', job['id']), job)
+        try:
+            os.remove(self._path('claimed', job['id']))
+        except OSError:
+            pass
+
+    def fail(self, job: dict, error: str):
+        """Vraća posao u pending/ (ponovni pokušaj) ili ga premešta u failed/"""
+        job = dict(job, error=error)
+        state = 'pending' if job['attempts'] < self.max_attempts else 'failed'
+        _write_atomic(self._path(state, job['id']), job)
+        try:
+            os.remove(self._path('claimed', job['id']))
+        except OSError:
+            pass
+
+    def requeue_expired(self) -> List[str]:
+        """Vraća poslove čiji je lease istekao (radnik je pao); vraća njihove id-jeve"""
+        expired = []
+        now = time.time()
+        for path in (self.root / 'claimed').glob('*.json'):
+            try:
+                if now - path.stat().st_mtime <= self.lease:
+                    continue
+                with open(path, 'r') as f:
+                    job = json.load(f)
+            except (OSError, ValueError):
+                continue
+            self.fail(job, f"lease expired (worker {job.get('worker')})")
+            expired.append(job['id'])
+        return expired
+
+    def counts(self) -> dict:
+        return {state: len(list((self.root / state).glob('*.json'))) for state in STATES}
+
+    def _load(self, state: str, job_ids: Optional[List[str]] = None) -> List[dict]:
+        # Poslovi iz jednog stanja: svi ili samo zadati id-jevi
+        if job_ids is None:
+            paths = sorted((self.root / state).glob('*.json'))
+        else:
+            paths = [path for path in (self._path(state, jid) for jid in job_ids) if path.exists()]
+        loaded = []
+        for path in paths:
+            with open(path, 'r') as f:
+                loaded.append(json.load(f))
+        return loaded
+
+    def results(self, job_ids: Optional[List[str]] = None) -> List[dict]:
+        """Završeni poslovi (sa rezultatom); samo job_ids ako su zadati"""
+        return self._load('done', job_ids)
+
+    def failed(self, job_ids: Optional[List[str]] = None) -> List[dict]:
+        return self._load('failed', job_ids)
+
+
+def run_job(job: dict) -> dict:
+    """Izvršava jedan posao preko registra solvera"""
+    from task import Task
+    from computerNode import ComputeNode
+    from solvers import solve
+    from trajectory import Trajectory
+
+    tasks = [Task(**t) for t in job['instance']['tasks']]
+    nodes = [ComputeNode(**n) for n in job['instance']['nodes']]
+    trajectory = Trajectory()
+    assignment, objective, valid, runtime = solve(job['solver'], tasks, nodes, time_limit=job['time_limit'],
+                                                  params=job['params'], seed=job['seed'], trajectory=trajectory)
+    return {'objective': objective, 'valid': valid, 'time': runtime, 'assignment': assignment,
+            'trajectory': trajectory.to_list()}
+
+
+def worker_loop(root, worker: Optional[str] = None, lease: float = DEFAULT_LEASE,
+                max_attempts: int = DEFAULT_MAX_ATTEMPTS, poll: float = 1.0, exit_when_idle: bool = False):
+    """
+    Radnik: preuzima i izvršava poslove dok ih ima. Dok posao radi, pozadinska
+    nit osvežava lease. Izuzetak u solveru vraća posao na ponovni pokušaj.
+    """
+    queue = WorkQueue(root, lease=lease, max_attempts=max_attempts)
+    worker = worker or f'{socket.gethostname()}:{os.getpid()}'
+    while True:
+        queue.requeue_expired()
+        job = queue.claim(worker)
+        if job is None:
+            if exit_when_idle and queue.counts()['claimed'] == 0:
+                return
+            time.sleep(poll)
+            continue
+
+        done = threading.Event()
+
+        def beat():
+            while not done.wait(lease / 3):
+                queue.heartbeat(job['id'])
+
+        beater = threading.Thread(target=beat, daemon=True)
+        beater.start()
+        try:
+            result = run_job(job)
+        except Exception as e:
+            queue.fail(job, f'{type(e).__name__}: {e}')
+        else:
+            queue.complete(job, result)
+        finally:
+            done.set()
+            beater.join()
+
+
+def start_local_workers(root, n_workers: int = 2, **kwargs) -> List[mp.Process]:
+    """Pokreće lokalne radnike (zamena za radnike na drugim hostovima pri testiranju)"""
+    kwargs.setdefault('exit_when_idle', True)
+    workers = []
+    for k in range(n_workers):
+        process = mp.Process(target=worker_loop, args=(root, f'{socket.gethostname()}:local{k}'),
+                             kwargs=kwargs)
+        process.start()
+        workers.append(process)
+    return workers
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Radnik / status reda poslova u deljenom direktorijumu')
+    parser.add_argument('command', choices=['worker', 'status', 'requeue'])
+    parser.add_argument('--queue', default='results/queue', help='Deljeni direktorijum reda')
+    parser.add_argument('--lease', type=float, default=DEFAULT_LEASE)
+    parser.add_argument('--max-attempts', type=int, default=DEFAULT_MAX_ATTEMPTS)
+    parser.add_argument('--workers', type=int, default=1, help='Broj lokalnih radnika')
+    parser.add_argument('--exit-when-idle', action='store_true')
+    args = parser.parse_args(argv)
+
+    if args.command == 'worker':
+        kwargs = dict(lease=args.lease, max_attempts=args.max_attempts, exit_when_idle=args.exit_when_idle)
+        if args.workers == 1:
+            worker_loop(args.queue, **kwargs)
+        else:
+            for process in start_local_workers(args.queue, args.workers, **kwargs):
+                process.join()
+        return
+
+    queue = WorkQueue(args.queue, lease=args.lease, max_attempts=args.max_attempts)
+    if args.command == 'requeue':
+        print(f"Requeued: {queue.requeue_expired()}")
+    print(json.dumps(queue.counts()))
+    for job in queue.failed():
+        print(f"  failed {job['id']} {job['solver']} ({job['meta'].get('test')}): {job.get('error')}")
+
+
+if __name__ == "__main__":
+    main()